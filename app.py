@@ -1,6 +1,7 @@
-﻿import json
+﻿import hashlib
+import json
 import os
-import re
+from contextlib import closing
 from datetime import datetime, timezone
 import numpy as np
 import pandas as pd
@@ -12,437 +13,1481 @@ import plotly.io as pio
 APP_TITLE = "ODyssey Growth Curve Workbench"
 CONFIG_VERSION = 1
 from odyssey.analysis import (
+    BOOTSTRAP_METHODS,
+    FIT_METHODS,
+    GROWTH_MODELS,
+    OUTLIER_METHODS,
+    QC_RULES,
+    SMOOTHING_METHODS,
+    _suggest_fit_window,
+    _sweep_summary,
     _base_time_unit,
     _build_column_map,
     _compute_auc,
     _convert_auc,
     _convert_duration,
     _convert_growth_rate,
+    _curve_arrays,
     _long_format_from_map,
     _mean_sd_by_treatment_time,
-    _qc_flags,
     _suggest_treatment_name,
-    _validate_data,
+    _validation_messages,
+    _well_metric_frame,
     _window_r2_by_treatment,
+    align_summary_curves,
+    aligned_mean_sd,
+    common_time_grid,
+    curve_differences,
     fit_growth_rates,
+    qc_flags,
+)
+from odyssey.catalog import (
+    CATALOG_ENV_VAR,
+    DEFAULT_CATALOG,
+    _parse_params,
+    catalog_runs,
+    ingest_bundle,
+    open_catalog,
+    query_runs,
+)
+from odyssey.compare import _cube_summary, _cube_table, _metric_column, build_results_cube
+from odyssey.export import SECONDS_PER_UNIT, _build_config, _canonical_results, build_download_zip
+from odyssey.cache import (
+    _job_runner,
+    _cached_excel_sheet,
+    _cached_excel_sheet_names,
+    _cached_working_sheet,
+    _cached_preview_data,
+    _cached_results_zip,
 )
-from odyssey.export import _build_config, build_download_zip
-from odyssey.cache import _cached_preview_data
 from odyssey.io_utils import (
+    _NamedBytesIO,
     _apply_time_unit,
     _guess_time_columns,
     _parse_time_series,
     _read_excel_file,
-    _read_results_zip,
     _safe_filename,
     _safe_read_json,
 )
 from odyssey.plotting import (
-    _add_window_highlight,
-    _add_window_highlight_color,
+    DEFAULT_MAX_POINTS,
+    RENDER_MODES,
+    WEBGL_POINT_THRESHOLD,
     _apply_tick_intervals,
+    _downsample_curve,
     _plot_compare_runs,
     _plot_overlay,
+    _plot_plate_heatmap,
     _plot_small_multiples,
     _plot_to_png_bytes,
+    _plot_well_curve,
+    _plot_window_sweep,
     _prepare_download_figure,
+    _preview_max_points,
+    _scatter_type,
+    _sd_band_trace,
+    _set_window_highlight,
     _style_plot,
     _to_rgba,
 )
-from odyssey.pipeline import analyze_file, apply_blank_normalization
+from odyssey.pipeline import _flatten_trace, analyze_file, refit_analysis
+from odyssey.profiling import (
+    MAX_LOGGED_RERUNS,
+    PROFILE_ENV_VAR,
+    PROFILE_QUERY_PARAM,
+    _RerunProfile,
+    _changed_widgets,
+    _profile_report,
+    _profiling_enabled,
+    _record_rerun,
+    _widget_snapshot,
+)
+
 
+def _styled_preview_figure(state_key, title, x_label, y_label):
+    # The preview figures are copied and styled only when the data or labels change;
+    # slider moves patch their shapes in place. st.plotly_chart resends the traces on
+    # each move, so the preview is capped at PREVIEW_POINT_BUDGET points in total.
+    style = (st.session_state.get("preview_signature"), title, x_label, y_label)
+    if st.session_state.get(f"{state_key}_style") != style:
+        fig = go.Figure(st.session_state.preview_base_fig)
+        _style_plot(fig, title, x_label, y_label, show_grid=False)
+        fig.update_layout(uirevision=state_key)
+        st.session_state[state_key] = fig
+        st.session_state[f"{state_key}_style"] = style
+    return st.session_state[state_key]
 
-def _dedupe_columns(df):
-    if not df.columns.duplicated().any():
-        return df
-    counts = {}
-    new_cols = []
-    for col in df.columns:
-        if col in counts:
-            counts[col] += 1
-            new_cols.append(f"{col}.{counts[col]}")
+
+@st.fragment
+def _window_preview_fragment(preview, auc_bounds, full_range, config, base_unit):
+    time_window = None
+    if preview is not None:
+        st.caption("Adjust the fit window as needed.")
+        time_window = st.slider(
+            "Fit window range",
+            min_value=preview["t_min"],
+            max_value=preview["t_max"],
+            value=preview["auto_window"],
+            key="fit_window_range",
+        )
+        preview_fig = _styled_preview_figure(
+            "preview_fig",
+            st.session_state.plot_title,
+            st.session_state.plot_x_label,
+            st.session_state.plot_y_label,
+        )
+        _set_window_highlight(preview_fig, time_window)
+        st.plotly_chart(preview_fig, width="stretch", key="preview_plot")
+        st.caption(f"Highlighted window: {time_window[0]:.2f} to {time_window[1]:.2f}.")
+        live_r2 = st.checkbox("Calculate R\u00B2 live (can be slow)", value=False)
+        if live_r2:
+            r2_df = _window_r2_by_treatment(preview["long_df"], time_window=time_window)
+            if not r2_df.empty:
+                r2_median = r2_df["r2"].median()
+                r2_mean = r2_df["r2"].mean()
+                st.caption(
+                    f"Median R\u00B2 in highlighted window: {r2_median:.3f} "
+                    f"(Mean: {r2_mean:.3f})"
+                )
+        else:
+            if st.button("Calculate R\u00B2 for highlighted window"):
+                r2_df = _window_r2_by_treatment(preview["long_df"], time_window=time_window)
+                if not r2_df.empty:
+                    r2_median = r2_df["r2"].median()
+                    r2_mean = r2_df["r2"].mean()
+                    st.session_state.preview_r2_median = r2_median
+                    st.session_state.preview_r2_mean = r2_mean
+            if "preview_r2_median" in st.session_state:
+                st.caption(
+                    f"Median R\u00B2 in highlighted window: {st.session_state.preview_r2_median:.3f} "
+                    f"(Mean: {st.session_state.get('preview_r2_mean', float('nan')):.3f})"
+                )
+    st.markdown("### AUC")
+    config_auc_unit = config.get("auc_unit") if config else None
+    if config_auc_unit == "OD*min":
+        config_auc_unit = "OD*min"
+    if config_auc_unit == "OD*hour":
+        config_auc_unit = "OD*hour"
+    default_auc_unit = config_auc_unit or (
+        "OD*min" if base_unit == "minutes" else "OD*hour"
+    )
+    st.selectbox(
+        "AUC unit",
+        options=["OD*min", "OD*hour"],
+        index=0 if default_auc_unit == "OD*min" else 1,
+        key="auc_unit_choice",
+    )
+    auc_mode = st.selectbox(
+        "AUC window",
+        options=["Full range", "Fit window", "Custom range"],
+        index=0
+        if (config.get("auc_mode") if config else "Full range") == "Full range"
+        else 1
+        if (config.get("auc_mode") if config else "") == "Fit window"
+        else 2,
+        key="auc_mode_choice",
+    )
+    auc_window = None
+    auc_highlight = None
+    auc_fig = None
+    if "preview_base_fig" in st.session_state:
+        auc_fig = _styled_preview_figure(
+            "auc_preview_fig",
+            "AUC window preview",
+            st.session_state.plot_x_label,
+            st.session_state.plot_y_label,
+        )
+    if auc_mode == "Custom range":
+        auc_min, auc_max = auc_bounds
+        default_auc = config.get("auc_window") if config else None
+        auc_default = (
+            tuple(default_auc) if isinstance(default_auc, list) and len(default_auc) == 2 else (auc_min, auc_max)
+        )
+        auc_window = st.slider(
+            "AUC range",
+            min_value=auc_min,
+            max_value=auc_max,
+            value=auc_default,
+            key="auc_window",
+        )
+        auc_highlight = auc_window
+        if auc_fig is not None:
+            _set_window_highlight(auc_fig, auc_window, fillcolor="rgba(239,68,68,0.25)", line_width=0)
+    else:
+        if auc_mode == "Fit window":
+            auc_highlight = time_window
         else:
-            counts[col] = 0
-            new_cols.append(col)
-    df = df.copy()
-    df.columns = new_cols
-    return df
+            auc_highlight = full_range
+        if auc_fig is not None:
+            _set_window_highlight(auc_fig, auc_highlight, fillcolor="rgba(255,193,7,0.2)", line_width=0)
+    if auc_fig is not None and auc_highlight is not None:
+        st.plotly_chart(auc_fig, width="stretch", key="auc_preview_plot")
 
 
-def main():
-    st.set_page_config(page_title=APP_TITLE, layout="wide")
-    st.title(APP_TITLE)
-    st.markdown(
-        """
-        <style>
-        /* Customize Streamlit's drag-drop text inside the upload box */
-        div[data-testid="stFileUploaderDropzone"] p {
-          visibility: hidden;
-          margin: 0;
-          height: 0;
-        }
-        div[data-testid="stFileUploaderDropzone"] p::before {
-          content: "Upload file - drag and drop files here";
-          visibility: visible;
-          display: block;
-          height: auto;
-          margin-bottom: 4px;
-          font-weight: 600;
-        }
-        div[data-testid="stFileUploaderDropzone"] small {
-          display: block;
-          margin-top: 0;
+def _display_results(analyses, settings):
+    base_unit = settings["base_unit"]
+    target_mu_unit = "minutes" if settings["growth_rate_unit"] == "1/min" else "hours"
+    target_dt_unit = "minutes" if settings["doubling_time_unit"] == "min" else "hours"
+    growth_rate_label = settings["growth_rate_label"]
+    doubling_time_unit = settings["doubling_time_unit"]
+    auc_unit = settings["auc_unit"]
+    auc_window_range = settings["auc_window_range"]
+    combined_results = pd.concat([a["results"] for a in analyses], ignore_index=True)
+    combined_auc = pd.concat([a["auc"] for a in analyses], ignore_index=True)
+    combined_results = combined_results.merge(
+        combined_auc, on=["treatment", "replicate"], how="left"
+    )
+    # QC runs on the canonical columns, before unit conversion and renaming.
+    results_display = qc_flags(combined_results, settings.get("qc_rules"))
+    for col in ("mu", "mu_ci_low", "mu_ci_high", "model_mu_max", "sliding_mu_max"):
+        if col in results_display.columns:
+            results_display[col] = _convert_growth_rate(results_display[col], base_unit, target_mu_unit)
+    for col in ("doubling_time", "doubling_time_ci_low", "doubling_time_ci_high"):
+        if col in results_display.columns:
+            results_display[col] = _convert_duration(results_display[col], base_unit, target_dt_unit)
+    threshold_cols = [c for c in results_display.columns if str(c).startswith("time_to_od_")]
+    sliding_time_cols = ["sliding_mu_max_time", "sliding_window_start", "sliding_window_end"]
+    for col in ["model_lag", "lag_time", *threshold_cols, *sliding_time_cols]:
+        if col in results_display.columns:
+            results_display[col] = _convert_duration(results_display[col], base_unit, target_dt_unit)
+    target_auc_unit = "minutes" if auc_unit == "OD*min" else "hours"
+    results_display["auc"] = _convert_auc(results_display["auc"], base_unit, target_auc_unit)
+    mu_label = f"Growth rate ({growth_rate_label})"
+    dt_label = f"Doubling time ({doubling_time_unit})"
+    auc_label = f"AUC ({auc_unit})"
+    results_display = results_display.rename(
+        columns={
+            "mu": mu_label,
+            "mu_ci_low": f"{mu_label} CI low",
+            "mu_ci_high": f"{mu_label} CI high",
+            "doubling_time": dt_label,
+            "doubling_time_ci_low": f"{dt_label} CI low",
+            "doubling_time_ci_high": f"{dt_label} CI high",
+            "auc": auc_label,
+            "model_mu_max": f"Model max rate ({growth_rate_label})",
+            "model_lag": f"Model lag ({doubling_time_unit})",
+            "lag_time": f"Lag time ({doubling_time_unit})",
+            "sliding_mu_max": f"Sliding max growth rate ({growth_rate_label})",
+            "sliding_mu_max_time": f"Sliding max time ({doubling_time_unit})",
+            "sliding_window_start": f"Sliding window start ({doubling_time_unit})",
+            "sliding_window_end": f"Sliding window end ({doubling_time_unit})",
+            "sliding_r2": "Sliding R\u00B2",
+            **{
+                col: f"Time to OD {col[len('time_to_od_'):]} ({doubling_time_unit})"
+                for col in threshold_cols
+            },
         }
-        </style>
-        """,
-        unsafe_allow_html=True,
     )
-    st.markdown(
-        "Learn more: [ODyssey home](https://srriash.github.io/ODyssey-Growth-curve-workbench/)"
+    results_display["AUC window start"] = auc_window_range[0]
+    results_display["AUC window end"] = auc_window_range[1]
+    if "run" in results_display.columns:
+        results_display = results_display.drop(columns=["run"])
+    results_display = results_display.rename(
+        columns={
+            "treatment": "Treatment",
+            "replicate": "Replicate",
+            "n": "N",
+            "intercept": "Intercept",
+            "r2": "R\u00B2",
+            "window_start": "Exponential window start",
+            "window_end": "Exponential window end",
+            "qc_flags": "QC flags",
+            "qc_mask": "QC mask",
+            "od_max": "Max OD",
+            "blank_drift": "Blank drift (OD)",
+            "model": "Model",
+            "model_y0": "Model ln OD0",
+            "model_A": "Model ln(OD max/OD0)",
+            "model_shape": "Model shape (v)",
+            "model_capacity": "Model carrying capacity (OD)",
+            "model_r2": "Model R\u00B2",
+            "model_rmse": "Model RMSE (ln OD)",
+            "model_aic": "Model AIC",
+            "model_converged": "Model converged",
+            "outlier_score": "Outlier score (robust z)",
+            "outlier": "Replicate outlier",
+        }
     )
-    st.subheader("Compare runs")
-    st.caption("Compare previously analyzed runs by uploading ODyssey zip exports.")
-    st.info("Comparison does not require re-running analysis.")
+    return results_display
+
+
+def _upstream_signature(file_bytes, sheet_name, time_col, time_unit, column_map, blank_normalized, blank_cols,
+                        blank_options, smoothing):
+    # Everything analyze_file does before the window fits; results with the same signature
+    # can be refit from the arrays they kept instead of rerunning the whole pipeline.
+    settings = [sheet_name, time_col, time_unit, column_map, blank_normalized, blank_cols, blank_options, smoothing]
+    return hashlib.sha256(file_bytes).hexdigest() + json.dumps(settings, sort_keys=True, default=str)
+
+
+@st.fragment(run_every=1.0)
+def _analysis_job_panel():
+    job = st.session_state.get("analysis_job")
+    if not job:
+        return
+    runner = _job_runner()
+    status = runner.status(job["id"])
+    if status is None:
+        st.session_state.analysis_job = None
+        return
+    if status["state"] in ("queued", "running"):
+        started = status["started_at"] or status["submitted_at"]
+        elapsed = datetime.now().timestamp() - started
+        fraction = min(status["done"] / status["total"], 1.0) if status["total"] else 0.0
+        st.progress(fraction, text=f"Running analysis: {status['stage']} \u2022 {elapsed:.1f}s")
+        st.caption("You can keep adjusting plots of the previous results while this runs.")
+        if st.button("Cancel analysis", key="cancel_analysis"):
+            runner.cancel(job["id"])
+        return
+    st.session_state.analysis_job = None
+    analysis = runner.result(job["id"])
+    runner.forget(job["id"])
+    if status["state"] == "cancelled":
+        st.session_state.analysis_job_message = ("info", "Analysis cancelled.")
+    elif status["state"] == "failed":
+        st.session_state.analysis_job_message = (
+            "error",
+            f"Analysis of {job['name']} failed: {status['error']}",
+        )
+    else:
+        analysis["results"]["run"] = job["name"]
+        analyses = [analysis]
+        st.session_state.analysis_ready = True
+        st.session_state.analysis_payload = {
+            "analyses": analyses,
+            "results": _display_results(analyses, job["display"]),
+            "upstream": job.get("upstream"),
+        }
+    st.rerun()
+
+
+def _uploaded_compare_runs(catalog_path):
     compare_upload = st.file_uploader(
         "Upload ODyssey zip(s)",
         type=["zip"],
         accept_multiple_files=True,
         help="Use the zip files generated by the Downloads section.",
     )
-    if compare_upload:
-        compare_runs = []
-        compare_errors = []
-        for uploaded in compare_upload:
-            parsed, err = _read_results_zip(uploaded)
-            if err:
-                compare_errors.append(err)
+    compare_runs = []
+    if not compare_upload:
+        return compare_runs
+    compare_errors = []
+    for uploaded in compare_upload:
+        zip_bytes = uploaded.getvalue()
+        parsed, err = _cached_results_zip(
+            hashlib.sha256(zip_bytes).hexdigest(), uploaded.name, zip_bytes
+        )
+        if err:
+            compare_errors.append(err)
+        else:
+            compare_runs.append(parsed)
+    if compare_errors:
+        st.warning("Some zip files could not be parsed:")
+        for err in compare_errors:
+            st.write(f"- {err}")
+    if compare_runs and st.button("Add to run catalog", key="compare_catalog_add"):
+        added = 0
+        with closing(open_catalog(catalog_path)) as conn:
+            for uploaded in compare_upload:
+                try:
+                    added += ingest_bundle(conn, uploaded.getvalue(), name=uploaded.name)[1]
+                except ValueError as exc:
+                    st.write(f"- {uploaded.name}: {exc}")
+        st.success(f"Added {added} new run(s) to the catalog.")
+    return compare_runs
+
+
+def _catalog_compare_runs(catalog_path):
+    if not os.path.exists(catalog_path):
+        st.info("No run catalog found at this path yet. Add runs from the upload view or the CLI.")
+        return []
+    # One connection per rerun: sessions run in their own threads and must not share one.
+    with closing(open_catalog(catalog_path)) as conn:
+        return _catalog_query_runs(conn)
+
+
+def _catalog_query_runs(conn):
+    known = [row[0] for row in conn.execute("SELECT DISTINCT treatment FROM results ORDER BY treatment")]
+    treatments = st.multiselect("Treatments", options=known, key="compare_catalog_treatments")
+    dates = st.date_input("Run dates", value=(), key="compare_catalog_dates")
+    param_text = st.text_input(
+        "Config filters",
+        value="",
+        key="compare_catalog_params",
+        help="Comma-separated KEY=VALUE or KEY=LOW..HIGH, e.g. fit_method=huber, min_points=3..5.",
+    )
+    try:
+        params = _parse_params([item.strip() for item in param_text.split(",") if item.strip()])
+    except ValueError as exc:
+        st.warning(str(exc))
+        return []
+    dates = list(dates) if isinstance(dates, (list, tuple)) else [dates]
+    filters = dict(
+        treatments=treatments or None,
+        since=dates[0] if dates else None,
+        until=dates[-1] if dates else None,
+        params=params,
+    )
+    matching = query_runs(conn, **filters)
+    st.caption(f"{len(matching)} run(s) in the catalog match these filters.")
+    if matching.empty:
+        return []
+    with st.expander("Matching runs", expanded=False):
+        st.dataframe(matching.drop(columns=["run_id"]))
+    return catalog_runs(conn, **filters)
+
+
+@st.fragment
+def _compare_runs_section():
+    st.subheader("Compare runs")
+    st.caption("Compare previously analyzed runs from ODyssey zip exports or the run catalog.")
+    st.info("Comparison does not require re-running analysis.")
+    source = st.radio("Runs from", ["Uploaded zips", "Run catalog"], horizontal=True, key="compare_source")
+    catalog_path = st.text_input(
+        "Catalog file",
+        value=os.environ.get(CATALOG_ENV_VAR) or DEFAULT_CATALOG,
+        key="compare_catalog_path",
+        help="SQLite catalog filled with `python -m odyssey.catalog ingest` or the upload view.",
+    )
+    if source == "Run catalog":
+        compare_runs = _catalog_compare_runs(catalog_path)
+    else:
+        compare_runs = _uploaded_compare_runs(catalog_path)
+    if compare_runs:
+        st.success(f"Loaded {len(compare_runs)} run(s) for comparison.")
+        st.warning(
+            "Comparison assumes consistent units and treatment naming across runs. "
+            "If runs used different time units or window settings, interpret differences carefully."
+        )
+        target_time_unit = st.selectbox(
+            "Convert time units to",
+            options=["minutes", "hours"],
+            index=0,
+            key="compare_target_time_unit",
+        )
+        st.caption(
+            "Time-based metrics and curves are converted using each run's saved time unit in its config."
+        )
+        cube = build_results_cube(compare_runs, target_time_unit)
+        if cube["skipped"]:
+            st.warning("Some runs were skipped:")
+            for msg in cube["skipped"]:
+                st.write(f"- {msg}")
+        if cube["warnings"]:
+            st.warning("Some runs did not include time units:")
+            for msg in cube["warnings"]:
+                st.write(f"- {msg}")
+        rename_map = {}
+        if cube["runs"]:
+            with st.expander("Rename treatments (optional)", expanded=False):
+                st.caption("Provide display names used in comparison tables and plots.")
+                for treatment in cube["treatments"]:
+                    rename_map[treatment] = st.text_input(
+                        f"Rename {treatment}",
+                        value=str(treatment),
+                        key=f"rename_{treatment}",
+                    )
+            st.markdown("### Comparison table")
+            st.dataframe(_cube_table(cube, rename_map))
+            st.markdown("### Summary by treatment")
+            if cube["metrics"]:
+                summary = _cube_summary(cube, rename_map)
+                st.dataframe(summary)
+                metric_options = [
+                    _metric_column(cube, m) for m in cube["metrics"] if m not in ("n", "window_start", "window_end")
+                ]
+                if metric_options:
+                    st.markdown("### Compare a metric across runs")
+                    metric = st.selectbox("Metric", options=metric_options)
+                    treatments = summary["treatment_display"].dropna().unique().tolist()
+                    selected_treatments = st.multiselect(
+                        "Treatments to compare",
+                        options=sorted(treatments),
+                        default=sorted(treatments)[:3],
+                    )
+                    if selected_treatments:
+                        plot_df = summary[summary["treatment_display"].isin(selected_treatments)]
+                        fig = go.Figure()
+                        for treatment in selected_treatments:
+                            subset = plot_df[plot_df["treatment_display"] == treatment]
+                            fig.add_trace(
+                                go.Bar(
+                                    x=subset["run"],
+                                    y=subset[metric],
+                                    name=str(treatment),
+                                )
+                            )
+                        fig.update_layout(barmode="group")
+                        _style_plot(fig, f"{metric} by run", "Run", metric, show_grid=False)
+                        st.plotly_chart(fig, width="stretch", key="compare_metric_plot")
             else:
-                compare_runs.append(parsed)
-        if compare_errors:
-            st.warning("Some zip files could not be parsed:")
-            for err in compare_errors:
-                st.write(f"- {err}")
-        if compare_runs:
-            st.success(f"Loaded {len(compare_runs)} run(s) for comparison.")
-            st.warning(
-                "Comparison assumes consistent units and treatment naming across runs. "
-                "If runs used different time units or window settings, interpret differences carefully."
+                st.info("No numeric columns available for summary.")
+        curve_runs = [
+            run for run in compare_runs if run.get("long_df") is not None or run.get("curves") is not None
+        ]
+        if curve_runs:
+            st.markdown("### Compare growth curves")
+            st.caption(
+                "Uses long_df.csv from each zip (enable in Downloads when exporting) or the "
+                "treatment mean curves stored in the run catalog. "
+                f"Curves are converted to {target_time_unit} and interpolated onto a common time grid."
             )
-            target_time_unit = st.selectbox(
-                "Convert time units to",
-                options=["minutes", "hours"],
-                index=0,
-                key="compare_target_time_unit",
+            show_sd_compare = st.checkbox("Show SD band", value=True, key="compare_show_sd")
+            custom_ticks_compare = st.checkbox(
+                "Custom tick intervals",
+                value=False,
+                key="compare_custom_ticks",
             )
-            st.caption(
-                "Time-based metrics and curves are converted using each run's saved time unit in its config."
+            x_tick_interval_compare = None
+            y_tick_interval_compare = None
+            if custom_ticks_compare:
+                x_tick_interval_compare = st.number_input(
+                    "X-axis tick interval",
+                    min_value=0.001,
+                    value=5.0,
+                    key="compare_x_tick_interval",
+                )
+                y_tick_interval_compare = st.number_input(
+                    "Y-axis tick interval",
+                    min_value=0.001,
+                    value=0.1,
+                    key="compare_y_tick_interval",
+                )
+            run_labels = [run["name"] for run in curve_runs]
+            selected_runs = st.multiselect(
+                "Runs to compare",
+                options=run_labels,
+                default=run_labels,
+                key="compare_runs_select",
             )
-            rename_map = {}
-            combined_frames = []
-            compare_warnings = []
-            time_unit_warnings = []
-            required_cols = {"treatment", "replicate"}
-            for run in compare_runs:
-                results_df = run["results"].copy()
-                rename_cols = {}
-                if "treatment" not in results_df.columns and "Treatment" in results_df.columns:
-                    rename_cols["Treatment"] = "treatment"
-                if "replicate" not in results_df.columns and "Replicate" in results_df.columns:
-                    rename_cols["Replicate"] = "replicate"
-                if rename_cols:
-                    results_df = results_df.rename(columns=rename_cols)
-                run_config = run.get("config") or {}
-                run_time_unit = run_config.get("time_unit")
-                if run_time_unit:
-                    run_base_unit = _base_time_unit(run_time_unit)
-                else:
-                    run_base_unit = target_time_unit
-                    time_unit_warnings.append(
-                        f"{run['name']}: missing time_unit in config; assuming {target_time_unit}"
+            all_treatments = sorted(
+                {
+                    t
+                    for run in curve_runs
+                    for t in (run["long_df"] if run.get("long_df") is not None else run["curves"])["treatment"]
+                    .dropna()
+                    .unique()
+                    .tolist()
+                }
+            )
+            selected_treatments = st.multiselect(
+                "Treatments to plot",
+                options=all_treatments,
+                default=all_treatments[:3],
+                key="compare_treatments_select",
+            )
+            if not rename_map:
+                rename_map = {treatment: treatment for treatment in all_treatments}
+            reference_run = None
+            if len(selected_runs) > 1 and st.checkbox(
+                "Plot difference from a reference run", value=False, key="compare_difference"
+            ):
+                reference_run = st.selectbox("Reference run", selected_runs, key="compare_reference_run")
+            if selected_runs and selected_treatments:
+                curves = []
+                summaries = []
+                for run in curve_runs:
+                    if run["name"] not in selected_runs:
+                        continue
+                    if run.get("long_df") is None:
+                        # Catalog runs keep treatment mean curves, with time in seconds.
+                        df = run["curves"].rename(columns={"time_s": "time"})
+                        df["time"] = df["time"] / SECONDS_PER_UNIT[target_time_unit]
+                        df["run"] = run["name"]
+                        summaries.append(df[df["treatment"].isin(selected_treatments)])
+                        continue
+                    df = run["long_df"].copy()
+                    run_config = run.get("config") or {}
+                    run_time_unit = run_config.get("time_unit")
+                    if run_time_unit:
+                        run_base_unit = _base_time_unit(run_time_unit)
+                    else:
+                        run_base_unit = target_time_unit
+                    if run_base_unit != target_time_unit:
+                        df["time"] = _convert_duration(
+                            pd.to_numeric(df["time"], errors="coerce"),
+                            run_base_unit,
+                            target_time_unit,
+                        )
+                    df["run"] = run["name"]
+                    curves.append(df)
+                curves_df = pd.concat(curves, ignore_index=True) if curves else None
+                if curves_df is not None:
+                    curves_df = curves_df[curves_df["treatment"].isin(selected_treatments)]
+                # Runs rarely share exact read times, so replicates are interpolated onto
+                # one common grid before the per-run mean and SD; stored mean curves are
+                # resampled onto the same grid.
+                time_frames = [df[["run", "treatment", "time"]] for df in [curves_df, *summaries] if df is not None]
+                grid = common_time_grid(pd.concat(time_frames, ignore_index=True))
+                parts = [align_summary_curves(df, grid) for df in summaries]
+                if curves_df is not None:
+                    parts.insert(0, aligned_mean_sd(curves_df, grid=grid))
+                grouped = pd.concat(parts, ignore_index=True).sort_values(["treatment", "run", "time"])
+                y_label = "OD"
+                if reference_run:
+                    grouped = curve_differences(grouped, reference_run).rename(
+                        columns={"difference": "mean", "difference_sd": "sd"}
                     )
-                if run_base_unit != target_time_unit:
-                    for col in results_df.columns:
-                        col_lower = col.lower()
-                        if "growth rate" in col_lower:
-                            results_df[col] = _convert_growth_rate(
-                                pd.to_numeric(results_df[col], errors="coerce"),
-                                run_base_unit,
-                                target_time_unit,
-                            )
-                        elif "doubling time" in col_lower:
-                            results_df[col] = _convert_duration(
-                                pd.to_numeric(results_df[col], errors="coerce"),
-                                run_base_unit,
-                                target_time_unit,
-                            )
-                        elif "window start" in col_lower or "window end" in col_lower:
-                            results_df[col] = _convert_duration(
-                                pd.to_numeric(results_df[col], errors="coerce"),
-                                run_base_unit,
-                                target_time_unit,
-                            )
-                        elif "auc" in col_lower:
-                            results_df[col] = _convert_auc(
-                                pd.to_numeric(results_df[col], errors="coerce"),
-                                run_base_unit,
-                                target_time_unit,
+                    y_label = f"OD difference from {reference_run}"
+                color_cycle = pc.qualitative.Plotly
+                run_styles = {}
+                for idx, run in enumerate(selected_runs):
+                    run_styles[run] = dict(dash="solid" if idx % 2 == 0 else "dot")
+                curve_arrays = _curve_arrays(grouped, ["treatment", "run"])
+                compare_curves = []
+                for idx, treatment in enumerate(selected_treatments):
+                    color = color_cycle[idx % len(color_cycle)]
+                    for run in selected_runs:
+                        if (treatment, run) not in curve_arrays:
+                            continue
+                        line_name = f"{rename_map.get(treatment, treatment)} - {run}"
+                        time_vals, mean_vals, sd_vals = _downsample_curve(*curve_arrays[(treatment, run)])
+                        compare_curves.append((line_name, run, color, time_vals, mean_vals, sd_vals))
+                n_points = sum(len(curve[3]) for curve in compare_curves)
+                trace_type = _scatter_type(n_points * (3 if show_sd_compare else 1))
+                traces = []
+                for line_name, run, color, time_vals, mean_vals, sd_vals in compare_curves:
+                    if show_sd_compare and not np.isnan(sd_vals).all():
+                        traces.append(
+                            _sd_band_trace(
+                                trace_type, time_vals, mean_vals, sd_vals, _to_rgba(color, 0.12)
                             )
-                    if any("growth rate" in c.lower() for c in results_df.columns):
-                        per_label = "per hour" if target_time_unit == "hours" else "per min"
-                        results_df = results_df.rename(
-                            columns={
-                                c: f"Growth rate ({per_label})"
-                                for c in results_df.columns
-                                if "growth rate" in c.lower()
-                            }
-                        )
-                    if any("doubling time" in c.lower() for c in results_df.columns):
-                        dt_label = "hours" if target_time_unit == "hours" else "min"
-                        results_df = results_df.rename(
-                            columns={
-                                c: f"Doubling time ({dt_label})"
-                                for c in results_df.columns
-                                if "doubling time" in c.lower()
-                            }
-                        )
-                    if any("auc" in c.lower() for c in results_df.columns):
-                        auc_label = "OD*hour" if target_time_unit == "hours" else "OD*min"
-                        results_df = results_df.rename(
-                            columns={
-                                c: f"AUC ({auc_label})"
-                                for c in results_df.columns
-                                if "auc" in c.lower()
-                            }
                         )
-                # Ensure unique column names to avoid concat errors after renames.
-                results_df = _dedupe_columns(results_df)
-                missing = required_cols - set(results_df.columns)
-                if missing:
-                    compare_warnings.append(
-                        f"{run['name']}: missing columns {', '.join(sorted(missing))}"
-                    )
-                    continue
-                results_df["run"] = run["name"]
-                combined_frames.append(results_df)
-            if compare_warnings:
-                st.warning("Some runs were skipped:")
-                for msg in compare_warnings:
-                    st.write(f"- {msg}")
-            if time_unit_warnings:
-                st.warning("Some runs did not include time units:")
-                for msg in time_unit_warnings:
-                    st.write(f"- {msg}")
-            rename_map = {}
-            if combined_frames:
-                combined_compare = pd.concat(combined_frames, ignore_index=True)
-                combined_compare = _dedupe_columns(combined_compare)
-                treatments = sorted(combined_compare["treatment"].dropna().unique().tolist())
-                with st.expander("Rename treatments (optional)", expanded=False):
-                    st.caption("Provide display names used in comparison tables and plots.")
-                    for treatment in treatments:
-                        rename_map[treatment] = st.text_input(
-                            f"Rename {treatment}",
-                            value=str(treatment),
-                            key=f"rename_{treatment}",
+                    traces.append(
+                        dict(
+                            type=trace_type,
+                            x=time_vals,
+                            y=mean_vals,
+                            mode="lines",
+                            name=line_name,
+                            line=dict(color=color, **run_styles[run]),
                         )
-                combined_compare["treatment_display"] = combined_compare["treatment"].map(rename_map)
-                combined_compare = combined_compare.sort_values(["treatment_display", "run"])
-                st.markdown("### Comparison table")
-                st.dataframe(combined_compare)
-                st.markdown("### Summary by treatment")
-                numeric_compare = combined_compare.copy()
-                non_numeric_cols = {"treatment", "replicate", "run", "treatment_display"}
-                for col in numeric_compare.columns:
-                    if col in non_numeric_cols:
-                        continue
-                    numeric_compare[col] = pd.to_numeric(numeric_compare[col], errors="coerce")
-                numeric_cols = [
-                    c
-                    for c in numeric_compare.columns
-                    if c not in non_numeric_cols and numeric_compare[c].notna().any()
-                ]
-                if numeric_cols:
-                    summary = (
-                        numeric_compare.groupby(["run", "treatment_display"])[numeric_cols]
-                        .mean()
-                        .reset_index()
                     )
-                    summary = summary.sort_values(["treatment_display", "run"])
-                    st.dataframe(summary)
-                    metric_options = [c for c in numeric_cols if c not in ("n", "window_start", "window_end")]
-                    if metric_options:
-                        st.markdown("### Compare a metric across runs")
-                        metric = st.selectbox("Metric", options=metric_options)
-                        treatments = summary["treatment_display"].dropna().unique().tolist()
-                        selected_treatments = st.multiselect(
-                            "Treatments to compare",
-                            options=sorted(treatments),
-                            default=sorted(treatments)[:3],
-                        )
-                        if selected_treatments:
-                            plot_df = summary[summary["treatment_display"].isin(selected_treatments)]
-                            fig = go.Figure()
-                            for treatment in selected_treatments:
-                                subset = plot_df[plot_df["treatment_display"] == treatment]
-                                fig.add_trace(
-                                    go.Bar(
-                                        x=subset["run"],
-                                        y=subset[metric],
-                                        name=str(treatment),
-                                    )
-                                )
-                            fig.update_layout(barmode="group")
-                            _style_plot(fig, f"{metric} by run", "Run", metric, show_grid=False)
-                            st.plotly_chart(fig, width="stretch", key="compare_metric_plot")
-                else:
-                    st.info("No numeric columns available for summary.")
-            curve_runs = [run for run in compare_runs if run.get("long_df") is not None]
-            if curve_runs:
-                st.markdown("### Compare growth curves")
-                st.caption(
-                    "Uses long_df.csv from each zip. Enable in Downloads when exporting. "
-                    f"Curves are converted to {target_time_unit}."
-                )
-                show_sd_compare = st.checkbox("Show SD band", value=True, key="compare_show_sd")
-                custom_ticks_compare = st.checkbox(
-                    "Custom tick intervals",
-                    value=False,
-                    key="compare_custom_ticks",
+                fig = go.Figure(data=traces)
+                _style_plot(
+                    fig,
+                    "Growth curves across runs",
+                    f"Time ({target_time_unit})",
+                    y_label,
+                    show_grid=False,
                 )
-                x_tick_interval_compare = None
-                y_tick_interval_compare = None
-                if custom_ticks_compare:
-                    x_tick_interval_compare = st.number_input(
-                        "X-axis tick interval",
-                        min_value=0.001,
-                        value=5.0,
-                        key="compare_x_tick_interval",
-                    )
-                    y_tick_interval_compare = st.number_input(
-                        "Y-axis tick interval",
-                        min_value=0.001,
-                        value=0.1,
-                        key="compare_y_tick_interval",
-                    )
-                run_labels = [run["name"] for run in curve_runs]
-                selected_runs = st.multiselect(
-                    "Runs to compare",
-                    options=run_labels,
-                    default=run_labels,
-                    key="compare_runs_select",
+                _apply_tick_intervals(fig, x_tick_interval_compare, y_tick_interval_compare)
+                st.plotly_chart(fig, width="stretch", key="compare_growth_curves")
+                html = pio.to_html(fig, full_html=False, include_plotlyjs="cdn")
+                st.download_button(
+                    "Download comparison plot (HTML)",
+                    data=html,
+                    file_name="odyssey_compare_growth_curves.html",
+                    mime="text/html",
+                    key="download_compare_growth_curves",
                 )
-                all_treatments = sorted(
+
+
+@st.fragment
+def _results_section(analyses, results, time_unit, available_cols):
+    plot_artifacts = []
+    st.subheader("Fit results")
+    st.dataframe(results)
+    st.markdown(
+        "Fit definitions: "
+        "**N** = number of points in the fit window; "
+        "**Growth rate** = growth rate from the selected fit window (slope of ln(OD) vs time); "
+        "**R<sup>2</sup>** = coefficient of determination for the linear fit; "
+        "**Doubling time** = time for OD to double; "
+        "**AUC** = area under the curve; "
+        "**Exponential window start/end** = time range used for the fit; "
+        "**QC flags** = failed QC rules (set under Analysis settings); "
+        "**QC mask** = the same rules as bits for filtering "
+        "(1 low R<sup>2</sup>, 2 non-positive rate, 4 few points, 8 saturated, "
+        "16 blank drift, 32 wide CI, 64 replicate CV, 128 replicate outlier).",
+        unsafe_allow_html=True,
+    )
+    st.subheader("Growth curves")
+    treatments = sorted(
+        pd.concat([a["mean_df"]["treatment"] for a in analyses]).dropna().unique().tolist()
+    )
+    if not treatments:
+        st.info("No treatments available to plot.")
+    else:
+        if "plot_groups" not in st.session_state:
+            st.session_state.plot_groups = []
+        if "plot_group_label" not in st.session_state:
+            st.session_state.plot_group_label = ""
+        if "plot_group_treatments" not in st.session_state:
+            st.session_state.plot_group_treatments = []
+        if "plot_group_use_custom_labels" not in st.session_state:
+            st.session_state.plot_group_use_custom_labels = False
+        if "plot_group_title" not in st.session_state:
+            st.session_state.plot_group_title = ""
+        if "plot_group_x_label" not in st.session_state:
+            st.session_state.plot_group_x_label = ""
+        if "plot_group_y_label" not in st.session_state:
+            st.session_state.plot_group_y_label = ""
+        st.markdown("Create one or more plot groups for overlay comparison.")
+        default_x_label = f"Time ({_base_time_unit(time_unit)})"
+        default_y_label = "OD"
+        if not st.session_state.plot_x_label:
+            st.session_state.plot_x_label = default_x_label
+        if not st.session_state.plot_y_label:
+            st.session_state.plot_y_label = default_y_label
+        st.markdown("**Global labels**")
+        st.text_input("Global plot title", key="plot_title")
+        st.text_input("Global x-axis label", key="plot_x_label")
+        st.text_input("Global y-axis label", key="plot_y_label")
+        st.markdown("**Plot group labels**")
+        st.text_input("Plot group label (optional)", key="plot_group_label")
+        st.multiselect("Treatments for this group", options=treatments, key="plot_group_treatments")
+        st.checkbox("Use custom labels for this plot group", key="plot_group_use_custom_labels")
+        if st.session_state.plot_group_use_custom_labels:
+            st.text_input("Group plot title", key="plot_group_title")
+            st.text_input("Group x-axis label", key="plot_group_x_label")
+            st.text_input("Group y-axis label", key="plot_group_y_label")
+        def _add_plot_group():
+            if st.session_state.plot_group_treatments:
+                st.session_state.plot_groups.append(
                     {
-                        t
-                        for run in curve_runs
-                        for t in run["long_df"]["treatment"].dropna().unique().tolist()
+                        "label": st.session_state.plot_group_label,
+                        "treatments": list(st.session_state.plot_group_treatments),
+                        "use_custom_labels": st.session_state.plot_group_use_custom_labels,
+                        "title": st.session_state.plot_group_title,
+                        "x_label": st.session_state.plot_group_x_label,
+                        "y_label": st.session_state.plot_group_y_label,
                     }
                 )
-                selected_treatments = st.multiselect(
-                    "Treatments to plot",
-                    options=all_treatments,
-                    default=all_treatments[:3],
-                    key="compare_treatments_select",
-                )
-                if not rename_map:
-                    rename_map = {treatment: treatment for treatment in all_treatments}
-                if selected_runs and selected_treatments:
-                    curves = []
-                    for run in curve_runs:
-                        if run["name"] not in selected_runs:
-                            continue
-                        df = run["long_df"].copy()
-                        run_config = run.get("config") or {}
-                        run_time_unit = run_config.get("time_unit")
-                        if run_time_unit:
-                            run_base_unit = _base_time_unit(run_time_unit)
-                        else:
-                            run_base_unit = target_time_unit
-                        if run_base_unit != target_time_unit:
-                            df["time"] = _convert_duration(
-                                pd.to_numeric(df["time"], errors="coerce"),
-                                run_base_unit,
-                                target_time_unit,
-                            )
-                        df["run"] = run["name"]
-                        curves.append(df)
-                    curves_df = pd.concat(curves, ignore_index=True)
-                    curves_df = curves_df[curves_df["treatment"].isin(selected_treatments)]
-                    grouped = (
-                        curves_df.groupby(["run", "treatment", "time"])["od"]
-                        .agg(mean="mean", sd=lambda x: x.std(ddof=1))
-                        .reset_index()
-                        .sort_values(["treatment", "run", "time"])
-                    )
-                    fig = go.Figure()
-                    color_cycle = pc.qualitative.Plotly
-                    run_styles = {}
-                    for idx, run in enumerate(selected_runs):
-                        run_styles[run] = dict(dash="solid" if idx % 2 == 0 else "dot")
-                    for idx, treatment in enumerate(selected_treatments):
-                        color = color_cycle[idx % len(color_cycle)]
-                        subset = grouped[grouped["treatment"] == treatment]
-                        for run in selected_runs:
-                            run_subset = subset[subset["run"] == run]
-                            if run_subset.empty:
-                                continue
-                            line_name = f"{rename_map.get(treatment, treatment)} - {run}"
-                            if show_sd_compare and not run_subset["sd"].isna().all():
-                                upper = run_subset["mean"] + run_subset["sd"]
-                                lower = run_subset["mean"] - run_subset["sd"]
-                                fig.add_trace(
-                                    go.Scatter(
-                                        x=run_subset["time"],
-                                        y=lower,
-                                        mode="lines",
-                                        line=dict(width=0),
-                                        showlegend=False,
-                                        hoverinfo="skip",
-                                    )
-                                )
-                                fig.add_trace(
-                                    go.Scatter(
-                                        x=run_subset["time"],
-                                        y=upper,
-                                        mode="lines",
-                                        line=dict(width=0),
-                                        fill="tonexty",
-                                        fillcolor=_to_rgba(color, 0.12),
-                                        showlegend=False,
-                                        hoverinfo="skip",
-                                    )
-                                )
-                            fig.add_trace(
-                                go.Scatter(
-                                    x=run_subset["time"],
-                                    y=run_subset["mean"],
-                                    mode="lines",
-                                    name=line_name,
-                                    line=dict(color=color, **run_styles[run]),
-                                )
-                            )
-                    _style_plot(
-                        fig,
-                        "Growth curves across runs",
-                        f"Time ({target_time_unit})",
-                        "OD",
-                        show_grid=False,
-                    )
-                    _apply_tick_intervals(fig, x_tick_interval_compare, y_tick_interval_compare)
-                    st.plotly_chart(fig, width="stretch", key="compare_growth_curves")
-                    html = pio.to_html(fig, full_html=False, include_plotlyjs="cdn")
-                    st.download_button(
-                        "Download comparison plot (HTML)",
-                        data=html,
-                        file_name="odyssey_compare_growth_curves.html",
-                        mime="text/html",
-                        key="download_compare_growth_curves",
-                    )
-    st.divider()
-    st.subheader("Run analysis")
-    st.caption("Analyze a single Excel file and generate plots, reports, and exports.")
-    excel_upload = st.file_uploader("Upload Excel file", type=["xlsx", "xls"], accept_multiple_files=False)
-    if not excel_upload:
+                st.session_state.plot_group_label = ""
+                st.session_state.plot_group_treatments = []
+                st.session_state.plot_group_use_custom_labels = False
+                st.session_state.plot_group_title = ""
+                st.session_state.plot_group_x_label = ""
+                st.session_state.plot_group_y_label = ""
+        st.button("Add plot group", on_click=_add_plot_group)
+        if st.session_state.plot_groups:
+            st.write("Plot groups")
+            st.dataframe(pd.DataFrame(st.session_state.plot_groups))
+            if st.button("Clear plot groups"):
+                st.session_state.plot_groups = []
+        plot_mode_options = [
+            "Overlay (compare treatments)",
+            "Small multiples",
+            "Plate heatmap (per-well metrics)",
+            "No plots",
+        ]
+        if len(analyses) > 1:
+            plot_mode_options.insert(2, "Compare runs (same treatment)")
+        if analyses[0].get("mu_trace") is not None:
+            plot_mode_options.insert(-1, "Local growth rate mu(t)")
+        if analyses[0].get("window_sweep") is not None:
+            plot_mode_options.insert(-1, "Fit-window sweep (mu heatmap)")
+        try:
+            plot_mode_index = plot_mode_options.index(st.session_state.plot_mode)
+        except ValueError:
+            plot_mode_index = 0
+        plot_mode = st.selectbox(
+            "Plot layout",
+            options=plot_mode_options,
+            index=plot_mode_index,
+            key="plot_mode",
+        )
+        show_sd = st.checkbox("Show SD band", key="show_sd")
+        plots_per_row = st.number_input(
+            "Charts per row",
+            min_value=1,
+            max_value=4,
+            key="plots_per_row",
+        )
+        render_mode = st.selectbox(
+            "Rendering",
+            options=list(RENDER_MODES),
+            format_func=lambda mode: {
+                "auto": f"Auto (WebGL above {WEBGL_POINT_THRESHOLD} points)",
+                "svg": "SVG",
+                "webgl": "WebGL",
+            }[mode],
+            key="plot_render_mode",
+            help=f"Curves longer than {DEFAULT_MAX_POINTS} points are downsampled (LTTB) before plotting.",
+        )
+        custom_ticks = st.checkbox("Custom tick intervals", value=False, key="plot_custom_ticks")
+        x_tick_interval = None
+        y_tick_interval = None
+        if custom_ticks:
+            x_tick_interval = st.number_input(
+                "X-axis tick interval",
+                min_value=0.001,
+                value=5.0,
+                key="plot_x_tick_interval",
+            )
+            y_tick_interval = st.number_input(
+                "Y-axis tick interval",
+                min_value=0.001,
+                value=0.1,
+                key="plot_y_tick_interval",
+            )
+        if "compare_treatment" not in st.session_state:
+            st.session_state.compare_treatment = treatments[0] if treatments else ""
+        if plot_mode == "Compare runs (same treatment)":
+            st.session_state.compare_treatment = st.selectbox(
+                "Treatment to compare across runs",
+                options=treatments,
+                index=treatments.index(st.session_state.compare_treatment)
+                if st.session_state.compare_treatment in treatments
+                else 0,
+            )
+        plot_groups = st.session_state.plot_groups or [{"label": "All treatments", "treatments": treatments}]
+        if plot_mode == "Plate heatmap (per-well metrics)":
+            # The display results stack the analyses in order; the heatmap shows one run's plate.
+            plate_index = 0
+            if len(analyses) > 1:
+                plate_index = st.selectbox(
+                    "Run",
+                    options=list(range(len(analyses))),
+                    format_func=lambda idx: str(analyses[idx]["results"]["run"].iloc[0])
+                    if "run" in analyses[idx]["results"].columns and len(analyses[idx]["results"])
+                    else f"Run {idx + 1}",
+                    key="plate_run",
+                )
+            plate_start = sum(len(a["results"]) for a in analyses[:plate_index])
+            plate_results = results.iloc[plate_start : plate_start + len(analyses[plate_index]["results"])]
+            well_df = _well_metric_frame(
+                plate_results,
+                _build_column_map(available_cols, st.session_state.replicate_groups),
+                treatment_col="Treatment",
+                replicate_col="Replicate",
+            )
+            if well_df.empty:
+                st.info("No well IDs (e.g. A1..P24) could be inferred from the data column names.")
+            else:
+                plate_metric_options = [
+                    c
+                    for c in results.columns
+                    if c.startswith(("Growth rate", "Doubling time", "AUC (", "R\u00B2", "QC flags"))
+                ]
+                plate_metric = st.selectbox("Plate metric", options=plate_metric_options, key="plate_metric")
+                well_df["analysis"] = plate_index
+                fig = _plot_plate_heatmap(
+                    well_df,
+                    plate_metric,
+                    treatment_col="Treatment",
+                    replicate_col="Replicate",
+                    run_col="analysis",
+                )
+                _style_plot(fig, f"{plate_metric} by well", "", "", show_grid=False)
+                plate_event = st.plotly_chart(
+                    fig,
+                    width="stretch",
+                    key="plate_heatmap",
+                    on_select="rerun",
+                    selection_mode="points",
+                )
+                plate_points = plate_event.selection.get("points", []) if plate_event else []
+                selected_wells = [p["customdata"] for p in plate_points if p.get("customdata")]
+                if selected_wells:
+                    well, treatment, replicate, analysis_idx = selected_wells[0][:4]
+                    well_fig = _plot_well_curve(
+                        analyses[int(analysis_idx)]["long_df"], treatment, replicate, well=well
+                    )
+                    _style_plot(
+                        well_fig,
+                        well_fig.layout.title.text,
+                        st.session_state.plot_x_label,
+                        st.session_state.plot_y_label,
+                        show_grid=False,
+                    )
+                    st.plotly_chart(well_fig, width="stretch", key="plate_well_curve")
+                else:
+                    st.caption("Click a well to load its growth curve.")
+                plot_artifacts.append(("Plate heatmap", _prepare_download_figure(fig)))
+        elif plot_mode == "Fit-window sweep (mu heatmap)":
+            sweep_summary = _sweep_summary(analyses[0]["window_sweep"])
+            sweep_treatments = [t for t in treatments if t in set(sweep_summary["treatment"])]
+            if not sweep_treatments:
+                st.info("No well had enough reads in any swept window.")
+            else:
+                rate_unit = _base_time_unit(time_unit).rstrip("s")
+                sweep_metrics = {
+                    f"Mean growth rate (per {rate_unit})": "mu",
+                    "Replicate CV of growth rate": "mu_cv",
+                    "Mean R\u00B2": "r2",
+                }
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    sweep_treatment = st.selectbox("Treatment", options=sweep_treatments, key="sweep_treatment")
+                with col_b:
+                    sweep_label = st.selectbox("Sweep metric", options=list(sweep_metrics), key="sweep_metric")
+                fig = _plot_window_sweep(
+                    sweep_summary,
+                    sweep_treatment,
+                    metric=sweep_metrics[sweep_label],
+                    label=sweep_label,
+                    chosen_window=st.session_state.get("fit_window_range"),
+                )
+                _style_plot(fig, f"{sweep_treatment}: {sweep_label} by fit window", "Window end", "Window start")
+                st.plotly_chart(fig, width="stretch", key="window_sweep_plot")
+                st.caption(
+                    "Each cell refits every replicate on reads between the window start and end; "
+                    "a flat region means the growth rate does not depend on the exact window."
+                )
+                plot_artifacts.append(("Fit-window sweep", _prepare_download_figure(fig)))
+        elif plot_mode != "No plots":
+            for idx, group in enumerate(plot_groups, start=1):
+                selected = [t for t in group["treatments"] if t in treatments]
+                if not selected:
+                    continue
+                label = group.get("label") or f"Plot group {idx}"
+                st.markdown(f"### {label}")
+                use_custom = group.get("use_custom_labels", False)
+                title = group.get("title") if use_custom else st.session_state.plot_title
+                x_label = group.get("x_label") if use_custom else st.session_state.plot_x_label
+                y_label = group.get("y_label") if use_custom else st.session_state.plot_y_label
+                if not title:
+                    title = st.session_state.plot_title
+                if not x_label:
+                    x_label = st.session_state.plot_x_label
+                if not y_label:
+                    y_label = st.session_state.plot_y_label
+                if plot_mode == "Overlay (compare treatments)":
+                    mean_df = analyses[0]["mean_df"]
+                    fig = _plot_overlay(mean_df, selected, show_sd=show_sd, render_mode=render_mode)
+                elif plot_mode == "Local growth rate mu(t)":
+                    # Replicate mean and SD of the sliding-window rate at each window centre
+                    # (time base unit), drawn like the OD overlay.
+                    mu_mean_df = _mean_sd_by_treatment_time(
+                        analyses[0]["mu_trace"].rename(columns={"mu": "od"})
+                    )
+                    fig = _plot_overlay(mu_mean_df, selected, show_sd=show_sd, render_mode=render_mode)
+                    y_label = f"Local growth rate (per {_base_time_unit(time_unit).rstrip('s')})"
+                elif plot_mode == "Small multiples":
+                    mean_df = analyses[0]["mean_df"]
+                    fig = _plot_small_multiples(
+                        mean_df,
+                        selected,
+                        cols_per_row=int(plots_per_row),
+                        show_sd=show_sd,
+                        x_label=x_label,
+                        y_label=y_label,
+                        render_mode=render_mode,
+                    )
+                else:
+                    treatment_choice = st.session_state.compare_treatment or selected[0]
+                    fig = _plot_compare_runs(
+                        analyses, treatment_choice, show_sd=show_sd, render_mode=render_mode
+                    )
+                _style_plot(fig, title, x_label, y_label, show_grid=False)
+                _apply_tick_intervals(fig, x_tick_interval, y_tick_interval)
+                st.plotly_chart(fig, width="stretch", key=f"plot_group_{idx}")
+                download_fig = _prepare_download_figure(fig)
+                _apply_tick_intervals(download_fig, x_tick_interval, y_tick_interval)
+                html = pio.to_html(download_fig, full_html=False, include_plotlyjs="cdn")
+                st.download_button(
+                    "Download interactive plot (HTML)",
+                    data=html,
+                    file_name=f"odyssey_plot_{idx}.html",
+                    mime="text/html",
+                    key=f"download_plot_{idx}",
+                )
+                plot_artifacts.append((label, download_fig))
+    st.session_state.plot_artifacts = plot_artifacts
+
+
+@st.fragment
+def _downloads_section(analyses, results, config_settings):
+    st.subheader("Downloads")
+    st.caption("Select what you want and download as a single zip.")
+    if "download_ready" not in st.session_state:
+        st.session_state.download_ready = False
+    download_results = st.checkbox("Results CSV", value=True)
+    download_long_df = st.checkbox("Long format CSV", value=False)
+    download_config = st.checkbox("Config JSON", value=True)
+    download_plots = st.checkbox("Plots (HTML)", value=True)
+    download_trace = st.checkbox("Stage trace (JSON)", value=False)
+    st.caption(
+        "Note: ZIP exports include only HTML plots. PNGs must be downloaded individually from each plot above. "
+        "For comparing runs, the Long format CSV is needed; PNG/PDF are not required."
+    )
+    plot_artifacts = st.session_state.get("plot_artifacts", [])
+    plot_labels = [label for label, _ in plot_artifacts]
+    selected_plots = plot_labels
+    if download_plots:
+        with st.expander("Select specific plots", expanded=False):
+            st.caption("Leave empty to include all plots.")
+            selected_plots = st.multiselect(
+                "Plots to include",
+                options=plot_labels,
+                default=[],
+            )
+    config_filename = "odyssey_config.json"
+    zip_filename = "odyssey_downloads.zip"
+    config_payload = _build_config(
+        **config_settings,
+        plot_groups=st.session_state.plot_groups,
+        plot_mode=st.session_state.plot_mode,
+        show_sd=st.session_state.show_sd,
+        charts_per_row=st.session_state.plots_per_row,
+        plot_labels={
+            "title": st.session_state.plot_title,
+            "x_label": st.session_state.plot_x_label,
+            "y_label": st.session_state.plot_y_label,
+        },
+        render_mode=st.session_state.plot_render_mode,
+    )
+    st.caption("Build the zip, then click download.")
+    if "download_zip_bytes" not in st.session_state:
+        st.session_state.download_zip_bytes = None
+    if "download_zip_name" not in st.session_state:
+        st.session_state.download_zip_name = None
+    if "download_zip_error" not in st.session_state:
+        st.session_state.download_zip_error = None
+
+    progress_log = st.empty()
+    progress_bar = st.progress(0)
+    progress_stage = st.empty()
+    build_clicked = st.button("Build download zip", key="build_zip")
+    if build_clicked:
+        with st.spinner("Building zip..."):
+            try:
+                build_start = datetime.now()
+                prev_timings = st.session_state.get("download_zip_timings") or {}
+                st.session_state.download_zip_prev_total = prev_timings.get("total_s")
+
+                def _progress_cb(stage, done, total):
+                    progress_bar.progress(min(done / total, 1.0))
+                    elapsed = (datetime.now() - build_start).total_seconds()
+                    progress_stage.caption(
+                        f"Building: {stage} ({done}/{total}) • {elapsed:.1f}s"
+                    )
+                    progress_log.text("Building zip...")
+
+                zip_bytes, zip_name, build_warnings, build_timings = build_download_zip(
+                    results=results,
+                    analyses=analyses,
+                    plot_artifacts=plot_artifacts,
+                    config_payload=config_payload,
+                    config_filename=config_filename,
+                    download_results=download_results,
+                    download_long_df=download_long_df,
+                    download_config=download_config,
+                    download_plots=download_plots,
+                    selected_plots=selected_plots,
+                    zip_filename=zip_filename,
+                    download_trace=download_trace,
+                    canonical_results=_canonical_results(
+                        analyses,
+                        _base_time_unit(config_settings["time_unit"]),
+                        config_settings.get("qc_rules"),
+                    ),
+                    progress_cb=_progress_cb,
+                )
+                st.session_state.download_zip_bytes = zip_bytes
+                st.session_state.download_zip_name = zip_name
+                st.session_state.download_zip_timings = build_timings
+                st.session_state.download_zip_error = None
+                for msg in build_warnings:
+                    st.warning(msg)
+            except Exception as exc:
+                st.session_state.download_zip_error = str(exc)
+        # The download button below reads the fresh bytes in this same fragment run.
+        progress_log.empty()
+        progress_bar.empty()
+        progress_stage.empty()
+
+    if st.session_state.get("download_zip_error"):
+        st.error(f"Zip build failed: {st.session_state.download_zip_error}")
+    if st.session_state.get("download_zip_bytes"):
+        st.success("Zip ready for download.")
+        st.download_button(
+            "Download selected (zip)",
+            data=st.session_state.download_zip_bytes,
+            file_name=st.session_state.get("download_zip_name", "odyssey_downloads.zip"),
+            mime="application/zip",
+        )
+        st.caption(f"Zip size: {len(st.session_state.download_zip_bytes)} bytes")
+        timings = st.session_state.get("download_zip_timings")
+        if timings:
+            ordered = [
+                "config_json_s",
+                "results_csv_s",
+                "long_df_csv_s",
+                "plots_html_s",
+                "trace_json_s",
+                "total_s",
+            ]
+            progress_lines = []
+            total = timings.get("total_s") or max(timings.values())
+            for key in ordered:
+                if key not in timings:
+                    continue
+                progress_lines.append(f"{key}: {timings[key]:.2f}s")
+            st.caption("Build timings (s): " + ", ".join(progress_lines))
+    else:
+        st.info("Build a zip to enable the download button.")
+    traces = [analysis["trace"] for analysis in analyses if analysis.get("trace")]
+    if traces:
+        with st.expander("Analysis stage timings", expanded=False):
+            trace_df = pd.concat([_flatten_trace(trace) for trace in traces], ignore_index=True)
+            st.dataframe(trace_df.drop(columns=["depth"]), width="stretch", hide_index=True)
+
+
+def _blank_options_widgets(config, disabled):
+    defaults = (config.get("blank_options") if config else None) or {}
+    assignments = {"All selected blanks": "pooled", "Blanks in the same plate row": "row"}
+    estimates = {
+        "Per time point": "per_time",
+        "Mean of first N reads": "first_n",
+        "Moving average": "smoothed",
+    }
+    with st.expander("Blank options", expanded=False):
+        if defaults.get("assignment") == "map":
+            st.caption("Using the well → blank map from the uploaded config.")
+            assignment = "map"
+        else:
+            assignment_labels = list(assignments)
+            assignment_label = st.selectbox(
+                "Blank assignment",
+                options=assignment_labels,
+                index=list(assignments.values()).index(defaults.get("assignment", "pooled")),
+                disabled=disabled,
+                help="Row assignment uses blanks whose well ID shares the row; other wells use all blanks.",
+            )
+            assignment = assignments[assignment_label]
+        estimate_label = st.selectbox(
+            "Blank estimate",
+            options=list(estimates),
+            index=list(estimates.values()).index(defaults.get("estimate", "per_time")),
+            disabled=disabled,
+        )
+        estimate = estimates[estimate_label]
+        options = {"assignment": assignment, "estimate": estimate}
+        if estimate == "first_n":
+            options["first_n"] = int(
+                st.number_input(
+                    "Reads for blank level",
+                    min_value=1,
+                    value=int(defaults.get("first_n", 5)),
+                    disabled=disabled,
+                )
+            )
+        elif estimate == "smoothed":
+            options["window"] = int(
+                st.number_input(
+                    "Window (reads)",
+                    min_value=1,
+                    value=int(defaults.get("window", 5)),
+                    disabled=disabled,
+                )
+            )
+    if assignment == "map":
+        options["map"] = defaults.get("map") or {}
+    if options == {"assignment": "pooled", "estimate": "per_time"}:
+        return None
+    return options
+
+
+def _smoothing_widgets(config):
+    defaults = (config.get("smoothing") if config else None) or {}
+    st.markdown("### Smoothing")
+    methods = {
+        "None": None,
+        "Rolling median": "median",
+        "Savitzky\u2013Golay": "savgol",
+        "Robust LOWESS": "lowess",
+    }
+    default_method = defaults.get("method") if defaults.get("method") in SMOOTHING_METHODS else None
+    method = methods[
+        st.selectbox(
+            "Smooth OD curves before fitting",
+            options=list(methods),
+            index=list(methods.values()).index(default_method),
+            help="Applied to every well before window fits, milestones, AUC and plots.",
+        )
+    ]
+    if method is None:
+        return None
+    col_a, col_b = st.columns(2)
+    with col_a:
+        window_points = st.number_input(
+            "Smoothing window (reads, odd)",
+            min_value=3,
+            max_value=51,
+            step=2,
+            value=int(defaults.get("window_points", 5)),
+        )
+    options = {"method": method, "window_points": int(window_points) | 1}
+    with col_b:
+        if method == "savgol":
+            options["polyorder"] = int(
+                st.number_input(
+                    "Polynomial order",
+                    min_value=0,
+                    max_value=options["window_points"] - 1,
+                    value=min(int(defaults.get("polyorder", 2)), options["window_points"] - 1),
+                )
+            )
+        elif method == "lowess":
+            options["iterations"] = int(
+                st.number_input(
+                    "Robustness iterations", min_value=0, max_value=10, value=int(defaults.get("iterations", 2))
+                )
+            )
+    return options
+
+
+def _sliding_window_widgets(config):
+    defaults = (config.get("sliding_window") if config else None) or {}
+    st.markdown("### Sliding-window growth rate")
+    enabled = st.checkbox(
+        "Report the maximum local growth rate over a sliding window",
+        value=bool(defaults),
+        help="Fits ln(OD) over every run of k consecutive reads; the mu(t) trace can be plotted with the results.",
+    )
+    if not enabled:
+        return None
+    col_a, col_b = st.columns(2)
+    with col_a:
+        window_points = st.number_input(
+            "Window (reads)", min_value=3, max_value=200, value=int(defaults.get("window_points", 5))
+        )
+    with col_b:
+        min_od = st.number_input(
+            "Ignore reads below OD",
+            min_value=0.0,
+            value=float(defaults.get("min_od") or 0.0),
+            step=0.005,
+            format="%.3f",
+        )
+    return {"window_points": int(window_points), "min_od": float(min_od) or None}
+
+
+def _outlier_widgets(config):
+    defaults = (config.get("outliers") if config else None) or {}
+    st.markdown("### Replicate outliers")
+    enabled = st.checkbox(
+        "Flag replicates that disagree with their treatment",
+        value=bool(defaults),
+        help="Robust z-score of each replicate within its treatment; needs at least 3 replicates.",
+    )
+    if not enabled:
+        return None
+    methods = {"Curve distance to median": "curve", "Growth rate": "mu", "AUC": "auc"}
+    default_method = defaults.get("method") if defaults.get("method") in OUTLIER_METHODS else "curve"
+    col_a, col_b, col_c = st.columns(3)
+    with col_a:
+        method = methods[
+            st.selectbox(
+                "Score replicates by",
+                options=list(methods),
+                index=list(methods.values()).index(default_method),
+            )
+        ]
+    with col_b:
+        threshold = st.number_input(
+            "Robust z threshold",
+            min_value=1.0,
+            max_value=20.0,
+            step=0.5,
+            value=float(defaults.get("threshold", 3.5)),
+        )
+    with col_c:
+        exclude = st.checkbox(
+            "Exclude flagged replicates",
+            value=bool(defaults.get("exclude", False)),
+            help="Leaves them out of mean curves and the sliding-window, model and bootstrap fits.",
+        )
+    return {"method": method, "threshold": float(threshold), "exclude": bool(exclude)}
+
+
+def _qc_rule_widgets(config):
+    saved = (config.get("qc_rules") if config else None) or {}
+    defaults = {name: saved.get(name, default) for name, (_, default) in QC_RULES.items()}
+    with st.expander("QC rules"):
+        st.caption("Thresholds of 0 switch a rule off.")
+        col_a, col_b, col_c = st.columns(3)
+        with col_a:
+            min_r2 = st.number_input(
+                "Minimum R\u00B2", min_value=0.0, max_value=1.0, step=0.01, value=float(defaults["min_r2"] or 0.0)
+            )
+            min_points = st.number_input(
+                "Minimum window points", min_value=0, max_value=1000, value=int(defaults["min_points"] or 0)
+            )
+            non_positive_mu = st.checkbox("Flag non-positive growth rate", value=bool(defaults["non_positive_mu"]))
+        with col_b:
+            max_od = st.number_input(
+                "Saturation: max OD", min_value=0.0, step=0.1, value=float(defaults["max_od"] or 0.0)
+            )
+            max_blank_drift = st.number_input(
+                "Max blank drift (OD)",
+                min_value=0.0,
+                step=0.005,
+                format="%.3f",
+                value=float(defaults["max_blank_drift"] or 0.0),
+            )
+            replicate_outlier = st.checkbox("Flag replicate outliers", value=bool(defaults["replicate_outlier"]))
+        with col_c:
+            max_ci_width = st.number_input(
+                "Max CI width (fraction of rate)",
+                min_value=0.0,
+                step=0.05,
+                value=float(defaults["max_ci_width"] or 0.0),
+                help="Needs bootstrap confidence intervals.",
+            )
+            max_replicate_cv = st.number_input(
+                "Max replicate CV of rate",
+                min_value=0.0,
+                step=0.05,
+                value=float(defaults["max_replicate_cv"] or 0.0),
+            )
+    return {
+        "min_r2": float(min_r2) or None,
+        "non_positive_mu": bool(non_positive_mu),
+        "min_points": int(min_points) or None,
+        "max_od": float(max_od) or None,
+        "max_blank_drift": float(max_blank_drift) or None,
+        "max_ci_width": float(max_ci_width) or None,
+        "max_replicate_cv": float(max_replicate_cv) or None,
+        "replicate_outlier": bool(replicate_outlier),
+    }
+
+
+def _window_sweep_widgets(config, min_points):
+    defaults = (config.get("window_sweep") if config else None) or {}
+    st.markdown("### Fit-window sensitivity")
+    enabled = st.checkbox(
+        "Sweep growth rate over a grid of fit windows",
+        value=bool(defaults),
+        help="Fits every well on every (start, end) window of an even time grid and plots a heatmap per treatment.",
+    )
+    if not enabled:
+        return None
+    steps = st.number_input("Grid points", min_value=3, max_value=60, value=int(defaults.get("steps", 12)))
+    return {"steps": int(steps), "min_points": max(int(min_points), 3)}
+
+
+def _bootstrap_widgets(config):
+    defaults = (config.get("bootstrap") if config else None) or {}
+    st.markdown("### Uncertainty")
+    enabled = st.checkbox(
+        "Bootstrap confidence intervals for growth rate and doubling time",
+        value=bool(defaults),
+        help="Resamples the log-linear fit inside each well's exponential window.",
+    )
+    if not enabled:
+        return None
+    col_a, col_b, col_c = st.columns(3)
+    with col_a:
+        n_boot = st.number_input(
+            "Resamples", min_value=200, max_value=10000, step=100, value=int(defaults.get("n_boot", 1000))
+        )
+    with col_b:
+        method = st.selectbox(
+            "Resampling",
+            options=list(BOOTSTRAP_METHODS),
+            index=list(BOOTSTRAP_METHODS).index(defaults.get("method", "residual")),
+        )
+    with col_c:
+        ci = st.selectbox(
+            "Confidence level",
+            options=[0.9, 0.95, 0.99],
+            index=[0.9, 0.95, 0.99].index(defaults.get("ci", 0.95)),
+            format_func=lambda value: f"{value:.0%}",
+        )
+    return {"n_boot": int(n_boot), "method": method, "ci": ci}
+
+
+def _profile_mark(section):
+    profile = st.session_state.get("rerun_profile")
+    if profile is not None:
+        profile.mark(section)
+
+
+def _diagnostics_expander(log, latest):
+    with st.expander("Diagnostics (profiling)", expanded=False):
+        st.caption(
+            f"Profiling is on ({PROFILE_ENV_VAR}=1 or ?{PROFILE_QUERY_PARAM}=1). "
+            f"This rerun took {latest['wall_s']:.2f}s; fragment-only reruns are not captured."
+        )
+        st.dataframe(pd.DataFrame(latest["sections"]), width="stretch", hide_index=True)
+        st.markdown(f"**Slowest reruns** (last {MAX_LOGGED_RERUNS})")
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {
+                        "started_at": record["started_at"],
+                        "wall_s": record["wall_s"],
+                        "trigger": ", ".join(record["trigger"]),
+                    }
+                    for record in log
+                ]
+            ),
+            width="stretch",
+            hide_index=True,
+        )
+        st.download_button(
+            "Download profiling report",
+            data=_profile_report(log),
+            file_name="odyssey_profile.txt",
+            mime="text/plain",
+            on_click="ignore",
+            key="profiler_download",
+        )
+
+
+def _profiled_main():
+    if not _profiling_enabled(os.environ, st.query_params):
+        main()
+        return
+    # Compared with the state left by the previous rerun, so only the user's change shows up.
+    trigger = _changed_widgets(
+        st.session_state.get("profiler_last_snapshot", {}), _widget_snapshot(st.session_state)
+    )
+    profile = _RerunProfile(trigger)
+    st.session_state.rerun_profile = profile
+    profile.start()
+    try:
+        main()
+    finally:
+        record = profile.stop()
+        st.session_state.rerun_profile = None
+        st.session_state.profiler_last_snapshot = _widget_snapshot(st.session_state)
+        st.session_state.profiler_log = _record_rerun(st.session_state.get("profiler_log", []), record)
+    _diagnostics_expander(st.session_state.profiler_log, record)
+
+
+def main():
+    st.set_page_config(page_title=APP_TITLE, layout="wide")
+    st.title(APP_TITLE)
+    st.markdown(
+        """
+        <style>
+        /* Customize Streamlit's drag-drop text inside the upload box */
+        div[data-testid="stFileUploaderDropzone"] p {
+          visibility: hidden;
+          margin: 0;
+          height: 0;
+        }
+        div[data-testid="stFileUploaderDropzone"] p::before {
+          content: "Upload file - drag and drop files here";
+          visibility: visible;
+          display: block;
+          height: auto;
+          margin-bottom: 4px;
+          font-weight: 600;
+        }
+        div[data-testid="stFileUploaderDropzone"] small {
+          display: block;
+          margin-top: 0;
+        }
+        </style>
+        """,
+        unsafe_allow_html=True,
+    )
+    st.markdown(
+        "Learn more: [ODyssey home](https://srriash.github.io/ODyssey-Growth-curve-workbench/)"
+    )
+    _profile_mark("compare_runs")
+    _compare_runs_section()
+    st.divider()
+    _profile_mark("load_excel")
+    st.subheader("Run analysis")
+    st.caption("Analyze a single Excel file and generate plots, reports, and exports.")
+    excel_upload = st.file_uploader("Upload Excel file", type=["xlsx", "xls"], accept_multiple_files=False)
+    if not excel_upload:
         st.info("Upload an Excel file to continue analysis.")
         return
     st.caption(
@@ -450,20 +1495,18 @@ def main():
     )
     config_upload = st.file_uploader("Upload config (optional)", type=["json"])
     config = _safe_read_json(config_upload) if config_upload else None
+    excel_bytes = excel_upload.getvalue()
+    excel_hash = hashlib.sha256(excel_bytes).hexdigest()
     try:
-        xls = pd.ExcelFile(excel_upload)
+        sheet_names = _cached_excel_sheet_names(excel_hash, excel_bytes)
     except Exception as exc:
         st.error(f"Could not read Excel file: {exc}")
         return
-    sheet_names = xls.sheet_names
     default_sheet = config.get("sheet_name") if config else sheet_names[0]
     if default_sheet not in sheet_names:
         default_sheet = sheet_names[0]
     sheet_name = st.selectbox("Sheet", options=sheet_names, index=sheet_names.index(default_sheet))
-    try:
-        df = pd.read_excel(xls, sheet_name=sheet_name, mangle_dupe_cols=False)
-    except TypeError:
-        df = pd.read_excel(xls, sheet_name=sheet_name)
+    df = _cached_excel_sheet(excel_hash, sheet_name, excel_bytes)
     if df.empty:
         st.warning("The selected sheet is empty.")
         return
@@ -471,6 +1514,7 @@ def main():
     default_time = config.get("time_col") if config else time_candidates[0]
     if default_time not in df.columns:
         default_time = time_candidates[0]
+    _profile_mark("preview")
     st.subheader("Preview")
     col1, col2 = st.columns([2, 3])
     with col1:
@@ -483,7 +1527,7 @@ def main():
         )
         blank_candidates = [c for c in df.columns if c != time_col]
         blank_cols = []
-        working_df = df.copy()
+        blank_options = None
         if blank_candidates:
             default_blank_cols = []
             if config:
@@ -491,757 +1535,447 @@ def main():
                 if not default_blank_cols and config.get("blank_col"):
                     default_blank_cols = [config.get("blank_col")]
             default_blank_cols = [c for c in default_blank_cols if c in blank_candidates]
-            blank_cols = st.multiselect(
-                "Blank column(s)",
-                options=blank_candidates,
-                default=default_blank_cols,
-            )
-            if not blank_normalized and blank_cols:
-                working_df = apply_blank_normalization(df, time_col, blank_cols)
-            elif not blank_normalized and not blank_cols:
-                st.warning("Select at least one blank column for normalization.")
-        else:
-            if not blank_normalized:
-                st.warning("No columns available for blank normalization.")
-            blank_normalized = True
-        base_unit = _base_time_unit(time_unit)
-        fit_window_mode = "Auto+Manual"
-        min_points = int(config.get("min_points", 5)) if config else 5
-        time_window = None
-    preview_df = working_df.copy()
-    for col in preview_df.columns:
-        if preview_df[col].dtype == object:
-            sample = preview_df[col].dropna().head(5)
-            if any(isinstance(v, (datetime, pd.Timestamp)) for v in sample):
-                preview_df[col] = preview_df[col].astype(str)
-    st.dataframe(preview_df.head(10))
-    validation_issues = _validate_data(
-        working_df,
-        time_col=time_col,
-        data_cols=[c for c in working_df.columns if c != time_col],
-    )
-    if validation_issues:
-        st.warning("Data validation warnings:")
-        for issue in validation_issues[:10]:
-            st.write(f"- {issue}")
-    with col2:
-        config_map = config.get("column_map") if config else None
-        available_cols = [
-            c
-            for c in working_df.columns
-            if c != time_col and c not in set(blank_cols)
-        ]
-        if "replicate_groups" not in st.session_state:
-            st.session_state.replicate_groups = []
-        if "plot_groups" not in st.session_state:
-            st.session_state.plot_groups = []
-        if "plot_mode" not in st.session_state:
-            st.session_state.plot_mode = config.get("plot_mode") if config else "Overlay (compare treatments)"
-        if "show_sd" not in st.session_state:
-            st.session_state.show_sd = bool(config.get("show_sd")) if config else True
-        if "plots_per_row" not in st.session_state:
-            st.session_state.plots_per_row = (
-                int(config.get("charts_per_row"))
-                if config and config.get("charts_per_row")
-                else 2
-            )
-        if "plot_title" not in st.session_state:
-            st.session_state.plot_title = (
-                config.get("plot_labels", {}).get("title")
-                if config and config.get("plot_labels")
-                else "Growth curves (mean across replicates)"
-            )
-        if "plot_x_label" not in st.session_state:
-            st.session_state.plot_x_label = (
-                config.get("plot_labels", {}).get("x_label")
-                if config and config.get("plot_labels")
-                else "Time"
-            )
-        if "plot_y_label" not in st.session_state:
-            st.session_state.plot_y_label = (
-                config.get("plot_labels", {}).get("y_label")
-                if config and config.get("plot_labels")
-                else "OD"
-            )
-        if "analysis_ready" not in st.session_state:
-            st.session_state.analysis_ready = False
-        if "analysis_payload" not in st.session_state:
-            st.session_state.analysis_payload = {}
-        st.markdown("Select columns that are replicates, assign a treatment name, and add the group.")
-        if "rep_cols" not in st.session_state:
-            st.session_state.rep_cols = []
-        if "rep_name" not in st.session_state:
-            st.session_state.rep_name = ""
-        def _update_group_name():
-            st.session_state.rep_name = _suggest_treatment_name(st.session_state.rep_cols)
-        used_cols = set()
-        for group in st.session_state.replicate_groups:
-            used_cols.update(group.get("columns", []))
-        available_group_cols = [c for c in available_cols if c not in used_cols]
-        group_cols = st.multiselect(
-            "Replicate columns",
-            options=available_group_cols,
-            key="rep_cols",
-            on_change=_update_group_name,
-        )
-        group_name = st.text_input("Treatment name for selected replicates", key="rep_name")
-        def _add_group():
-            if st.session_state.rep_cols and st.session_state.rep_name:
-                st.session_state.replicate_groups.append(
-                    {
-                        "treatment": st.session_state.rep_name,
-                        "columns": list(st.session_state.rep_cols),
-                    }
-                )
-                st.session_state.rep_cols = []
-                st.session_state.rep_name = ""
-        st.button("Add replicate group", on_click=_add_group)
-        if st.session_state.replicate_groups:
-            st.write("Replicate groups")
-            st.dataframe(pd.DataFrame(st.session_state.replicate_groups))
-            if st.button("Clear replicate groups"):
-                st.session_state.replicate_groups = []
-        if config_map and not st.session_state.replicate_groups:
-            st.session_state.replicate_groups = [
-                {"treatment": row.get("treatment"), "columns": [row.get("column")]}
-                for row in config_map
-                if row.get("column") in available_cols
-            ]
-        if config and config.get("plot_groups") and not st.session_state.plot_groups:
-            st.session_state.plot_groups = config.get("plot_groups")
-        notes = st.text_area("Notes (saved into config)", value=(config.get("notes", "") if config else ""))
-    if blank_cols:
-        st.subheader("Blank control")
-        st.caption("Check for contamination by reviewing blank OD over time.")
-        try:
-            blank_time = _parse_time_series(df[time_col])
-            blank_time = _apply_time_unit(
-                blank_time, time_unit if time_unit != "hh:mm:ss" else "minutes"
-            )
-            fig = go.Figure()
-            for col in blank_cols:
-                fig.add_trace(
-                    go.Scatter(
-                        x=blank_time,
-                        y=pd.to_numeric(df[col], errors="coerce"),
-                        mode="lines",
-                        name=str(col),
-                    )
-                )
-            _style_plot(fig, "Blank OD over time", st.session_state.plot_x_label, "OD", show_grid=False)
-            if available_cols:
-                y_vals = working_df[available_cols].apply(pd.to_numeric, errors="coerce")
-                y_min = float(np.nanmin(y_vals.to_numpy())) if not y_vals.empty else None
-                y_max = float(np.nanmax(y_vals.to_numpy())) if not y_vals.empty else None
-                if y_min is not None and y_max is not None and np.isfinite(y_min) and np.isfinite(y_max):
-                    fig.update_yaxes(range=[y_min, y_max])
-            st.plotly_chart(fig, width="stretch", key="blank_control_plot")
-        except Exception as exc:
-            st.warning(f"Blank control preview unavailable: {exc}")
-    st.subheader("Analysis settings")
-    st.markdown("### Growth rate")
-    default_growth_unit = (config.get("growth_rate_unit") if config else None) or (
-        "1/min" if base_unit == "minutes" else "1/hour"
-    )
-    growth_rate_unit_options = {"min\u207B\u00B9": "1/min", "h\u207B\u00B9": "1/hour"}
-    default_growth_label = "min\u207B\u00B9" if default_growth_unit == "1/min" else "h\u207B\u00B9"
-    growth_rate_label = st.selectbox(
-        "Growth rate unit",
-        options=list(growth_rate_unit_options.keys()),
-        index=0 if default_growth_label == "min\u207B\u00B9" else 1,
-    )
-    growth_rate_unit = growth_rate_unit_options[growth_rate_label]
-    st.markdown("### Doubling time")
-    default_dt_unit = (config.get("doubling_time_unit") if config else None) or (
-        "min" if base_unit == "minutes" else "hour"
-    )
-    doubling_time_unit = st.selectbox(
-        "Doubling time unit",
-        options=["min", "hour"],
-        index=0 if default_dt_unit == "min" else 1,
-    )
-    st.subheader("Preview curves")
-    time_window = None
-    t_min = 0.0
-    t_max = 1.0
-    column_map = _build_column_map(available_cols, st.session_state.replicate_groups)
-    try:
-        with st.spinner("Preparing preview..."):
-            column_map_json = pd.DataFrame(column_map).to_json()
-            preview_mean_df, preview_long_df, t_min, t_max = _cached_preview_data(
-                excel_upload.getvalue(),
-                sheet_name,
-                time_col,
-                time_unit,
-                column_map_json,
-                blank_normalized,
-                blank_cols,
-            )
-            if preview_mean_df.empty:
-                st.warning("Preview unavailable: no data after parsing.")
-            else:
-                preview_treatments = sorted(preview_mean_df["treatment"].dropna().unique().tolist())
-                signature = (sheet_name, time_col, time_unit, column_map_json)
-                if st.session_state.get("preview_signature") != signature:
-                    st.session_state.preview_signature = signature
-                    st.session_state.preview_base_fig = _plot_overlay(
-                        preview_mean_df, preview_treatments, show_sd=True
-                    )
-                auto_window_range = (t_min, t_max)
-                try:
-                    mean_by_time = (
-                        preview_mean_df.groupby("time")["mean"]
-                        .mean()
-                        .reset_index()
-                        .sort_values("time")
-                    )
-                    time_vals = mean_by_time["time"].to_numpy(dtype=float)
-                    od_vals = mean_by_time["mean"].to_numpy(dtype=float)
-                    valid = np.isfinite(time_vals) & np.isfinite(od_vals) & (od_vals > 0)
-                    time_vals = time_vals[valid]
-                    od_vals = od_vals[valid]
-                    if len(time_vals) > 3:
-                        log_od = np.log(od_vals)
-                        slopes = np.diff(log_od) / np.diff(time_vals)
-                        if np.isfinite(slopes).any():
-                            max_slope = np.nanmax(slopes)
-                            thresh = 0.8 * max_slope
-                            start_idx = 0
-                            for idx, val in enumerate(slopes):
-                                if val >= thresh:
-                                    start_idx = idx
-                                    break
-                            start_time = float(time_vals[start_idx])
-                            span = float(t_max - t_min)
-                            end_time = min(t_max, start_time + 0.2 * span)
-                            auto_window_range = (start_time, end_time)
-                except Exception:
-                    auto_window_range = (t_min, t_max)
-                st.caption("Adjust the fit window as needed.")
-                time_window = st.slider(
-                    "Fit window range",
-                    min_value=t_min,
-                    max_value=t_max,
-                    value=auto_window_range,
-                    key="fit_window_range",
-                )
-                preview_fig = go.Figure(st.session_state.preview_base_fig)
-                preview_fig = _add_window_highlight(preview_fig, time_window)
-                _style_plot(
-                    preview_fig,
-                    st.session_state.plot_title,
-                    st.session_state.plot_x_label,
-                    st.session_state.plot_y_label,
-                    show_grid=False,
-                )
-                st.plotly_chart(preview_fig, width="stretch", key="preview_plot")
-                st.caption(f"Highlighted window: {time_window[0]:.2f} to {time_window[1]:.2f}.")
-                live_r2 = st.checkbox("Calculate R\u00B2 live (can be slow)", value=False)
-                if live_r2:
-                    r2_df = _window_r2_by_treatment(preview_long_df, time_window=time_window)
-                    if not r2_df.empty:
-                        r2_median = r2_df["r2"].median()
-                        r2_mean = r2_df["r2"].mean()
-                        st.caption(
-                            f"Median R\u00B2 in highlighted window: {r2_median:.3f} "
-                            f"(Mean: {r2_mean:.3f})"
-                        )
-                else:
-                    if st.button("Calculate R\u00B2 for highlighted window"):
-                        r2_df = _window_r2_by_treatment(preview_long_df, time_window=time_window)
-                        if not r2_df.empty:
-                            r2_median = r2_df["r2"].median()
-                            r2_mean = r2_df["r2"].mean()
-                            st.session_state.preview_r2_median = r2_median
-                            st.session_state.preview_r2_mean = r2_mean
-                    if "preview_r2_median" in st.session_state:
-                        st.caption(
-                            f"Median R\u00B2 in highlighted window: {st.session_state.preview_r2_median:.3f} "
-                            f"(Mean: {st.session_state.get('preview_r2_mean', float('nan')):.3f})"
-                        )
-    except Exception as exc:
-        st.warning(f"Preview unavailable: {exc}")
-    st.markdown("### AUC")
-    config_auc_unit = config.get("auc_unit") if config else None
-    if config_auc_unit == "OD*min":
-        config_auc_unit = "OD*min"
-    if config_auc_unit == "OD*hour":
-        config_auc_unit = "OD*hour"
-    default_auc_unit = config_auc_unit or (
-        "OD*min" if base_unit == "minutes" else "OD*hour"
-    )
-    auc_unit = st.selectbox(
-        "AUC unit",
-        options=["OD*min", "OD*hour"],
-        index=0 if default_auc_unit == "OD*min" else 1,
-    )
-    auc_mode = st.selectbox(
-        "AUC window",
-        options=["Full range", "Fit window", "Custom range"],
-        index=0
-        if (config.get("auc_mode") if config else "Full range") == "Full range"
-        else 1
-        if (config.get("auc_mode") if config else "") == "Fit window"
-        else 2,
-    )
-    auc_window = None
-    auc_highlight = None
-    auc_fig = None
-    if "preview_base_fig" in st.session_state:
-        auc_fig = go.Figure(st.session_state.preview_base_fig)
-    if auc_mode == "Custom range":
-        try:
-            auc_time = _parse_time_series(df[time_col])
-            auc_time = _apply_time_unit(
-                auc_time, time_unit if time_unit != "hh:mm:ss" else "minutes"
-            )
-            auc_time = auc_time.dropna()
-            if not auc_time.empty:
-                auc_min = float(auc_time.min())
-                auc_max = float(auc_time.max())
-            else:
-                auc_min, auc_max = 0.0, 1.0
-        except Exception:
-            auc_min, auc_max = 0.0, 1.0
-        default_auc = config.get("auc_window") if config else None
-        auc_default = (
-            tuple(default_auc) if isinstance(default_auc, list) and len(default_auc) == 2 else (auc_min, auc_max)
-        )
-        auc_window = st.slider(
-            "AUC range",
-            min_value=auc_min,
-            max_value=auc_max,
-            value=auc_default,
-            key="auc_window",
-        )
-        auc_highlight = auc_window
-        if auc_fig is not None:
-            auc_fig = _add_window_highlight_color(auc_fig, auc_window, "rgba(239,68,68,0.25)")
-    else:
-        if auc_mode == "Fit window":
-            auc_highlight = time_window
+            blank_cols = st.multiselect(
+                "Blank column(s)",
+                options=blank_candidates,
+                default=default_blank_cols,
+            )
+            blank_options = _blank_options_widgets(config, blank_normalized or not blank_cols)
+            if not blank_normalized and not blank_cols:
+                st.warning("Select at least one blank column for normalization.")
         else:
-            auc_highlight = (t_min, t_max)
-        if auc_fig is not None:
-            auc_fig = _add_window_highlight_color(auc_fig, auc_highlight, "rgba(255,193,7,0.2)")
-    if auc_fig is not None and auc_highlight is not None:
-        _style_plot(
-            auc_fig,
-            "AUC window preview",
-            st.session_state.plot_x_label,
-            st.session_state.plot_y_label,
-            show_grid=False,
-        )
-        st.plotly_chart(auc_fig, width="stretch", key="auc_preview_plot")
-    col_a, _ = st.columns([1, 1])
-    with col_a:
-        run_button = st.button("Run analysis", type="primary")
-    if run_button:
-        if not blank_normalized and not blank_cols:
-            st.error("Select blank columns or mark OD values as blank normalized before running analysis.")
-            return
-        if not available_cols:
-            st.error("No treatment columns selected.")
-            return
-        column_map = _build_column_map(available_cols, st.session_state.replicate_groups)
+            if not blank_normalized:
+                st.warning("No columns available for blank normalization.")
+            blank_normalized = True
         base_unit = _base_time_unit(time_unit)
-        target_mu_unit = "minutes" if growth_rate_unit == "1/min" else "hours"
-        target_dt_unit = "minutes" if doubling_time_unit == "min" else "hours"
-        with st.spinner("Running analysis..."):
-            analyses = []
-            errors = []
-            uploaded = excel_upload
-            try:
-                if auc_mode == "Full range":
-                    auc_use_window = None
-                elif auc_mode == "Fit window":
-                    auc_use_window = time_window
-                else:
-                    auc_use_window = auc_window
-                if auc_use_window is None:
-                    auc_time = _parse_time_series(df[time_col])
-                    auc_time = _apply_time_unit(
-                        auc_time, time_unit if time_unit != "hh:mm:ss" else "minutes"
-                    )
-                    auc_time = auc_time.dropna()
-                    if not auc_time.empty:
-                        auc_window_range = (float(auc_time.min()), float(auc_time.max()))
-                    else:
-                        auc_window_range = (np.nan, np.nan)
-                else:
-                    auc_window_range = (float(auc_use_window[0]), float(auc_use_window[1]))
-                analysis = analyze_file(
-                    uploaded,
-                    sheet_name,
-                    time_col,
-                    time_unit,
-                    column_map,
-                    time_window,
-                    False,
-                    min_points,
-                    blank_normalized,
-                    blank_cols,
-                    auc_window=auc_use_window,
-                )
-                analysis["results"]["run"] = uploaded.name
-                analyses.append(analysis)
-            except Exception as exc:
-                errors.append(str(exc))
-            if errors:
-                st.error("Some files could not be processed:")
-                for err in errors:
-                    st.write(f"- {err}")
-                if not analyses:
-                    return
-            combined_results = pd.concat([a["results"] for a in analyses], ignore_index=True)
-            combined_auc = pd.concat([a["auc"] for a in analyses], ignore_index=True)
-            combined_results = combined_results.merge(
-                combined_auc, on=["treatment", "replicate"], how="left"
+        fit_window_mode = "Auto+Manual"
+        min_points = int(config.get("min_points", 5)) if config else 5
+        time_window = None
+    working_df, validation_report = _cached_working_sheet(
+        excel_hash,
+        sheet_name,
+        time_col,
+        tuple(blank_cols) if not blank_normalized else (),
+        json.dumps(blank_options, sort_keys=True) if blank_options else None,
+        df,
+    )
+    preview_df = working_df.copy()
+    for col in preview_df.columns:
+        if preview_df[col].dtype == object:
+            sample = preview_df[col].dropna().head(5)
+            if any(isinstance(v, (datetime, pd.Timestamp)) for v in sample):
+                preview_df[col] = preview_df[col].astype(str)
+    st.dataframe(preview_df.head(10))
+    validation_columns = validation_report["columns"]
+    flagged_columns = validation_columns[
+        validation_columns[["missing", "non_numeric", "non_positive"]].sum(axis=1) > 0
+    ]
+    time_issues = _validation_messages(validation_report, include_columns=False)
+    if time_issues or not flagged_columns.empty:
+        st.warning("Data validation warnings:")
+        for issue in time_issues:
+            st.write(f"- {issue}")
+        if not flagged_columns.empty:
+            st.caption(f"{len(flagged_columns)} column(s) with missing, non-numeric or non-positive values:")
+            st.dataframe(flagged_columns, hide_index=True, width="stretch")
+    with col2:
+        config_map = config.get("column_map") if config else None
+        available_cols = [
+            c
+            for c in working_df.columns
+            if c != time_col and c not in set(blank_cols)
+        ]
+        if "replicate_groups" not in st.session_state:
+            st.session_state.replicate_groups = []
+        if "plot_groups" not in st.session_state:
+            st.session_state.plot_groups = []
+        if "plot_mode" not in st.session_state:
+            st.session_state.plot_mode = config.get("plot_mode") if config else "Overlay (compare treatments)"
+        if "show_sd" not in st.session_state:
+            st.session_state.show_sd = bool(config.get("show_sd")) if config else True
+        if "plot_render_mode" not in st.session_state:
+            config_render_mode = config.get("render_mode") if config else None
+            st.session_state.plot_render_mode = (
+                config_render_mode if config_render_mode in RENDER_MODES else "auto"
             )
-            results_display = combined_results.copy()
-            results_display["mu"] = _convert_growth_rate(results_display["mu"], base_unit, target_mu_unit)
-            results_display["doubling_time"] = _convert_duration(
-                results_display["doubling_time"], base_unit, target_dt_unit
+        if "plots_per_row" not in st.session_state:
+            st.session_state.plots_per_row = (
+                int(config.get("charts_per_row"))
+                if config and config.get("charts_per_row")
+                else 2
             )
-            target_auc_unit = "minutes" if auc_unit == "OD*min" else "hours"
-            results_display["auc"] = _convert_auc(results_display["auc"], base_unit, target_auc_unit)
-            mu_label = f"Growth rate ({growth_rate_label})"
-            dt_label = f"Doubling time ({doubling_time_unit})"
-            auc_label = f"AUC ({auc_unit})"
-            results_display = results_display.rename(
-                columns={"mu": mu_label, "doubling_time": dt_label, "auc": auc_label}
+        if "plot_title" not in st.session_state:
+            st.session_state.plot_title = (
+                config.get("plot_labels", {}).get("title")
+                if config and config.get("plot_labels")
+                else "Growth curves (mean across replicates)"
             )
-            results_display["AUC window start"] = auc_window_range[0]
-            results_display["AUC window end"] = auc_window_range[1]
-            results_display = _qc_flags(results_display, r2_threshold=0.9)
-            if "run" in results_display.columns:
-                results_display = results_display.drop(columns=["run"])
-            results_display = results_display.rename(
-                columns={
-                    "treatment": "Treatment",
-                    "replicate": "Replicate",
-                    "n": "N",
-                    "intercept": "Intercept",
-                    "r2": "R\u00B2",
-                    "window_start": "Exponential window start",
-                    "window_end": "Exponential window end",
-                    "qc_flags": "QC flags",
-                }
+        if "plot_x_label" not in st.session_state:
+            st.session_state.plot_x_label = (
+                config.get("plot_labels", {}).get("x_label")
+                if config and config.get("plot_labels")
+                else "Time"
             )
-            st.session_state.analysis_ready = True
-            st.session_state.analysis_payload = {
-                "analyses": analyses,
-                "results": results_display,
-            }
-    if not st.session_state.analysis_ready:
-        st.info("Run analysis to generate results and plots.")
-        return
-    analyses = st.session_state.analysis_payload["analyses"]
-    results = st.session_state.analysis_payload["results"]
-    st.subheader("Fit results")
-    st.dataframe(results)
-    st.markdown(
-        "Fit definitions: "
-        "**N** = number of points in the fit window; "
-        "**Growth rate** = growth rate from the selected fit window (slope of ln(OD) vs time); "
-        "**R<sup>2</sup>** = coefficient of determination for the linear fit; "
-        "**Doubling time** = time for OD to double; "
-        "**AUC** = area under the curve; "
-        "**Exponential window start/end** = time range used for the fit; "
-        "**QC flags** = low R<sup>2</sup> or non-positive growth rate.",
-        unsafe_allow_html=True,
-    )
-    st.subheader("Growth curves")
-    treatments = sorted(
-        pd.concat([a["mean_df"]["treatment"] for a in analyses]).dropna().unique().tolist()
-    )
-    if not treatments:
-        st.info("No treatments available to plot.")
-    else:
-        if "plot_groups" not in st.session_state:
-            st.session_state.plot_groups = []
-        if "plot_group_label" not in st.session_state:
-            st.session_state.plot_group_label = ""
-        if "plot_group_treatments" not in st.session_state:
-            st.session_state.plot_group_treatments = []
-        if "plot_group_use_custom_labels" not in st.session_state:
-            st.session_state.plot_group_use_custom_labels = False
-        if "plot_group_title" not in st.session_state:
-            st.session_state.plot_group_title = ""
-        if "plot_group_x_label" not in st.session_state:
-            st.session_state.plot_group_x_label = ""
-        if "plot_group_y_label" not in st.session_state:
-            st.session_state.plot_group_y_label = ""
-        st.markdown("Create one or more plot groups for overlay comparison.")
-        default_x_label = f"Time ({_base_time_unit(time_unit)})"
-        default_y_label = "OD"
-        if not st.session_state.plot_x_label:
-            st.session_state.plot_x_label = default_x_label
-        if not st.session_state.plot_y_label:
-            st.session_state.plot_y_label = default_y_label
-        st.markdown("**Global labels**")
-        st.text_input("Global plot title", key="plot_title")
-        st.text_input("Global x-axis label", key="plot_x_label")
-        st.text_input("Global y-axis label", key="plot_y_label")
-        st.markdown("**Plot group labels**")
-        st.text_input("Plot group label (optional)", key="plot_group_label")
-        st.multiselect("Treatments for this group", options=treatments, key="plot_group_treatments")
-        st.checkbox("Use custom labels for this plot group", key="plot_group_use_custom_labels")
-        if st.session_state.plot_group_use_custom_labels:
-            st.text_input("Group plot title", key="plot_group_title")
-            st.text_input("Group x-axis label", key="plot_group_x_label")
-            st.text_input("Group y-axis label", key="plot_group_y_label")
-        def _add_plot_group():
-            if st.session_state.plot_group_treatments:
-                st.session_state.plot_groups.append(
+        if "plot_y_label" not in st.session_state:
+            st.session_state.plot_y_label = (
+                config.get("plot_labels", {}).get("y_label")
+                if config and config.get("plot_labels")
+                else "OD"
+            )
+        if "analysis_ready" not in st.session_state:
+            st.session_state.analysis_ready = False
+        if "analysis_payload" not in st.session_state:
+            st.session_state.analysis_payload = {}
+        st.markdown("Select columns that are replicates, assign a treatment name, and add the group.")
+        if "rep_cols" not in st.session_state:
+            st.session_state.rep_cols = []
+        if "rep_name" not in st.session_state:
+            st.session_state.rep_name = ""
+        def _update_group_name():
+            st.session_state.rep_name = _suggest_treatment_name(st.session_state.rep_cols)
+        used_cols = set()
+        for group in st.session_state.replicate_groups:
+            used_cols.update(group.get("columns", []))
+        available_group_cols = [c for c in available_cols if c not in used_cols]
+        group_cols = st.multiselect(
+            "Replicate columns",
+            options=available_group_cols,
+            key="rep_cols",
+            on_change=_update_group_name,
+        )
+        group_name = st.text_input("Treatment name for selected replicates", key="rep_name")
+        def _add_group():
+            if st.session_state.rep_cols and st.session_state.rep_name:
+                st.session_state.replicate_groups.append(
                     {
-                        "label": st.session_state.plot_group_label,
-                        "treatments": list(st.session_state.plot_group_treatments),
-                        "use_custom_labels": st.session_state.plot_group_use_custom_labels,
-                        "title": st.session_state.plot_group_title,
-                        "x_label": st.session_state.plot_group_x_label,
-                        "y_label": st.session_state.plot_group_y_label,
+                        "treatment": st.session_state.rep_name,
+                        "columns": list(st.session_state.rep_cols),
                     }
                 )
-                st.session_state.plot_group_label = ""
-                st.session_state.plot_group_treatments = []
-                st.session_state.plot_group_use_custom_labels = False
-                st.session_state.plot_group_title = ""
-                st.session_state.plot_group_x_label = ""
-                st.session_state.plot_group_y_label = ""
-        st.button("Add plot group", on_click=_add_plot_group)
-        if st.session_state.plot_groups:
-            st.write("Plot groups")
-            st.dataframe(pd.DataFrame(st.session_state.plot_groups))
-            if st.button("Clear plot groups"):
-                st.session_state.plot_groups = []
-        plot_mode_options = ["Overlay (compare treatments)", "Small multiples", "No plots"]
-        if len(analyses) > 1:
-            plot_mode_options.insert(2, "Compare runs (same treatment)")
+                st.session_state.rep_cols = []
+                st.session_state.rep_name = ""
+        st.button("Add replicate group", on_click=_add_group)
+        if st.session_state.replicate_groups:
+            st.write("Replicate groups")
+            st.dataframe(pd.DataFrame(st.session_state.replicate_groups))
+            if st.button("Clear replicate groups"):
+                st.session_state.replicate_groups = []
+        if config_map and not st.session_state.replicate_groups:
+            st.session_state.replicate_groups = [
+                {"treatment": row.get("treatment"), "columns": [row.get("column")]}
+                for row in config_map
+                if row.get("column") in available_cols
+            ]
+        if config and config.get("plot_groups") and not st.session_state.plot_groups:
+            st.session_state.plot_groups = config.get("plot_groups")
+        notes = st.text_area("Notes (saved into config)", value=(config.get("notes", "") if config else ""))
+    if blank_cols:
+        st.subheader("Blank control")
+        st.caption("Check for contamination by reviewing blank OD over time.")
         try:
-            plot_mode_index = plot_mode_options.index(st.session_state.plot_mode)
-        except ValueError:
-            plot_mode_index = 0
-        plot_mode = st.selectbox(
-            "Plot layout",
-            options=plot_mode_options,
-            index=plot_mode_index,
-            key="plot_mode",
-        )
-        show_sd = st.checkbox("Show SD band", key="show_sd")
-        plots_per_row = st.number_input(
-            "Charts per row",
-            min_value=1,
-            max_value=4,
-            key="plots_per_row",
-        )
-        custom_ticks = st.checkbox("Custom tick intervals", value=False, key="plot_custom_ticks")
-        x_tick_interval = None
-        y_tick_interval = None
-        if custom_ticks:
-            x_tick_interval = st.number_input(
-                "X-axis tick interval",
-                min_value=0.001,
-                value=5.0,
-                key="plot_x_tick_interval",
-            )
-            y_tick_interval = st.number_input(
-                "Y-axis tick interval",
-                min_value=0.001,
-                value=0.1,
-                key="plot_y_tick_interval",
-            )
-        if "compare_treatment" not in st.session_state:
-            st.session_state.compare_treatment = treatments[0] if treatments else ""
-        if plot_mode == "Compare runs (same treatment)":
-            st.session_state.compare_treatment = st.selectbox(
-                "Treatment to compare across runs",
-                options=treatments,
-                index=treatments.index(st.session_state.compare_treatment)
-                if st.session_state.compare_treatment in treatments
-                else 0,
+            blank_time = _parse_time_series(df[time_col])
+            blank_time = _apply_time_unit(
+                blank_time, time_unit if time_unit != "hh:mm:ss" else "minutes"
             )
-        plot_groups = st.session_state.plot_groups or [{"label": "All treatments", "treatments": treatments}]
-        plot_artifacts = []
-        if plot_mode != "No plots":
-            for idx, group in enumerate(plot_groups, start=1):
-                selected = [t for t in group["treatments"] if t in treatments]
-                if not selected:
-                    continue
-                label = group.get("label") or f"Plot group {idx}"
-                st.markdown(f"### {label}")
-                use_custom = group.get("use_custom_labels", False)
-                title = group.get("title") if use_custom else st.session_state.plot_title
-                x_label = group.get("x_label") if use_custom else st.session_state.plot_x_label
-                y_label = group.get("y_label") if use_custom else st.session_state.plot_y_label
-                if not title:
-                    title = st.session_state.plot_title
-                if not x_label:
-                    x_label = st.session_state.plot_x_label
-                if not y_label:
-                    y_label = st.session_state.plot_y_label
-                if plot_mode == "Overlay (compare treatments)":
-                    mean_df = analyses[0]["mean_df"]
-                    fig = _plot_overlay(mean_df, selected, show_sd=show_sd)
-                elif plot_mode == "Small multiples":
-                    mean_df = analyses[0]["mean_df"]
-                    fig = _plot_small_multiples(
-                        mean_df,
-                        selected,
-                        cols_per_row=int(plots_per_row),
-                        show_sd=show_sd,
-                        x_label=x_label,
-                        y_label=y_label,
+            fig = go.Figure()
+            for col in blank_cols:
+                fig.add_trace(
+                    go.Scatter(
+                        x=blank_time,
+                        y=pd.to_numeric(df[col], errors="coerce"),
+                        mode="lines",
+                        name=str(col),
                     )
-                else:
-                    treatment_choice = st.session_state.compare_treatment or selected[0]
-                    fig = _plot_compare_runs(analyses, treatment_choice, show_sd=show_sd)
-                _style_plot(fig, title, x_label, y_label, show_grid=False)
-                _apply_tick_intervals(fig, x_tick_interval, y_tick_interval)
-                st.plotly_chart(fig, width="stretch", key=f"plot_group_{idx}")
-                download_fig = _prepare_download_figure(fig)
-                _apply_tick_intervals(download_fig, x_tick_interval, y_tick_interval)
-                html = pio.to_html(download_fig, full_html=False, include_plotlyjs="cdn")
-                st.download_button(
-                    "Download interactive plot (HTML)",
-                    data=html,
-                    file_name=f"odyssey_plot_{idx}.html",
-                    mime="text/html",
-                    key=f"download_plot_{idx}",
                 )
-                plot_artifacts.append((label, download_fig))
-    st.subheader("Downloads")
-    st.caption("Select what you want and download as a single zip.")
-    if "download_ready" not in st.session_state:
-        st.session_state.download_ready = False
-    download_results = st.checkbox("Results CSV", value=True)
-    download_long_df = st.checkbox("Long format CSV", value=False)
-    download_config = st.checkbox("Config JSON", value=True)
-    download_plots = st.checkbox("Plots (HTML)", value=True)
-    st.caption(
-        "Note: ZIP exports include only HTML plots. PNGs must be downloaded individually from each plot above. "
-        "For comparing runs, the Long format CSV is needed; PNG/PDF are not required."
+            _style_plot(fig, "Blank OD over time", st.session_state.plot_x_label, "OD", show_grid=False)
+            if available_cols:
+                y_vals = working_df[available_cols].apply(pd.to_numeric, errors="coerce")
+                y_min = float(np.nanmin(y_vals.to_numpy())) if not y_vals.empty else None
+                y_max = float(np.nanmax(y_vals.to_numpy())) if not y_vals.empty else None
+                if y_min is not None and y_max is not None and np.isfinite(y_min) and np.isfinite(y_max):
+                    fig.update_yaxes(range=[y_min, y_max])
+            st.plotly_chart(fig, width="stretch", key="blank_control_plot")
+        except Exception as exc:
+            st.warning(f"Blank control preview unavailable: {exc}")
+    _profile_mark("analysis_settings")
+    st.subheader("Analysis settings")
+    smoothing = _smoothing_widgets(config)
+    st.markdown("### Growth rate")
+    default_growth_unit = (config.get("growth_rate_unit") if config else None) or (
+        "1/min" if base_unit == "minutes" else "1/hour"
     )
-    plot_labels = [label for label, _ in plot_artifacts]
-    selected_plots = plot_labels
-    if download_plots:
-        with st.expander("Select specific plots", expanded=False):
-            st.caption("Leave empty to include all plots.")
-            selected_plots = st.multiselect(
-                "Plots to include",
-                options=plot_labels,
-                default=[],
-            )
-    config_filename = "odyssey_config.json"
-    zip_filename = "odyssey_downloads.zip"
-    column_map = _build_column_map(available_cols, st.session_state.replicate_groups)
-    config_payload = _build_config(
-        sheet_name,
-        time_col,
-        time_unit,
-        time_window,
-        fit_window_mode,
-        min_points,
-        blank_normalized,
-        blank_cols,
-        auc_mode,
-        auc_window,
-        auc_unit,
-        notes,
-        column_map,
-        growth_rate_unit,
-        doubling_time_unit,
-        st.session_state.plot_groups,
-            st.session_state.plot_mode,
-            st.session_state.show_sd,
-            st.session_state.plots_per_row,
-            {
-                "title": st.session_state.plot_title,
-                "x_label": st.session_state.plot_x_label,
-                "y_label": st.session_state.plot_y_label,
-            },
+    growth_rate_unit_options = {"min\u207B\u00B9": "1/min", "h\u207B\u00B9": "1/hour"}
+    default_growth_label = "min\u207B\u00B9" if default_growth_unit == "1/min" else "h\u207B\u00B9"
+    growth_rate_label = st.selectbox(
+        "Growth rate unit",
+        options=list(growth_rate_unit_options.keys()),
+        index=0 if default_growth_label == "min\u207B\u00B9" else 1,
+    )
+    growth_rate_unit = growth_rate_unit_options[growth_rate_label]
+    fit_methods = {"Least squares": "ols", "Theil\u2013Sen (robust)": "theil_sen", "Huber (robust)": "huber"}
+    default_fit_method = config.get("fit_method") if config else None
+    default_fit_method = default_fit_method if default_fit_method in FIT_METHODS else "ols"
+    fit_method = fit_methods[
+        st.selectbox(
+            "Window fit",
+            options=list(fit_methods),
+            index=list(fit_methods.values()).index(default_fit_method),
+            help="Robust fits keep a single spike or bubble read from dragging the growth rate.",
         )
-    st.caption("Build the zip, then click download.")
-    if "download_zip_bytes" not in st.session_state:
-        st.session_state.download_zip_bytes = None
-    if "download_zip_name" not in st.session_state:
-        st.session_state.download_zip_name = None
-    if "download_zip_error" not in st.session_state:
-        st.session_state.download_zip_error = None
-
-    progress_log = st.empty()
-    progress_bar = st.progress(0)
-    progress_stage = st.empty()
-    build_clicked = st.button("Build download zip", key="build_zip")
-    if build_clicked:
-        with st.spinner("Building zip..."):
-            try:
-                build_start = datetime.now()
-                prev_timings = st.session_state.get("download_zip_timings") or {}
-                st.session_state.download_zip_prev_total = prev_timings.get("total_s")
-
-                def _progress_cb(stage, done, total):
-                    progress_bar.progress(min(done / total, 1.0))
-                    elapsed = (datetime.now() - build_start).total_seconds()
-                    progress_stage.caption(
-                        f"Building: {stage} ({done}/{total}) • {elapsed:.1f}s"
+    ]
+    st.markdown("### Doubling time")
+    default_dt_unit = (config.get("doubling_time_unit") if config else None) or (
+        "min" if base_unit == "minutes" else "hour"
+    )
+    doubling_time_unit = st.selectbox(
+        "Doubling time unit",
+        options=["min", "hour"],
+        index=0 if default_dt_unit == "min" else 1,
+    )
+    st.markdown("### Milestones")
+    default_thresholds = (config.get("od_thresholds") if config else None) or []
+    threshold_text = st.text_input(
+        "Time to OD thresholds (comma separated)",
+        value=", ".join(f"{value:g}" for value in default_thresholds),
+        help="Interpolated first time each well's smoothed curve reaches the OD. "
+        "Lag time (tangent of the exponential fit) is always reported; durations use the doubling time unit.",
+    )
+    od_thresholds = []
+    for part in threshold_text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            od_thresholds.append(float(part))
+        except ValueError:
+            st.warning(f"Ignoring threshold '{part}': not a number.")
+    od_thresholds = sorted(set(od_thresholds))
+    sliding_window = _sliding_window_widgets(config)
+    outliers = _outlier_widgets(config)
+    window_sweep = _window_sweep_widgets(config, min_points)
+    st.markdown("### Growth model")
+    model_labels = {"None": None, "Logistic": "logistic", "Gompertz": "gompertz", "Richards": "richards"}
+    default_model = config.get("growth_model") if config else None
+    growth_model = model_labels[
+        st.selectbox(
+            "Sigmoidal model fit (lag, max rate, carrying capacity)",
+            options=list(model_labels),
+            index=list(model_labels.values()).index(default_model if default_model in GROWTH_MODELS else None),
+            help="Fits the model to each well's ln(OD) curve, seeded from the exponential window fit.",
+        )
+    ]
+    bootstrap = _bootstrap_widgets(config)
+    qc_rules = _qc_rule_widgets(config)
+    _profile_mark("preview_curves")
+    st.subheader("Preview curves")
+    time_window = None
+    t_min = 0.0
+    t_max = 1.0
+    preview = None
+    column_map = _build_column_map(available_cols, st.session_state.replicate_groups)
+    try:
+        with st.spinner("Preparing preview..."):
+            column_map_json = pd.DataFrame(column_map).to_json()
+            preview_mean_df, preview_long_df, t_min, t_max = _cached_preview_data(
+                excel_upload.getvalue(),
+                sheet_name,
+                time_col,
+                time_unit,
+                column_map_json,
+                blank_normalized,
+                blank_cols,
+                json.dumps(blank_options, sort_keys=True) if blank_options else None,
+            )
+            if preview_mean_df.empty:
+                st.warning("Preview unavailable: no data after parsing.")
+            else:
+                preview_treatments = sorted(preview_mean_df["treatment"].dropna().unique().tolist())
+                signature = (sheet_name, time_col, time_unit, column_map_json)
+                if st.session_state.get("preview_signature") != signature:
+                    st.session_state.preview_signature = signature
+                    st.session_state.preview_base_fig = _plot_overlay(
+                        preview_mean_df,
+                        preview_treatments,
+                        show_sd=True,
+                        max_points=_preview_max_points(len(preview_treatments)),
                     )
-                    progress_log.text("Building zip...")
-
-                zip_bytes, zip_name, build_warnings, build_timings = build_download_zip(
-                    results=results,
-                    analyses=analyses,
-                    plot_artifacts=plot_artifacts,
-                    config_payload=config_payload,
-                    config_filename=config_filename,
-                    download_results=download_results,
-                    download_long_df=download_long_df,
-                    download_config=download_config,
-                    download_plots=download_plots,
-                    selected_plots=selected_plots,
-                    zip_filename=zip_filename,
-                    progress_cb=_progress_cb,
-                )
-                st.session_state.download_zip_bytes = zip_bytes
-                st.session_state.download_zip_name = zip_name
-                st.session_state.download_zip_timings = build_timings
-                st.session_state.download_zip_error = None
-                for msg in build_warnings:
-                    st.warning(msg)
-            except Exception as exc:
-                st.session_state.download_zip_error = str(exc)
-        st.rerun()
-
-    if st.session_state.get("download_zip_error"):
-        st.error(f"Zip build failed: {st.session_state.download_zip_error}")
-    if st.session_state.get("download_zip_bytes"):
-        st.success("Zip ready for download.")
-        st.download_button(
-            "Download selected (zip)",
-            data=st.session_state.download_zip_bytes,
-            file_name=st.session_state.get("download_zip_name", "odyssey_downloads.zip"),
-            mime="application/zip",
+                auto_window_range = _suggest_fit_window(
+                    preview_long_df, window_points=max(int(min_points), 3)
+                ) or (t_min, t_max)
+                preview = {
+                    "long_df": preview_long_df,
+                    "t_min": t_min,
+                    "t_max": t_max,
+                    "auto_window": auto_window_range,
+                }
+    except Exception as exc:
+        st.warning(f"Preview unavailable: {exc}")
+    try:
+        auc_time = _parse_time_series(df[time_col])
+        auc_time = _apply_time_unit(
+            auc_time, time_unit if time_unit != "hh:mm:ss" else "minutes"
         )
-        st.caption(f"Zip size: {len(st.session_state.download_zip_bytes)} bytes")
-        timings = st.session_state.get("download_zip_timings")
-        if timings:
-            ordered = [
-                "config_json_s",
-                "results_csv_s",
-                "long_df_csv_s",
-                "plots_html_s",
-                "total_s",
-            ]
-            progress_lines = []
-            total = timings.get("total_s") or max(timings.values())
-            for key in ordered:
-                if key not in timings:
-                    continue
-                progress_lines.append(f"{key}: {timings[key]:.2f}s")
-            st.caption("Build timings (s): " + ", ".join(progress_lines))
-    else:
-        st.info("Build a zip to enable the download button.")
+        auc_time = auc_time.dropna()
+        if not auc_time.empty:
+            auc_time_range = (float(auc_time.min()), float(auc_time.max()))
+        else:
+            auc_time_range = (np.nan, np.nan)
+    except Exception:
+        auc_time_range = (np.nan, np.nan)
+    auc_bounds = auc_time_range if np.isfinite(auc_time_range).all() else (0.0, 1.0)
+    _profile_mark("window_preview")
+    _window_preview_fragment(preview, auc_bounds, (t_min, t_max), config, base_unit)
+    _profile_mark("run_analysis")
+    if preview is not None:
+        time_window = st.session_state.get("fit_window_range")
+    auc_unit = st.session_state.auc_unit_choice
+    auc_mode = st.session_state.auc_mode_choice
+    auc_window = st.session_state.get("auc_window") if auc_mode == "Custom range" else None
+    col_a, _ = st.columns([1, 1])
+    with col_a:
+        run_button = st.button("Run analysis", type="primary")
+    if run_button:
+        if not blank_normalized and not blank_cols:
+            st.error("Select blank columns or mark OD values as blank normalized before running analysis.")
+            return
+        if not available_cols:
+            st.error("No treatment columns selected.")
+            return
+        column_map = _build_column_map(available_cols, st.session_state.replicate_groups)
+        if auc_mode == "Full range":
+            auc_use_window = None
+        elif auc_mode == "Fit window":
+            auc_use_window = time_window
+        else:
+            auc_use_window = auc_window
+        if auc_use_window is None:
+            auc_window_range = auc_time_range
+        else:
+            auc_window_range = (float(auc_use_window[0]), float(auc_use_window[1]))
+        display = {
+            "base_unit": _base_time_unit(time_unit),
+            "growth_rate_label": growth_rate_label,
+            "growth_rate_unit": growth_rate_unit,
+            "doubling_time_unit": doubling_time_unit,
+            "auc_unit": auc_unit,
+            "auc_window_range": auc_window_range,
+            "qc_rules": qc_rules,
+        }
+        fit_options = {
+            "time_window": time_window,
+            "auto_window": False,
+            "min_points": min_points,
+            "auc_window": auc_use_window,
+            "bootstrap": bootstrap,
+            "growth_model": growth_model,
+            "od_thresholds": od_thresholds,
+            "sliding_window": sliding_window,
+            "fit_method": fit_method,
+            "outliers": outliers,
+            "window_sweep": window_sweep,
+        }
+        upstream = _upstream_signature(
+            excel_upload.getvalue(),
+            sheet_name,
+            time_col,
+            time_unit,
+            column_map,
+            blank_normalized,
+            blank_cols,
+            blank_options,
+            smoothing,
+        )
+        runner = _job_runner()
+        previous_job = st.session_state.get("analysis_job")
+        payload = st.session_state.analysis_payload
+        if (
+            not previous_job
+            and st.session_state.analysis_ready
+            and payload.get("upstream") == upstream
+            and len(payload["analyses"]) == 1
+        ):
+            # Same curves as the shown results: redo only the window arithmetic (or, when
+            # just units or QC rules changed, only the display tables).
+            analysis = payload["analyses"][0]
+            if analysis["options"] != fit_options:
+                analysis = refit_analysis(analysis, **fit_options)
+                analysis["results"]["run"] = excel_upload.name
+            st.session_state.analysis_payload = {
+                "analyses": [analysis],
+                "results": _display_results([analysis], display),
+                "upstream": upstream,
+            }
+        else:
+            if previous_job:
+                runner.cancel(previous_job["id"])
+                runner.forget(previous_job["id"])
+            job_id = runner.submit(
+                analyze_file,
+                _NamedBytesIO(excel_upload.getvalue(), excel_upload.name),
+                sheet_name,
+                time_col,
+                time_unit,
+                column_map,
+                blank_normalized=blank_normalized,
+                blank_cols=blank_cols,
+                blank_options=blank_options,
+                smoothing=smoothing,
+                **fit_options,
+            )
+            st.session_state.analysis_job = {
+                "id": job_id,
+                "name": excel_upload.name,
+                "display": display,
+                "upstream": upstream,
+            }
+    job_message = st.session_state.pop("analysis_job_message", None)
+    if job_message:
+        level, text = job_message
+        getattr(st, level)(text)
+    if st.session_state.get("analysis_job"):
+        _analysis_job_panel()
+    if not st.session_state.analysis_ready:
+        st.info("Run analysis to generate results and plots.")
+        return
+    analyses = st.session_state.analysis_payload["analyses"]
+    results = st.session_state.analysis_payload["results"]
+    _profile_mark("results")
+    _results_section(analyses, results, time_unit, available_cols)
+    _profile_mark("downloads")
+    _downloads_section(
+        analyses,
+        results,
+        dict(
+            sheet_name=sheet_name,
+            time_col=time_col,
+            time_unit=time_unit,
+            time_window=time_window,
+            fit_window_mode=fit_window_mode,
+            min_points=min_points,
+            blank_normalized=blank_normalized,
+            blank_cols=blank_cols,
+            blank_options=blank_options,
+            bootstrap=bootstrap,
+            growth_model=growth_model,
+            od_thresholds=od_thresholds,
+            sliding_window=sliding_window,
+            smoothing=smoothing,
+            fit_method=fit_method,
+            outliers=outliers,
+            qc_rules=qc_rules,
+            window_sweep=window_sweep,
+            auc_mode=auc_mode,
+            auc_window=auc_window,
+            auc_unit=auc_unit,
+            notes=notes,
+            column_map=_build_column_map(available_cols, st.session_state.replicate_groups),
+            growth_rate_unit=growth_rate_unit,
+            doubling_time_unit=doubling_time_unit,
+        ),
+    )
     if time_unit == "hh:mm:ss":
         st.caption("Time is fit in minutes; results display uses the selected unit.")
+
+
 if __name__ == "__main__":
-    main()
+    _profiled_main()
@@ -0,0 +1,217 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import blank_columns, generate_plate, plate_column_map, write_plate
+from odyssey.analysis import (
+    _compute_auc,
+    _long_format_from_map,
+    _mean_sd_by_treatment_time,
+    _well_arrays,
+    _window_auc,
+    _window_fit,
+    auto_select_exponential_window,
+    fit_growth_rates,
+)
+from odyssey.io_utils import _NamedBytesIO, _read_excel_file
+from odyssey.pipeline import apply_blank_normalization
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DEFAULT_SIZES = ("96x100", "384x1000", "1536x1000")
+STAGES = (
+    "read_excel",
+    "blank_normalization",
+    "long_format",
+    "mean_sd",
+    "fit_growth_rates",
+    "fit_theil_sen",
+    "fit_huber",
+    "refit_window",
+    "auto_window",
+    "auc",
+)
+
+
+def _measure(fn, repeat):
+    # Wall time is the best of `repeat` runs; peak memory comes from a separate traced
+    # run so tracemalloc overhead does not inflate the timings.
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def _parse_size(size):
+    wells, reads = size.lower().split("x")
+    return int(wells), int(reads)
+
+
+def run_case(n_wells, n_reads, stages=STAGES, repeat=3, seed=0, auto_wells=24, workdir=None):
+    wide, truth = generate_plate(n_wells=n_wells, n_reads=n_reads, model="mixed", seed=seed)
+    column_map = pd.DataFrame(plate_column_map(truth))
+    blanks = blank_columns(truth)
+    n_culture = len(column_map)
+    records = []
+
+    def _record(stage, fn, wells):
+        result, wall, peak = _measure(fn, repeat)
+        records.append(
+            {
+                "wells": n_wells,
+                "reads": n_reads,
+                "stage": stage,
+                "wall_s": wall,
+                "peak_mb": peak / 1e6,
+                "wells_per_s": wells / wall if wall > 0 else float("inf"),
+            }
+        )
+        return result
+
+    if "read_excel" in stages:
+        with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+            path = write_plate(wide, os.path.join(tmp, "plate.xlsx"))
+            with open(path, "rb") as handle:
+                data = handle.read()
+            _record(
+                "read_excel",
+                lambda: _read_excel_file(_NamedBytesIO(data, "plate.xlsx"), "Sheet1"),
+                n_wells,
+            )
+    normalized = wide
+    if "blank_normalization" in stages:
+        normalized = _record(
+            "blank_normalization", lambda: apply_blank_normalization(wide, "Time", blanks), n_wells
+        )
+    if "long_format" in stages:
+        long_df = _record(
+            "long_format", lambda: _long_format_from_map(normalized, "Time", column_map), n_culture
+        )
+    else:
+        long_df = _long_format_from_map(normalized, "Time", column_map)
+    if "mean_sd" in stages:
+        _record("mean_sd", lambda: _mean_sd_by_treatment_time(long_df), n_culture)
+    t_max = float(wide["Time"].max())
+    window = (0.1 * t_max, 0.4 * t_max)
+    if "fit_growth_rates" in stages:
+        _record("fit_growth_rates", lambda: fit_growth_rates(long_df, time_window=window), n_culture)
+    for stage, method in (("fit_theil_sen", "theil_sen"), ("fit_huber", "huber")):
+        if stage in stages:
+            _record(
+                stage,
+                lambda method=method: fit_growth_rates(long_df, time_window=window, fit_method=method),
+                n_culture,
+            )
+    if "refit_window" in stages:
+        # Window and AUC range changes reuse the sorted per-well arrays kept by an analysis.
+        arrays = _well_arrays(long_df)
+        _record("refit_window", lambda: (_window_fit(arrays, window), _window_auc(arrays, window)), n_culture)
+    if "auto_window" in stages:
+        # The auto window search is quadratic per well, so it runs on a sample of wells.
+        sample = column_map["column"].head(auto_wells).tolist()
+        time_vals = wide["Time"].to_numpy(dtype=float)
+        curves = [normalized[col].to_numpy(dtype=float) for col in sample]
+
+        def _auto():
+            return [auto_select_exponential_window(time_vals, od, {"min_points": 5}) for od in curves]
+
+        _record("auto_window", _auto, len(sample))
+    if "auc" in stages:
+        _record("auc", lambda: _compute_auc(long_df), n_culture)
+    return records
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            check=True,
+        )
+        return out.stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def run_suite(sizes=DEFAULT_SIZES, stages=STAGES, repeat=3, seed=0, auto_wells=24):
+    records = []
+    for size in sizes:
+        n_wells, n_reads = _parse_size(size)
+        records.extend(
+            run_case(n_wells, n_reads, stages=stages, repeat=repeat, seed=seed, auto_wells=auto_wells)
+        )
+    return {
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "seed": seed,
+        "repeat": repeat,
+        "records": records,
+    }
+
+
+def compare_runs(current, baseline):
+    key = ["wells", "reads", "stage"]
+    cur = pd.DataFrame(current["records"]).set_index(key)
+    base = pd.DataFrame(baseline["records"]).set_index(key)
+    joined = cur[["wall_s", "peak_mb"]].join(
+        base[["wall_s", "peak_mb"]], rsuffix="_baseline", how="inner"
+    )
+    joined["speedup"] = joined["wall_s_baseline"] / joined["wall_s"]
+    joined["peak_ratio"] = joined["peak_mb"] / joined["peak_mb_baseline"]
+    return joined.reset_index()
+
+
+def _format_table(df):
+    with pd.option_context("display.max_rows", None, "display.width", 160, "display.float_format", "{:.4g}".format):
+        return df.to_string(index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ODyssey analysis core on synthetic plates.")
+    parser.add_argument("--sizes", nargs="+", default=list(DEFAULT_SIZES), help="Plate sizes as WELLSxREADS.")
+    parser.add_argument("--stages", nargs="+", default=list(STAGES), choices=STAGES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--auto-wells", type=int, default=24, help="Wells sampled for the auto window stage.")
+    parser.add_argument("--output", help="Where to save results JSON (default: results/<commit>.json).")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against.")
+    args = parser.parse_args(argv)
+
+    suite = run_suite(args.sizes, args.stages, args.repeat, args.seed, args.auto_wells)
+    print(_format_table(pd.DataFrame(suite["records"])))
+    output = args.output or os.path.join(RESULTS_DIR, f"{suite['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(suite, handle, indent=2)
+    print(f"Saved {output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        print(f"Compared with {baseline.get('commit', args.compare)}:")
+        print(_format_table(compare_runs(suite, baseline)))
+
+
+if __name__ == "__main__":
+    main()
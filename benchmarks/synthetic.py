@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from odyssey.io_utils import PLATE_FORMATS, _row_label
+
+PLATE_SIZES = {n_rows * n_cols: (n_rows, n_cols) for n_rows, n_cols in PLATE_FORMATS}
+MODELS = ("logistic", "gompertz")
+
+
+def _logistic(t, a, mu, lag):
+    return a / (1.0 + np.exp(4.0 * mu / a * (lag - t) + 2.0))
+
+
+def _gompertz(t, a, mu, lag):
+    return a * np.exp(-np.exp(mu * np.e / a * (lag - t) + 1.0))
+
+
+def generate_plate(
+    n_wells=96,
+    n_reads=100,
+    duration_min=1440.0,
+    model="mixed",
+    replicates=3,
+    noise_sd=0.003,
+    dead_fraction=0.05,
+    blank_od=0.05,
+    seed=0,
+):
+    if n_wells not in PLATE_SIZES:
+        raise ValueError(f"Unsupported plate size {n_wells}; use one of {sorted(PLATE_SIZES)}.")
+    rng = np.random.default_rng(seed)
+    n_rows, n_cols = PLATE_SIZES[n_wells]
+    time = np.linspace(0.0, duration_min, n_reads)
+    # Last plate column holds medium-only blanks; the rest are grouped into treatments
+    # of `replicates` neighbouring wells along a row.
+    culture_cols = n_cols - 1
+    rows = []
+    curves = {}
+    for r in range(n_rows):
+        for start in range(0, culture_cols, replicates):
+            block = list(range(start, min(start + replicates, culture_cols)))
+            treatment = f"{_row_label(r)}{block[0] + 1}-{block[-1] + 1}"
+            well_model = model if model in MODELS else MODELS[rng.integers(len(MODELS))]
+            base_mu = rng.uniform(0.004, 0.02)
+            base_lag = rng.uniform(0.05, 0.25) * duration_min
+            base_k = rng.uniform(0.5, 1.2)
+            for rep, c in enumerate(block, start=1):
+                well = f"{_row_label(r)}{c + 1}"
+                od0 = rng.uniform(0.003, 0.008)
+                mu = base_mu * rng.normal(1.0, 0.05)
+                lag = base_lag * rng.normal(1.0, 0.05)
+                a = np.log(base_k * rng.normal(1.0, 0.03) / od0)
+                dead = rng.random() < dead_fraction
+                if dead:
+                    signal = np.zeros_like(time)
+                else:
+                    curve = _logistic if well_model == "logistic" else _gompertz
+                    signal = od0 * np.exp(curve(time, a, mu, lag))
+                curves[well] = blank_od + signal + rng.normal(0.0, noise_sd, n_reads)
+                rows.append(
+                    {
+                        "well": well,
+                        "treatment": treatment,
+                        "replicate": rep,
+                        "model": well_model,
+                        "mu": mu,
+                        "lag": lag,
+                        "a": a,
+                        "od0": od0,
+                        "dead": dead,
+                    }
+                )
+        well = f"{_row_label(r)}{n_cols}"
+        curves[well] = blank_od + rng.normal(0.0, noise_sd, n_reads)
+        rows.append({"well": well, "treatment": "blank", "replicate": r + 1, "model": "blank", "dead": True})
+    wide = pd.DataFrame({"Time": time, **curves})
+    truth = pd.DataFrame(rows)
+    return wide, truth
+
+
+def plate_column_map(truth):
+    cultures = truth[truth["treatment"] != "blank"]
+    return [
+        {"column": row.well, "treatment": row.treatment, "replicate": int(row.replicate)}
+        for row in cultures.itertuples()
+    ]
+
+
+def blank_columns(truth):
+    return truth.loc[truth["treatment"] == "blank", "well"].tolist()
+
+
+def write_plate(wide, path, sheet_name="Sheet1"):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xls"):
+        wide.to_excel(path, sheet_name=sheet_name, index=False)
+    elif ext == ".csv":
+        wide.to_csv(path, index=False)
+    else:
+        raise ValueError(f"Unsupported output format: {ext}")
+    return path
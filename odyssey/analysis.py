@@ -1,10 +1,12 @@
 import os
 import re
+import warnings
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
-from odyssey.io_utils import _parse_time_series
+from odyssey.io_utils import _numeric_matrix, _parse_time_series, _plate_layout
 
 
 def _long_format_from_map(wide_df, time_col, column_map):
@@ -47,12 +49,8 @@ def _linear_fit(x, y):
 
 
 def _median_smooth(y):
-    if len(y) < 3:
-        return y.copy()
-    smoothed = y.copy()
-    for i in range(1, len(y) - 1):
-        smoothed[i] = np.median(y[i - 1 : i + 2])
-    return smoothed
+    y = np.asarray(y, dtype=float)
+    return _rolling_median_rows(y[None, :], np.array([len(y)]), 3)[0]
 
 
 def _clamp(min_val, max_val, value):
@@ -156,6 +154,9 @@ def auto_select_exponential_window(time, od, options=None):
     return {"error": "No valid window found after LOQ search."}
 
 
+FIT_METHODS = ("ols", "theil_sen", "huber")
+
+
 def fit_growth_rates(
     df,
     time_col="time",
@@ -164,17 +165,41 @@ def fit_growth_rates(
     time_window=None,
     auto_window=False,
     min_points=5,
+    progress_cb=None,
+    fit_method="ols",
+    arrays=None,
 ):
+    if fit_method not in FIT_METHODS:
+        raise ValueError(f"Unknown fit method '{fit_method}'; use one of {FIT_METHODS}.")
+    if not auto_window or time_window is not None:
+        # `arrays` are the cached _well_arrays of `df` when the caller has them.
+        if arrays is None:
+            arrays = _well_arrays(df, time_col, value_col, group_cols)
+        results = _window_fit(arrays, time_window)
+        if progress_cb:
+            progress_cb("fit_growth_rates", len(results), len(results))
+    else:
+        results = _auto_window_fits(df, time_col, value_col, group_cols, min_points, progress_cb)
+    if fit_method != "ols" and len(results):
+        # Windows are still chosen by the least-squares search; only the slope is refit.
+        results = robust_growth_fit(
+            df, results, method=fit_method, time_col=time_col, value_col=value_col, group_cols=group_cols
+        )
+    return results
+
+
+def _auto_window_fits(df, time_col, value_col, group_cols, min_points, progress_cb=None):
+    # Per-well LOQ-based window search (auto_select_exponential_window) and fit.
     results = []
+    grouped = df.groupby(list(group_cols))
+    n_groups = grouped.ngroups
 
-    for group, g in df.groupby(list(group_cols)):
+    for idx, (group, g) in enumerate(grouped):
+        if progress_cb:
+            progress_cb("fit_growth_rates", idx, n_groups)
         g = g.dropna(subset=[time_col, value_col]).copy()
         g = g[g[value_col] > 0]
 
-        if time_window is not None:
-            t_min, t_max = time_window
-            g = g[(g[time_col] >= t_min) & (g[time_col] <= t_max)]
-
         if len(g) < 2:
             results.append(
                 {
@@ -194,30 +219,23 @@ def fit_growth_rates(
         g = g.sort_values(time_col)
         x = g[time_col].to_numpy(dtype=float)
         y = np.log(g[value_col].to_numpy(dtype=float))
-        if auto_window and time_window is None:
-            auto = auto_select_exponential_window(x, g[value_col].to_numpy(dtype=float), {"min_points": min_points})
-            if not auto or auto.get("error"):
-                slope = intercept = r2 = np.nan
-                doubling = np.nan
-                n = len(g)
-                t_min = np.nan
-                t_max = np.nan
-            else:
-                start_idx = auto["startIndex"]
-                end_idx = auto["endIndex"]
-                xw = x[start_idx : end_idx + 1]
-                yw = y[start_idx : end_idx + 1]
-                slope, intercept, r2 = _linear_fit(xw, yw)
-                doubling = np.log(2) / slope if slope != 0 else np.nan
-                n = len(xw)
-                t_min = float(xw[0])
-                t_max = float(xw[-1])
+        auto = auto_select_exponential_window(x, g[value_col].to_numpy(dtype=float), {"min_points": min_points})
+        if not auto or auto.get("error"):
+            slope = intercept = r2 = np.nan
+            doubling = np.nan
+            n = len(g)
+            t_min = np.nan
+            t_max = np.nan
         else:
-            slope, intercept, r2 = _linear_fit(x, y)
+            start_idx = auto["startIndex"]
+            end_idx = auto["endIndex"]
+            xw = x[start_idx : end_idx + 1]
+            yw = y[start_idx : end_idx + 1]
+            slope, intercept, r2 = _linear_fit(xw, yw)
             doubling = np.log(2) / slope if slope != 0 else np.nan
-            n = len(g)
-            t_min = float(x[0])
-            t_max = float(x[-1])
+            n = len(xw)
+            t_min = float(xw[0])
+            t_max = float(xw[-1])
 
         results.append(
             {
@@ -236,6 +254,1032 @@ def fit_growth_rates(
     return pd.DataFrame(results)
 
 
+BOOTSTRAP_METHODS = ("residual", "pairs")
+
+
+def _well_matrix(df, time_col="time", value_col="od", group_cols=("treatment", "replicate")):
+    # Returns group keys (groupby order), time and value matrices and a finite-cell mask.
+    group_cols = list(group_cols)
+    data = df[group_cols + [time_col, value_col]].copy()
+    data[time_col] = pd.to_numeric(data[time_col], errors="coerce")
+    data[value_col] = pd.to_numeric(data[value_col], errors="coerce")
+    data = data.dropna(subset=[time_col, value_col])
+    grouped = data.groupby(group_cols, sort=True)
+    codes = grouped.ngroup().to_numpy()
+    keys = grouped.size().reset_index()[group_cols]
+    n_wells = len(keys)
+    order = np.lexsort((data[time_col].to_numpy(), codes))
+    codes = codes[order]
+    counts = np.bincount(codes, minlength=n_wells)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    position = np.arange(len(codes)) - starts[codes]
+    width = int(counts.max()) if n_wells else 0
+    x = np.full((n_wells, width), np.nan)
+    y = np.full((n_wells, width), np.nan)
+    x[codes, position] = data[time_col].to_numpy(dtype=float)[order]
+    y[codes, position] = data[value_col].to_numpy(dtype=float)[order]
+    return keys, x, y, np.isfinite(x) & np.isfinite(y)
+
+
+def _pack_left(mask, *arrays):
+    order = np.argsort(~mask, axis=1, kind="stable")
+    packed = [np.take_along_axis(arr, order, axis=1) for arr in arrays]
+    counts = mask.sum(axis=1)
+    keep = np.arange(mask.shape[1]) < counts[:, None]
+    return [np.where(keep, arr, np.nan) for arr in packed], counts
+
+
+def _window_reads(long_df, results_df, time_col, value_col, group_cols):
+    keys, x, od, valid = _well_matrix(long_df, time_col, value_col, group_cols)
+    windows = keys.merge(results_df[group_cols + ["window_start", "window_end"]], on=group_cols, how="left")
+    start = windows["window_start"].to_numpy(dtype=float)[:, None]
+    end = windows["window_end"].to_numpy(dtype=float)[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        in_window = valid & (od > 0) & (x >= start) & (x <= end)
+        (x, y), n = _pack_left(in_window, x, np.log(np.where(in_window, od, np.nan)))
+    width = int(n.max()) if len(n) else 0
+    return keys, x[:, :width], y[:, :width], n
+
+
+def _row_median(values):
+    # NaNs sort last, which is much faster than np.nanmedian on wide arrays.
+    ordered = np.sort(values, axis=1)
+    counts = np.isfinite(values).sum(axis=1)
+    rows = np.arange(values.shape[0])
+    low = ordered[rows, np.maximum((counts - 1) // 2, 0)]
+    high = ordered[rows, counts // 2]
+    return np.where(counts > 0, 0.5 * (low + high), np.nan)
+
+
+def _theil_sen_rows(x, y, counts):
+    width = x.shape[1]
+    first, second = np.triu_indices(width, 1)
+    dx = x[:, second] - x[:, first]
+    dy = y[:, second] - y[:, first]
+    usable = (second < counts[:, None]) & (dx > 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = _row_median(np.where(usable, dy / dx, np.nan))
+    inside = np.arange(width) < counts[:, None]
+    intercept = _row_median(np.where(inside, y - slope[:, None] * x, np.nan))
+    return slope, intercept
+
+
+def _huber_rows(x, y, counts, huber_c=1.345, max_iter=50, tol=1e-8):
+    inside = np.arange(x.shape[1]) < counts[:, None]
+    x = np.where(inside, x, 0.0)
+    y = np.where(inside, y, 0.0)
+    weights = inside.astype(float)
+    slope = intercept = np.full(x.shape[0], np.nan)
+    for _ in range(int(max_iter)):
+        sw, sx, sy = weights.sum(axis=1), (weights * x).sum(axis=1), (weights * y).sum(axis=1)
+        sxx, sxy = (weights * x * x).sum(axis=1), (weights * x * y).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            denom = sw * sxx - sx**2
+            slope = np.where(denom > 0, (sw * sxy - sx * sy) / denom, np.nan)
+            intercept = (sy - slope * sx) / sw
+            residual = np.abs(y - (intercept[:, None] + slope[:, None] * x))
+            scale = _row_median(np.where(inside, residual, np.nan)) / 0.6745
+            limit = huber_c * scale[:, None]
+            updated = np.where(inside, np.where(residual > limit, limit / residual, 1.0), 0.0)
+        updated = np.nan_to_num(updated, nan=1.0) * inside
+        if np.max(np.abs(updated - weights), initial=0.0) < tol:
+            break
+        weights = updated
+    return slope, intercept
+
+
+def robust_growth_fit(
+    long_df,
+    results_df,
+    method="huber",
+    huber_c=1.345,
+    time_col="time",
+    value_col="od",
+    group_cols=("treatment", "replicate"),
+    max_chunk_elements=4_000_000,
+):
+    # Wells with fewer than 3 reads keep the least-squares fit.
+    if method not in FIT_METHODS or method == "ols":
+        raise ValueError(f"Unknown robust fit method '{method}'; use 'theil_sen' or 'huber'.")
+    group_cols = list(group_cols)
+    keys, x, y, n = _window_reads(long_df, results_df, time_col, value_col, group_cols)
+    n_wells, width = x.shape
+    slope = np.full(n_wells, np.nan)
+    intercept = np.full(n_wells, np.nan)
+    fit_rows = np.flatnonzero(n >= 3)
+    # Theil-Sen holds every read pair of a row, so wells are fitted in bounded chunks.
+    per_row = width * width if method == "theil_sen" else width
+    chunk = max(1, int(max_chunk_elements // max(per_row, 1)))
+    for lo in range(0, len(fit_rows), chunk):
+        rows = fit_rows[lo : lo + chunk]
+        if method == "theil_sen":
+            slope[rows], intercept[rows] = _theil_sen_rows(x[rows], y[rows], n[rows])
+        else:
+            slope[rows], intercept[rows] = _huber_rows(x[rows], y[rows], n[rows], huber_c)
+    inside = np.arange(width) < n[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        y_mean = np.nansum(np.where(inside, y, np.nan), axis=1) / n
+        ss_res = np.where(inside, (y - intercept[:, None] - slope[:, None] * x) ** 2, 0.0).sum(axis=1)
+        ss_tot = np.where(inside, (y - y_mean[:, None]) ** 2, 0.0).sum(axis=1)
+        r2 = np.where(ss_tot > 0, 1.0 - ss_res / ss_tot, np.nan)
+        doubling = np.where(slope != 0, np.log(2) / slope, np.nan)
+    fit_df = keys.assign(mu=slope, intercept=intercept, r2=r2, doubling_time=doubling)
+    aligned = results_df[group_cols].merge(fit_df, on=group_cols, how="left")
+    out = results_df.copy()
+    refit = aligned["mu"].notna().to_numpy()
+    for col in ("mu", "intercept", "r2", "doubling_time"):
+        out[col] = np.where(refit, aligned[col].to_numpy(dtype=float), out[col].to_numpy(dtype=float))
+    return out
+
+
+def _well_arrays(df, time_col="time", value_col="od", group_cols=("treatment", "replicate")):
+    # Kept on an analysis so window and AUC changes are redone as array arithmetic.
+    group_cols = list(group_cols)
+    keys, t, od, valid = _well_matrix(df, time_col, value_col, group_cols)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        positive = valid & (od > 0)
+        (log_time, log_od), log_counts = _pack_left(positive, t, np.log(np.where(positive, od, np.nan)))
+    groups = df[group_cols].dropna().drop_duplicates().sort_values(group_cols).reset_index(drop=True)
+    return {
+        "group_cols": group_cols,
+        "groups": groups,
+        "keys": keys,
+        "time": t,
+        "od": od,
+        "counts": valid.sum(axis=1),
+        "log_time": log_time,
+        "log_od": log_od,
+        "log_counts": log_counts,
+    }
+
+
+def _reads_in_window(time, time_window):
+    # Per-row index range [lo, hi) of the packed reads inside the (inclusive) time window.
+    n_wells, width = time.shape
+    finite = np.isfinite(time)
+    if time_window is None:
+        return np.zeros(n_wells, dtype=int), finite.sum(axis=1)
+    start, end = time_window
+    with np.errstate(invalid="ignore"):
+        return (finite & (time < start)).sum(axis=1), (finite & (time <= end)).sum(axis=1)
+
+
+def _window_fit(arrays, time_window=None):
+    t, y, n = arrays["log_time"], arrays["log_od"], arrays["log_counts"]
+    keys = arrays["keys"]
+    rows = np.arange(len(keys))
+    lo, hi = _reads_in_window(t, time_window)
+    count = hi - lo
+    cumulative = _cumulative_moments(t, y, n)
+    sx, sy, sxx, sxy, syy = cumulative[:, rows, hi] - cumulative[:, rows, lo]
+    slope, r2 = _moment_fit(count, sx, sy, sxx, sxy, syy)
+    fitted = count >= 2
+    width = max(t.shape[1], 1)
+    first = t[rows, np.minimum(lo, width - 1)] if t.shape[1] else np.full(len(keys), np.nan)
+    last = t[rows, np.clip(hi - 1, 0, width - 1)] if t.shape[1] else first
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Moments are taken from each row's first read; shift the intercept back to t = 0.
+        intercept = (sy - slope * sx) / count - slope * t[:, 0] if t.shape[1] else slope
+        doubling = np.where(slope != 0, np.log(2) / slope, np.nan)
+    fit = keys.assign(
+        n=count,
+        mu=np.where(fitted, slope, np.nan),
+        intercept=np.where(fitted, intercept, np.nan),
+        r2=np.where(fitted, r2, np.nan),
+        doubling_time=np.where(fitted, doubling, np.nan),
+        window_start=np.where(fitted, first, np.nan),
+        window_end=np.where(fitted, last, np.nan),
+    )
+    results = arrays["groups"].merge(fit, on=arrays["group_cols"], how="left")
+    results["n"] = results["n"].fillna(0).astype(int)
+    return results
+
+
+def _window_auc(arrays, time_window=None):
+    # Trapezoidal AUC of every well over the reads inside `time_window`.
+    t, od = arrays["time"], arrays["od"]
+    lo, hi = _reads_in_window(t, time_window)
+    position = np.arange(max(t.shape[1] - 1, 0))
+    inside = (position >= lo[:, None]) & (position + 1 < hi[:, None])
+    segments = np.where(inside, 0.5 * (od[:, 1:] + od[:, :-1]) * np.diff(t, axis=1), 0.0)
+    auc = np.where(hi - lo >= 2, segments.sum(axis=1), np.nan)
+    return arrays["groups"].merge(arrays["keys"].assign(auc=auc), on=arrays["group_cols"], how="left")
+
+
+def bootstrap_growth_ci(
+    long_df,
+    results_df,
+    n_boot=1000,
+    ci=0.95,
+    method="residual",
+    seed=0,
+    time_col="time",
+    value_col="od",
+    group_cols=("treatment", "replicate"),
+    max_chunk_elements=4_000_000,
+):
+    # Chunked over wells so the (wells, resamples, reads) index array stays bounded.
+    if method not in BOOTSTRAP_METHODS:
+        raise ValueError(f"Unknown bootstrap method '{method}'; use one of {BOOTSTRAP_METHODS}.")
+    group_cols = list(group_cols)
+    keys, x, y, n = _window_reads(long_df, results_df, time_col, value_col, group_cols)
+    n_wells, width = x.shape
+    mu_boot = np.full((n_wells, n_boot), np.nan)
+    fit_rows = np.flatnonzero(n >= 3)
+    rng = np.random.default_rng(seed)
+    chunk = max(1, int(max_chunk_elements // max(n_boot * width, 1)))
+    for lo in range(0, len(fit_rows), chunk):
+        rows = fit_rows[lo : lo + chunk]
+        n_rows = n[rows].astype(float)
+        mask = np.arange(width) < n[rows, None]
+        xr = np.where(mask, x[rows], 0.0)
+        yr = np.where(mask, y[rows], 0.0)
+        x_mean = xr.sum(axis=1) / n_rows
+        xc = np.where(mask, xr - x_mean[:, None], 0.0)
+        sxx = (xc**2).sum(axis=1)
+        draws = (rng.random((len(rows), n_boot, width)) * n_rows[:, None, None]).astype(np.intp)
+        row_index = np.arange(len(rows))[:, None, None]
+        draw_mask = mask[:, None, :]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if method == "residual":
+                slope = (xc * yr).sum(axis=1) / sxx
+                intercept = yr.sum(axis=1) / n_rows - slope * x_mean
+                resid = np.where(mask, yr - (intercept[:, None] + slope[:, None] * xr), 0.0)
+                # x is fixed, so a resample only shifts the slope by the projected residuals.
+                resampled = np.where(draw_mask, resid[row_index, draws], 0.0)
+                mu_boot[rows] = slope[:, None] + (xc[:, None, :] * resampled).sum(axis=2) / sxx[:, None]
+            else:
+                xs = np.where(draw_mask, xr[row_index, draws], 0.0)
+                ys = np.where(draw_mask, yr[row_index, draws], 0.0)
+                sx = xs.sum(axis=2)
+                sy = ys.sum(axis=2)
+                sxy = (xs * ys).sum(axis=2)
+                sxx_boot = (xs * xs).sum(axis=2)
+                denom = n_rows[:, None] * sxx_boot - sx**2
+                mu_boot[rows] = np.where(
+                    np.abs(denom) > 1e-12 * np.maximum(sxx_boot, 1.0),
+                    (n_rows[:, None] * sxy - sx * sy) / denom,
+                    np.nan,
+                )
+    alpha = (1.0 - float(ci)) / 2.0
+    mu_low = np.full(n_wells, np.nan)
+    mu_high = np.full(n_wells, np.nan)
+    has_boot = np.isfinite(mu_boot).any(axis=1)
+    if has_boot.any():
+        mu_low[has_boot], mu_high[has_boot] = np.nanquantile(mu_boot[has_boot], [alpha, 1.0 - alpha], axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Doubling time is monotone in mu; unbounded (NaN) once the lower mu bound is <= 0.
+        dt_low = np.where(mu_high > 0, np.log(2) / mu_high, np.nan)
+        dt_high = np.where(mu_low > 0, np.log(2) / mu_low, np.nan)
+    ci_df = keys.assign(
+        mu_ci_low=mu_low,
+        mu_ci_high=mu_high,
+        doubling_time_ci_low=dt_low,
+        doubling_time_ci_high=dt_high,
+    )
+    out = results_df.drop(columns=[c for c in ci_df.columns if c not in group_cols], errors="ignore")
+    out = out.merge(ci_df, on=group_cols, how="left")
+    ordered = []
+    for col in results_df.columns:
+        if col in ci_df.columns and col not in group_cols:
+            continue
+        ordered.append(col)
+        if col == "mu":
+            ordered += ["mu_ci_low", "mu_ci_high"]
+        elif col == "doubling_time":
+            ordered += ["doubling_time_ci_low", "doubling_time_ci_high"]
+    return out[ordered]
+
+
+GROWTH_MODELS = ("logistic", "gompertz", "richards")
+_MODEL_COLUMNS = (
+    "model",
+    "model_y0",
+    "model_A",
+    "model_mu_max",
+    "model_lag",
+    "model_shape",
+    "model_capacity",
+    "model_r2",
+    "model_rmse",
+    "model_aic",
+    "model_converged",
+)
+
+
+def _growth_model_curve(model, t, params):
+    # params are (y0, log A, log mu, lag[, log v]) so A, mu and v stay positive.
+    y0 = params[:, 0:1]
+    amp = np.exp(params[:, 1:2])
+    mu = np.exp(params[:, 2:3])
+    lag = params[:, 3:4]
+    if model == "logistic":
+        growth = amp * np.exp(-np.logaddexp(0.0, 4.0 * mu / amp * (lag - t) + 2.0))
+    elif model == "gompertz":
+        growth = amp * np.exp(-np.exp(np.minimum(mu * np.e / amp * (lag - t) + 1.0, 50.0)))
+    elif model == "richards":
+        shape = np.exp(params[:, 4:5])
+        z = mu / amp * (1.0 + shape) ** (1.0 + 1.0 / shape) * (lag - t)
+        growth = amp * np.exp(-np.logaddexp(0.0, np.log(shape) + 1.0 + shape + z) / shape)
+    else:
+        raise ValueError(f"Unknown growth model '{model}'; use one of {GROWTH_MODELS}.")
+    return y0 + growth
+
+
+def _batched_levenberg_marquardt(model, t, y, mask, params, lower, upper, max_iter=100, tol=1e-6):
+    n_wells, n_params = params.shape
+    params = np.clip(params, lower, upper)
+    damping = np.full(n_wells, 1e-2)
+    converged = np.zeros(n_wells, dtype=bool)
+    weights = mask.astype(float)
+    t = np.where(mask, t, 0.0)
+    y = np.where(mask, y, 0.0)
+
+    def _residuals(rows, p):
+        with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+            resid = (y[rows] - _growth_model_curve(model, t[rows], p)) * weights[rows]
+        return np.clip(np.where(np.isfinite(resid), resid, 1e6), -1e6, 1e6)
+
+    all_rows = np.arange(n_wells)
+    sse = (_residuals(all_rows, params) ** 2).sum(axis=1)
+    for _ in range(max_iter):
+        active = np.flatnonzero(~converged)
+        if active.size == 0:
+            break
+        p = params[active]
+        resid = _residuals(active, p)
+        step = 1e-6 * np.maximum(np.abs(p), 1.0)
+        jac = np.empty((active.size, mask.shape[1], n_params))
+        for k in range(n_params):
+            shifted = p.copy()
+            shifted[:, k] += step[:, k]
+            jac[:, :, k] = (resid - _residuals(active, shifted)) / step[:, k : k + 1]
+        jtj = np.einsum("wik,wil->wkl", jac, jac)
+        jtr = np.einsum("wik,wi->wk", jac, resid)
+        diag = np.einsum("wkk->wk", jtj)
+        lhs = jtj + (damping[active, None] * np.maximum(diag, 1e-12))[:, :, None] * np.eye(n_params)
+        try:
+            delta = np.linalg.solve(lhs, jtr[:, :, None])[:, :, 0]
+        except np.linalg.LinAlgError:
+            # pinv solves each well alone, so one singular system cannot skew the others.
+            ok = np.isfinite(lhs).all(axis=(1, 2)) & np.isfinite(jtr).all(axis=1)
+            delta = np.zeros_like(jtr)
+            delta[ok] = (np.linalg.pinv(lhs[ok]) @ jtr[ok, :, None])[:, :, 0]
+        candidate = np.clip(p + np.where(np.isfinite(delta), delta, 0.0), lower[active], upper[active])
+        new_sse = (_residuals(active, candidate) ** 2).sum(axis=1)
+        better = new_sse < sse[active]
+        improvement = np.where(better, (sse[active] - new_sse) / np.maximum(sse[active], 1e-300), 0.0)
+        params[active[better]] = candidate[better]
+        sse[active[better]] = new_sse[better]
+        damping[active] = np.where(better, damping[active] / 3.0, damping[active] * 4.0)
+        small_step = np.abs(candidate - p).max(axis=1) < tol * (1.0 + np.abs(p).max(axis=1))
+        converged[active] = (better & (improvement < tol)) | small_step | (damping[active] > 1e10)
+    return params, sse, converged
+
+
+def fit_growth_models(
+    long_df,
+    results_df,
+    model="gompertz",
+    time_col="time",
+    value_col="od",
+    group_cols=("treatment", "replicate"),
+    max_iter=100,
+):
+    # Seeded from the exponential window fit, the tangent at the max rate.
+    if model not in GROWTH_MODELS:
+        raise ValueError(f"Unknown growth model '{model}'; use one of {GROWTH_MODELS}.")
+    group_cols = list(group_cols)
+    keys, t, od, valid = _well_matrix(long_df, time_col, value_col, group_cols)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        usable = valid & (od > 0)
+        (t, y), n = _pack_left(usable, t, np.log(np.where(usable, od, np.nan)))
+    mask = np.arange(t.shape[1]) < n[:, None]
+    n_params = 5 if model == "richards" else 4
+    seeds = keys.merge(results_df[group_cols + ["mu", "intercept"]], on=group_cols, how="left")
+    fit_rows = np.flatnonzero(n >= n_params + 2)
+    out = {col: np.full(len(keys), np.nan) for col in _MODEL_COLUMNS}
+    out["model"] = np.full(len(keys), model, dtype=object)
+    out["model_converged"] = np.zeros(len(keys), dtype=bool)
+    if fit_rows.size:
+        tr, yr, mr = t[fit_rows], y[fit_rows], mask[fit_rows]
+        nr = n[fit_rows]
+        head = np.where(np.arange(tr.shape[1]) < np.minimum(nr, 3)[:, None], yr, np.nan)
+        y0 = np.nanmean(head, axis=1)
+        amp = np.maximum(np.nanmax(np.where(mr, yr, np.nan), axis=1) - y0, 0.1)
+        t_first = tr[:, 0]
+        t_last = tr[np.arange(fit_rows.size), nr - 1]
+        span = np.maximum(t_last - t_first, 1e-9)
+        mu = seeds["mu"].to_numpy(dtype=float)[fit_rows]
+        intercept = seeds["intercept"].to_numpy(dtype=float)[fit_rows]
+        seeded = np.isfinite(mu) & (mu > 0) & np.isfinite(intercept)
+        mu = np.where(seeded, mu, 2.0 * amp / span)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            lag = np.where(seeded, (y0 - intercept) / mu, t_first + 0.25 * span)
+        lag = np.clip(lag, t_first - span, t_last)
+        start = [y0, np.log(amp), np.log(mu), lag]
+        # Bounds keep flat (dead) wells from running off.
+        lower = [y0 - 10.0, np.full(fit_rows.size, -10.0), np.full(fit_rows.size, -20.0), t_first - span]
+        upper = [y0 + 10.0, np.full(fit_rows.size, 5.0), np.full(fit_rows.size, 5.0), t_last + span]
+        if model == "richards":
+            start.append(np.zeros(fit_rows.size))
+            lower.append(np.full(fit_rows.size, -6.0))
+            upper.append(np.full(fit_rows.size, 6.0))
+        params, sse, converged = _batched_levenberg_marquardt(
+            model,
+            tr,
+            yr,
+            mr,
+            np.column_stack(start),
+            np.column_stack(lower),
+            np.column_stack(upper),
+            max_iter=max_iter,
+        )
+        y_mean = np.nansum(np.where(mr, yr, 0.0), axis=1) / nr
+        sst = (np.where(mr, yr - y_mean[:, None], 0.0) ** 2).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["model_r2"][fit_rows] = np.where(sst > 0, 1.0 - sse / sst, np.nan)
+            out["model_rmse"][fit_rows] = np.sqrt(sse / nr)
+            out["model_aic"][fit_rows] = nr * np.log(np.maximum(sse, 1e-300) / nr) + 2 * n_params
+        out["model_y0"][fit_rows] = params[:, 0]
+        out["model_A"][fit_rows] = np.exp(params[:, 1])
+        out["model_mu_max"][fit_rows] = np.exp(params[:, 2])
+        out["model_lag"][fit_rows] = params[:, 3]
+        if model == "richards":
+            out["model_shape"][fit_rows] = np.exp(params[:, 4])
+        out["model_capacity"][fit_rows] = np.exp(params[:, 0] + np.exp(params[:, 1]))
+        out["model_converged"][fit_rows] = converged
+    model_df = keys.assign(**out)
+    merged = results_df.drop(columns=list(_MODEL_COLUMNS), errors="ignore")
+    return merged.merge(model_df, on=group_cols, how="left")
+
+
+SMOOTHING_METHODS = ("median", "savgol", "lowess")
+
+
+def _window_starts(counts, width, window_points):
+    position = np.arange(width)[None, :]
+    last_start = np.maximum(counts - window_points, 0)[:, None]
+    return np.clip(position - window_points // 2, 0, last_start)
+
+
+def _rolling_median_rows(values, counts, window_points=3):
+    # The first and last window_points // 2 reads of each row are left as is.
+    k = int(window_points)
+    half = k // 2
+    smoothed = values.copy()
+    width = values.shape[1]
+    if width >= k and half:
+        interior = np.median(sliding_window_view(values, k, axis=1), axis=2)
+        position = np.arange(half, width - half)
+        inside = position < (counts[:, None] - half)
+        smoothed[:, half : width - half] = np.where(inside, interior, values[:, half : width - half])
+    return smoothed
+
+
+def _savgol_rows(values, counts, window_points=5, polyorder=2):
+    k = int(window_points)
+    n_wells, width = values.shape
+    if width < k:
+        return values.copy()
+    offsets = np.arange(k, dtype=float) - k // 2
+    vander = np.vander(offsets, int(polyorder) + 1)
+    projection = vander @ np.linalg.pinv(vander)
+    fitted = sliding_window_view(values, k, axis=1) @ projection.T
+    start = _window_starts(counts, width, k)
+    offset = np.clip(np.arange(width)[None, :] - start, 0, k - 1)
+    smoothed = fitted[np.arange(n_wells)[:, None], start, offset]
+    inside = np.arange(width) < counts[:, None]
+    return np.where(inside & (counts[:, None] >= k), smoothed, values)
+
+
+def _lowess_rows(t, values, counts, window_points=7, iterations=2):
+    # Bisquare reweighting makes single outlying reads lose their pull.
+    k = int(window_points)
+    n_wells, width = values.shape
+    if width < k:
+        return values.copy()
+    rows = np.arange(n_wells)[:, None, None]
+    inside = np.arange(width) < counts[:, None]
+    idx = _window_starts(counts, width, k)[:, :, None] + np.arange(k)
+    idx = np.minimum(idx, width - 1)
+    dx = t[rows, idx] - t[:, :, None]
+    win_y = values[rows, idx]
+    win_ok = inside[rows, idx] & np.isfinite(win_y)
+    reach = np.abs(dx).max(axis=2, keepdims=True)
+    # Widened by one read spacing so the outermost reads of a window keep some weight.
+    reach = reach * (k // 2 + 1) / max(k // 2, 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tricube = np.where(win_ok, (1.0 - np.clip(np.abs(dx) / reach, 0.0, 1.0) ** 3) ** 3, 0.0)
+    tricube = np.nan_to_num(tricube)
+    dx = np.where(win_ok, dx, 0.0)
+    win_y = np.where(win_ok, win_y, 0.0)
+    robust = np.ones_like(values)
+    smoothed = values
+    for _ in range(int(iterations) + 1):
+        w = tricube * np.where(win_ok, robust[rows, idx], 0.0)
+        sw, swx, swy = w.sum(axis=2), (w * dx).sum(axis=2), (w * win_y).sum(axis=2)
+        swxx, swxy = (w * dx * dx).sum(axis=2), (w * dx * win_y).sum(axis=2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            denom = sw * swxx - swx**2
+            slope = np.where(denom > 0, (sw * swxy - swx * swy) / denom, 0.0)
+            # dx is measured from the read itself, so the fitted value is the intercept.
+            local = np.where(sw > 0, (swy - slope * swx) / sw, smoothed)
+        smoothed = np.where(inside & (counts[:, None] >= k), local, values)
+        residual = np.where(inside, values - smoothed, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scale = 6.0 * _row_median(np.abs(residual))[:, None]
+            u = np.where(scale > 0, residual / scale, 0.0)
+        robust = np.where(np.abs(u) < 1.0, (1.0 - u**2) ** 2, 0.0)
+    return smoothed
+
+
+def smooth_growth_curves(
+    long_df,
+    method="median",
+    window_points=5,
+    polyorder=2,
+    iterations=2,
+    time_col="time",
+    value_col="od",
+    group_cols=("treatment", "replicate"),
+    max_chunk_elements=4_000_000,
+):
+    # Missing reads stay missing and are skipped by the windows.
+    if method not in SMOOTHING_METHODS:
+        raise ValueError(f"Unknown smoothing method '{method}'; use one of {SMOOTHING_METHODS}.")
+    window_points = int(window_points)
+    if window_points < 3 or window_points % 2 == 0:
+        raise ValueError("Smoothing window must be an odd number of reads, at least 3.")
+    if method == "savgol" and not 0 <= int(polyorder) < window_points:
+        raise ValueError("Savitzky-Golay polynomial order must be below the window size.")
+    values = pd.to_numeric(long_df[value_col], errors="coerce").to_numpy(dtype=float, copy=True)
+    positions = np.where(np.isfinite(values), np.arange(len(long_df), dtype=float), np.nan)
+    keyed = long_df.assign(_value=values, _position=positions)
+    keys, t, od, valid = _well_matrix(keyed, time_col, "_value", group_cols)
+    _, _, position, _ = _well_matrix(keyed, time_col, "_position", group_cols)
+    counts = valid.sum(axis=1)
+    smoothed = np.empty_like(od)
+    # The LOWESS windows are (wells, reads, k) arrays, so wells are processed in chunks.
+    chunk = max(1, int(max_chunk_elements) // max(od.shape[1] * window_points, 1))
+    for lo in range(0, len(keys), chunk):
+        part = slice(lo, lo + chunk)
+        if method == "median":
+            smoothed[part] = _rolling_median_rows(od[part], counts[part], window_points)
+        elif method == "savgol":
+            smoothed[part] = _savgol_rows(od[part], counts[part], window_points, polyorder)
+        else:
+            smoothed[part] = _lowess_rows(t[part], od[part], counts[part], window_points, iterations)
+    out = long_df.copy()
+    values[position[valid].astype(int)] = smoothed[valid]
+    out[value_col] = values
+    return out
+
+
+def _threshold_crossings(time, curve, counts, threshold):
+    # Rows are offset into one increasing array for a single searchsorted call.
+    n_wells, width = curve.shape
+    finite = np.isfinite(curve)
+    low = float(np.min(curve[finite])) if finite.any() else 0.0
+    high = float(np.max(curve[finite])) if finite.any() else 0.0
+    span = max(high - low, abs(threshold - low), 1.0) + 1.0
+    # Padding sits just below the next row's offset, above any target in its own row.
+    shifted = np.where(finite, curve - low, span - 0.5)
+    offsets = (np.arange(n_wells) * span)[:, None]
+    flat = (shifted + offsets).ravel()
+    targets = threshold - low + offsets[:, 0]
+    # A threshold below every read lands in the previous row's block; it is met at once.
+    pos = np.maximum(np.searchsorted(flat, targets, side="left") - np.arange(n_wells) * width, 0)
+    crossing = np.full(n_wells, np.nan)
+    reached = (pos < counts) & (counts > 0)
+    rows = np.flatnonzero(reached)
+    idx = pos[rows]
+    at_start = idx == 0
+    prev = np.maximum(idx - 1, 0)
+    c0, c1 = curve[rows, prev], curve[rows, idx]
+    t0, t1 = time[rows, prev], time[rows, idx]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        frac = np.where(c1 > c0, (threshold - c0) / (c1 - c0), 0.0)
+    crossing[rows] = np.where(at_start, time[rows, 0], t0 + frac * (t1 - t0))
+    return crossing
+
+
+def _threshold_column(threshold):
+    return f"time_to_od_{threshold:g}"
+
+
+def growth_milestones(
+    long_df,
+    results_df,
+    thresholds=(),
+    time_col="time",
+    value_col="od",
+    group_cols=("treatment", "replicate"),
+    arrays=None,
+):
+    # Lag is where the window fit's tangent meets the initial ln OD.
+    group_cols = list(group_cols)
+    if arrays is None:
+        keys, t, od, valid = _well_matrix(long_df, time_col, value_col, group_cols)
+        (t, od), n = _pack_left(valid, t, od)
+    else:
+        keys, t, od, n = arrays["keys"], arrays["time"], arrays["od"], arrays["counts"]
+    with np.errstate(invalid="ignore"):
+        positive = np.isfinite(od) & (od > 0)
+    (od_pos,), n_pos = _pack_left(positive, od)
+    head = np.arange(od_pos.shape[1]) < np.minimum(n_pos, 3)[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        od0 = np.where(head, od_pos, 0.0).sum(axis=1) / np.minimum(n_pos, 3)
+        ln_od0 = np.log(od0)
+    fit = keys.merge(results_df[group_cols + ["mu", "intercept"]], on=group_cols, how="left")
+    mu = fit["mu"].to_numpy(dtype=float)
+    intercept = fit["intercept"].to_numpy(dtype=float)
+    first_time = t[:, 0] if t.shape[1] else np.full(len(keys), np.nan)
+    last_time = t[np.arange(len(keys)), np.maximum(n - 1, 0)] if t.shape[1] else first_time
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lag = np.where(mu > 0, (ln_od0 - intercept) / mu, np.nan)
+    # A tangent meeting the baseline after the last read means no usable lag estimate.
+    lag = np.where(lag <= last_time, np.fmax(lag, first_time), np.nan)
+    milestones = keys.assign(lag_time=lag)
+    if thresholds:
+        smoothed = _rolling_median_rows(od, n, 3)
+        monotone = np.fmax.accumulate(np.where(np.isfinite(smoothed), smoothed, -np.inf), axis=1)
+        monotone = np.where(np.arange(od.shape[1]) < n[:, None], monotone, np.nan)
+        monotone = np.where(np.isneginf(monotone), np.nan, monotone)
+        for threshold in thresholds:
+            milestones[_threshold_column(threshold)] = _threshold_crossings(t, monotone, n, float(threshold))
+    new_cols = [c for c in milestones.columns if c not in group_cols]
+    out = results_df.drop(columns=new_cols, errors="ignore")
+    return out.merge(milestones, on=group_cols, how="left")
+
+
+def _cumulative_moments(t, y, counts):
+    # Times are shifted to each row's first read to keep the sums well conditioned.
+    inside = np.arange(t.shape[1]) < counts[:, None]
+    tc = np.where(inside, t - t[:, :1], 0.0)
+    yc = np.where(inside, y, 0.0)
+    stacked = np.stack([tc, yc, tc * tc, tc * yc, yc * yc])
+    zero = np.zeros(stacked.shape[:2] + (1,))
+    return np.concatenate([zero, np.cumsum(stacked, axis=2)], axis=2)
+
+
+def _moment_fit(n, sx, sy, sxx, sxy, syy):
+    # Least-squares slope and R2 from window sums; NaN where the window has no spread.
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var_x = n * sxx - sx**2
+        var_y = n * syy - sy**2
+        cov = n * sxy - sx * sy
+        slope = np.where(var_x > 0, cov / var_x, np.nan)
+        r2 = np.where((var_x > 0) & (var_y > 0), cov**2 / (var_x * var_y), np.nan)
+    return slope, r2
+
+
+def _sliding_moments(t, y, counts, window_points):
+    k = int(window_points)
+    n_wells, width = t.shape
+    n_windows = width - k + 1
+    if n_windows < 1:
+        empty = np.full((n_wells, 0), np.nan)
+        return empty, empty, empty, empty, empty
+    inside = np.arange(width) < counts[:, None]
+    cumulative = _cumulative_moments(t, y, counts)
+    sx, sy, sxx, sxy, syy = cumulative[:, :, k:] - cumulative[:, :, :-k]
+    complete = sliding_window_view(inside, k, axis=1).all(axis=2)
+    t_windows = sliding_window_view(t, k, axis=1)
+    slope, r2 = _moment_fit(k, sx, sy, sxx, sxy, syy)
+    slope = np.where(complete, slope, np.nan)
+    r2 = np.where(complete, r2, np.nan)
+    with np.errstate(invalid="ignore"):
+        center = np.where(complete, t_windows.mean(axis=2), np.nan)
+    start = np.where(complete, t_windows[:, :, 0], np.nan)
+    end = np.where(complete, t_windows[:, :, -1], np.nan)
+    return slope, r2, center, start, end
+
+
+def sliding_window_growth(
+    long_df,
+    window_points=5,
+    min_od=None,
+    time_col="time",
+    value_col="od",
+    group_cols=("treatment", "replicate"),
+):
+    group_cols = list(group_cols)
+    keys, t, od, valid = _well_matrix(long_df, time_col, value_col, group_cols)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Reads below min_od (noisy, near-blank values) are dropped before windowing.
+        usable = valid & (od > (0.0 if min_od is None else float(min_od)))
+        (t, y), n = _pack_left(usable, t, np.log(np.where(usable, od, np.nan)))
+    slope, r2, center, start, end = _sliding_moments(t, y, n, window_points)
+    summary = keys.copy()
+    for col in ("sliding_mu_max", "sliding_mu_max_time", "sliding_window_start", "sliding_window_end", "sliding_r2"):
+        summary[col] = np.nan
+    has_slope = np.isfinite(slope).any(axis=1) if slope.size else np.zeros(len(keys), dtype=bool)
+    rows = np.flatnonzero(has_slope)
+    if rows.size:
+        best = np.nanargmax(slope[rows], axis=1)
+        summary.loc[rows, "sliding_mu_max"] = slope[rows, best]
+        summary.loc[rows, "sliding_mu_max_time"] = center[rows, best]
+        summary.loc[rows, "sliding_window_start"] = start[rows, best]
+        summary.loc[rows, "sliding_window_end"] = end[rows, best]
+        summary.loc[rows, "sliding_r2"] = r2[rows, best]
+    well_idx, window_idx = np.nonzero(np.isfinite(slope))
+    trace = keys.iloc[well_idx].reset_index(drop=True)
+    trace["time"] = center[well_idx, window_idx]
+    trace["mu"] = slope[well_idx, window_idx]
+    return summary, trace
+
+
+def _suggest_fit_window(long_df, window_points=5, fraction=0.8):
+    # Widest span around the steepest window whose rate stays within `fraction` of the max.
+    mean_curve = (
+        long_df.assign(treatment="all", replicate=1)
+        .groupby(["treatment", "replicate", "time"], as_index=False)["od"]
+        .mean()
+    )
+    keys, t, od, valid = _well_matrix(mean_curve)
+    if not len(keys):
+        return None
+    with np.errstate(invalid="ignore", divide="ignore"):
+        usable = valid & (od > 0)
+        (t, y), n = _pack_left(usable, t, np.log(np.where(usable, od, np.nan)))
+    slope, _, _, start, end = _sliding_moments(t, y, n, window_points)
+    if not slope.size or not np.isfinite(slope[0]).any() or np.nanmax(slope[0]) <= 0:
+        return None
+    mu = slope[0]
+    best = int(np.nanargmax(mu))
+    strong = np.where(np.isfinite(mu), mu >= fraction * mu[best], False)
+    breaks = np.flatnonzero(~strong)
+    first = breaks[breaks < best].max() + 1 if (breaks < best).any() else 0
+    last = breaks[breaks > best].min() - 1 if (breaks > best).any() else len(mu) - 1
+    return float(start[0, first]), float(end[0, last])
+
+
+OUTLIER_METHODS = ("curve", "mu", "auc")
+
+
+def _modified_zscores(values, codes, n_groups, min_mad_fraction=0.0):
+    # A zero MAD falls back to the mean absolute deviation; it can also be floored.
+    sizes = np.bincount(codes, minlength=n_groups)
+    order = np.argsort(codes, kind="stable")
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    position = np.arange(len(codes)) - starts[codes[order]]
+    padded = np.full((n_groups, max(int(sizes.max(initial=0)), 1)), np.nan)
+    padded[codes[order], position] = values[order]
+    median = _row_median(padded)
+    deviation = np.abs(padded - median[:, None])
+    mad = np.fmax(_row_median(deviation), min_mad_fraction * np.abs(median))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_ad = np.nanmean(np.where(np.isfinite(deviation), deviation, np.nan), axis=1)
+        centred = values - median[codes]
+        z = np.where(
+            mad[codes] > 0,
+            0.6745 * centred / mad[codes],
+            np.where(mean_ad[codes] > 0, centred / (1.2533 * mean_ad[codes]), 0.0),
+        )
+    return z, sizes[codes]
+
+
+def replicate_outliers(
+    long_df,
+    results_df,
+    method="curve",
+    threshold=3.5,
+    time_col="time",
+    value_col="od",
+    group_cols=("treatment", "replicate"),
+):
+    # Treatments with fewer than 3 replicates are never flagged.
+    if method not in OUTLIER_METHODS:
+        raise ValueError(f"Unknown outlier method '{method}'; use one of {OUTLIER_METHODS}.")
+    group_cols = list(group_cols)
+    treatment_col = group_cols[0]
+    if method == "curve":
+        data = long_df[group_cols + [time_col, value_col]].copy()
+        data[value_col] = pd.to_numeric(data[value_col], errors="coerce")
+        wide = data.pivot_table(index=group_cols, columns=time_col, values=value_col, aggfunc="mean")
+        keys = wide.index.to_frame(index=False)
+        codes, _ = pd.factorize(keys[treatment_col], sort=True)
+        n_groups = int(codes.max()) + 1 if len(codes) else 0
+        curves = wide.to_numpy(dtype=float)
+        sizes = np.bincount(codes, minlength=n_groups)
+        order = np.argsort(codes, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        position = np.arange(len(codes)) - starts[codes[order]]
+        stacked = np.full((n_groups, max(int(sizes.max(initial=0)), 1), curves.shape[1]), np.nan)
+        stacked[codes[order], position] = curves[order]
+        with np.errstate(invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            median_curve = np.nanmedian(stacked, axis=1)
+            score = np.sqrt(np.nanmean((curves - median_curve[codes]) ** 2, axis=1))
+    else:
+        keys, x, od, valid = _well_matrix(long_df, time_col, value_col, group_cols)
+        if method == "mu":
+            fit = keys.merge(results_df[group_cols + ["mu"]], on=group_cols, how="left")
+            score = fit["mu"].to_numpy(dtype=float)
+        else:
+            both = valid[:, 1:] & valid[:, :-1]
+            segments = np.where(both, 0.5 * (od[:, 1:] + od[:, :-1]) * np.diff(x, axis=1), 0.0)
+            score = np.where(valid.sum(axis=1) >= 2, segments.sum(axis=1), np.nan)
+        codes, _ = pd.factorize(keys[treatment_col], sort=True)
+        n_groups = int(codes.max()) + 1 if len(codes) else 0
+    # With 3-4 replicates the MAD is easily near zero, so it is floored.
+    z, sizes = _modified_zscores(score, codes, n_groups, 0.25 if method == "curve" else 0.05)
+    flagged = (z > threshold) if method == "curve" else (np.abs(z) > threshold)
+    scored = (sizes >= 3) & np.isfinite(score)
+    flags = keys[group_cols].assign(outlier_score=np.where(scored, z, np.nan), outlier=flagged & scored)
+    out = results_df.drop(columns=["outlier_score", "outlier"], errors="ignore")
+    out = out.merge(flags, on=group_cols, how="left")
+    out["outlier"] = out["outlier"].fillna(False).astype(bool)
+    return out
+
+
+def fit_window_sweep(
+    long_df,
+    starts=None,
+    ends=None,
+    steps=12,
+    min_points=3,
+    time_col="time",
+    value_col="od",
+    group_cols=("treatment", "replicate"),
+):
+    # Each window fit is two lookups into the cumulative moments.
+    group_cols = list(group_cols)
+    keys, t, od, valid = _well_matrix(long_df, time_col, value_col, group_cols)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        usable = valid & (od > 0)
+        (t, y), n = _pack_left(usable, t, np.log(np.where(usable, od, np.nan)))
+    columns = group_cols + ["window_start", "window_end", "n", "mu", "r2"]
+    if not len(keys) or not n.any():
+        return pd.DataFrame(columns=columns)
+    if starts is None or ends is None:
+        grid = np.linspace(np.nanmin(t), np.nanmax(t), int(steps))
+        starts = grid if starts is None else starts
+        ends = grid if ends is None else ends
+    starts = np.asarray(starts, dtype=float)
+    ends = np.asarray(ends, dtype=float)
+    cumulative = _cumulative_moments(t, y, n)
+    # Padding is NaN, so it never counts as below a start or up to an end.
+    with np.errstate(invalid="ignore"):
+        lo = (t[:, :, None] < starts).sum(axis=1)
+        hi = (t[:, :, None] <= ends).sum(axis=1)
+    n_wells = len(keys)
+    rows = np.arange(n_wells)[:, None, None]
+    lo_idx = np.broadcast_to(lo[:, :, None], (n_wells, len(starts), len(ends)))
+    hi_idx = np.broadcast_to(hi[:, None, :], (n_wells, len(starts), len(ends)))
+    sums = cumulative[:, rows, hi_idx] - cumulative[:, rows, lo_idx]
+    count = hi_idx - lo_idx
+    slope, r2 = _moment_fit(count, *sums)
+    ok = (count >= int(min_points)) & (ends[None, None, :] > starts[None, :, None]) & np.isfinite(slope)
+    well_idx, start_idx, end_idx = np.nonzero(ok)
+    sweep = keys.iloc[well_idx].reset_index(drop=True)
+    sweep["window_start"] = starts[start_idx]
+    sweep["window_end"] = ends[end_idx]
+    sweep["n"] = count[ok]
+    sweep["mu"] = slope[ok]
+    sweep["r2"] = r2[ok]
+    return sweep[columns]
+
+
+def _sweep_summary(sweep, group_col="treatment"):
+    grouped = sweep.groupby([group_col, "window_start", "window_end"])
+    summary = grouped.agg(mu=("mu", "mean"), mu_sd=("mu", "std"), r2=("r2", "mean"), replicates=("mu", "size"))
+    summary = summary.reset_index()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        summary["mu_cv"] = summary["mu_sd"] / summary["mu"].abs()
+    return summary
+
+
+def _interp_rows(t, y, counts, grid):
+    # Row r is offset to [2r, 2r + 1] so one searchsorted call covers every row.
+    n_rows, width = t.shape
+    grid = np.asarray(grid, dtype=float)
+    out = np.full((n_rows, len(grid)), np.nan)
+    if not n_rows or not width or not len(grid):
+        return out
+    inside = np.arange(width) < counts[:, None]
+    lo = min(np.nanmin(np.where(inside, t, np.inf)), grid.min())
+    span = max(np.nanmax(np.where(inside, t, -np.inf)), grid.max()) - lo or 1.0
+    rows = np.arange(n_rows)[:, None]
+    keys = np.where(inside, (t - lo) / span, 1.5) + 2 * rows
+    queries = np.clip((grid - lo) / span, 0.0, 1.0) + 2 * rows
+    idx = np.searchsorted(keys.ravel(), queries.ravel(), side="right").reshape(queries.shape) - 1
+    last = np.maximum(counts - 1, 0)[:, None]
+    i = np.clip(idx - width * rows, 0, np.maximum(last - 1, 0))
+    j = np.minimum(i + 1, last)
+    x0, x1 = t[rows, i], t[rows, j]
+    y0, y1 = y[rows, i], y[rows, j]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = np.where(x1 > x0, (grid - x0) / (x1 - x0), 0.0)
+        covered = (counts[:, None] > 0) & (grid >= t[:, :1]) & (grid <= t[rows, last])
+    return np.where(covered, y0 + weight * (y1 - y0), out)
+
+
+def _common_time_grid(t, counts, step=None, max_points=2000):
+    inside = np.arange(t.shape[1]) < counts[:, None]
+    if not inside.any():
+        return np.array([], dtype=float)
+    lo = float(t[inside].min())
+    hi = float(t[inside].max())
+    if step is None:
+        gaps = np.diff(t, axis=1)[inside[:, 1:]]
+        gaps = gaps[gaps > 0]
+        step = float(np.median(gaps)) if len(gaps) else hi - lo
+    if hi <= lo or step <= 0:
+        return np.array([lo])
+    n_points = min(int(np.floor((hi - lo) / step + 1e-9)) + 1, int(max_points))
+    return np.linspace(lo, lo + step * (n_points - 1) if n_points < max_points else hi, max(n_points, 2))
+
+
+def align_to_time_grid(
+    long_df,
+    grid=None,
+    step=None,
+    time_col="time",
+    value_col="od",
+    group_cols=("treatment", "replicate"),
+    max_points=2000,
+):
+    group_cols = list(group_cols)
+    keys, t, y, valid = _well_matrix(long_df, time_col, value_col, group_cols)
+    counts = valid.sum(axis=1)
+    if grid is None:
+        grid = _common_time_grid(t, counts, step=step, max_points=max_points)
+    grid = np.asarray(grid, dtype=float)
+    values = _interp_rows(t, y, counts, grid)
+    aligned = keys.loc[keys.index.repeat(len(grid))].reset_index(drop=True)
+    aligned[time_col] = np.tile(grid, len(keys))
+    aligned[value_col] = values.ravel()
+    return aligned
+
+
+def aligned_mean_sd(
+    long_df,
+    grid=None,
+    step=None,
+    group_cols=("run", "treatment"),
+    replicate_col="replicate",
+    time_col="time",
+    value_col="od",
+    max_points=2000,
+):
+    # Grid times no replicate of a group covers are dropped.
+    group_cols = list(group_cols)
+    keys, t, y, valid = _well_matrix(long_df, time_col, value_col, group_cols + [replicate_col])
+    counts = valid.sum(axis=1)
+    if grid is None:
+        grid = _common_time_grid(t, counts, step=step, max_points=max_points)
+    grid = np.asarray(grid, dtype=float)
+    values = _interp_rows(t, y, counts, grid)
+    # Wells come sorted by group (groupby order), so group sums are reduceat slices.
+    codes = keys.groupby(group_cols, sort=True).ngroup().to_numpy()
+    groups = keys[group_cols].drop_duplicates().sort_values(group_cols).reset_index(drop=True)
+    if not len(keys):
+        return pd.DataFrame(columns=group_cols + [time_col, "mean", "sd", "n"])
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    finite = np.isfinite(values)
+    n = np.add.reduceat(finite.astype(float), starts, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.add.reduceat(np.where(finite, values, 0.0), starts, axis=0) / n
+        spread = np.where(finite, values - mean[codes], 0.0)
+        sd = np.sqrt(np.add.reduceat(spread**2, starts, axis=0) / (n - 1))
+    sd = np.where(n >= 2, sd, np.nan)
+    summary = groups.loc[groups.index.repeat(len(grid))].reset_index(drop=True)
+    summary[time_col] = np.tile(grid, len(groups))
+    summary["mean"] = mean.ravel()
+    summary["sd"] = sd.ravel()
+    summary["n"] = n.ravel().astype(int)
+    return summary[summary["n"] > 0].reset_index(drop=True)
+
+
+def common_time_grid(long_df, step=None, time_col="time", group_cols=("run", "treatment"), max_points=2000):
+    keys, t, _, valid = _well_matrix(long_df.assign(_read=1.0), time_col, "_read", group_cols)
+    return _common_time_grid(t, valid.sum(axis=1), step=step, max_points=max_points)
+
+
+def align_summary_curves(summary_df, grid, group_cols=("run", "treatment"), time_col="time"):
+    # Stored mean/SD curves (no replicates) onto `grid`, in the aligned_mean_sd layout.
+    group_cols = list(group_cols)
+    aligned = align_to_time_grid(summary_df, grid, time_col=time_col, value_col="mean", group_cols=group_cols)
+    for col in ("sd", "n"):
+        other = align_to_time_grid(summary_df, grid, time_col=time_col, value_col=col, group_cols=group_cols)
+        aligned = aligned.merge(other, on=group_cols + [time_col], how="left")
+    aligned = aligned[aligned["mean"].notna()].reset_index(drop=True)
+    aligned["n"] = np.floor(aligned["n"].fillna(1)).astype(int)
+    return aligned
+
+
+def curve_differences(mean_df, reference, by="run", group_cols=("treatment",), time_col="time"):
+    group_cols = list(group_cols)
+    base = mean_df[mean_df[by] == reference][group_cols + [time_col, "mean", "sd"]]
+    base = base.rename(columns={"mean": "reference_mean", "sd": "reference_sd"})
+    diff = mean_df[mean_df[by] != reference].merge(base, on=group_cols + [time_col], how="inner")
+    diff["difference"] = diff["mean"] - diff["reference_mean"]
+    diff["difference_sd"] = np.sqrt(diff["sd"] ** 2 + diff["reference_sd"] ** 2)
+    return diff[[by] + group_cols + [time_col, "difference", "difference_sd"]]
+
+
 def _base_time_unit(time_unit):
     return "minutes" if time_unit == "hh:mm:ss" else time_unit
 
@@ -291,6 +1335,16 @@ def _mean_sd_by_treatment_time(df):
     )
 
 
+def _curve_arrays(mean_df, key_col="treatment"):
+    if mean_df.empty:
+        return {}
+    positions = mean_df.groupby(key_col, sort=False).indices
+    time = mean_df["time"].to_numpy(dtype=float)
+    mean = mean_df["mean"].to_numpy(dtype=float)
+    sd = mean_df["sd"].to_numpy(dtype=float)
+    return {key: (time[pos], mean[pos], sd[pos]) for key, pos in positions.items()}
+
+
 def _strip_replicate_suffix(name):
     return re.sub(r"[._-]\\d+$", "", str(name)).strip()
 
@@ -315,67 +1369,158 @@ def _compute_auc(
     group_cols=("treatment", "replicate"),
     time_window=None,
 ):
-    rows = []
-    for group, g in df.groupby(list(group_cols)):
-        g = g.dropna(subset=[time_col, value_col]).sort_values(time_col)
-        if time_window is not None:
-            t_min, t_max = time_window
-            g = g[(g[time_col] >= t_min) & (g[time_col] <= t_max)]
-        if len(g) < 2:
-            auc = np.nan
-        else:
-            x = g[time_col].to_numpy(dtype=float)
-            y = g[value_col].to_numpy(dtype=float)
-            try:
-                auc = np.trapezoid(y, x)
-            except AttributeError:
-                auc = np.trapz(y, x)
-        rows.append(
+    return _window_auc(_well_arrays(df, time_col, value_col, group_cols), time_window)
+
+
+def _validation_report(df, time_col, data_cols):
+    present = [c for c in data_cols if c in df.columns]
+    report = {
+        "time_col": time_col,
+        "time_found": time_col in df.columns,
+        "time_rows": len(df),
+        "time_invalid": 0,
+        "missing_columns": [c for c in data_cols if c not in df.columns],
+        "columns": pd.DataFrame(columns=["column", "missing", "non_numeric", "non_positive"]),
+    }
+    if not report["time_found"]:
+        return report
+    report["time_invalid"] = int(_parse_time_series(df[time_col]).isna().sum())
+    if present:
+        values = _numeric_matrix(df, present)
+        nan = np.isnan(values)
+        source_missing = df[present].isna().to_numpy()
+        with np.errstate(invalid="ignore"):
+            non_positive = values <= 0
+        report["columns"] = pd.DataFrame(
             {
-                "treatment": group[0],
-                "replicate": group[1],
-                "auc": auc,
+                "column": present,
+                "missing": (nan & source_missing).sum(axis=0),
+                "non_numeric": (nan & ~source_missing).sum(axis=0),
+                "non_positive": non_positive.sum(axis=0),
             }
         )
-    return pd.DataFrame(rows)
+    return report
 
 
-def _validate_data(df, time_col, data_cols):
+def _validation_messages(report, include_columns=True):
+    if not report["time_found"]:
+        return ["Time column not found."]
     issues = []
-    if time_col not in df.columns:
-        issues.append("Time column not found.")
-        return issues
-    time_vals = _parse_time_series(df[time_col])
-    if time_vals.isna().all():
+    if report["time_rows"] and report["time_invalid"] == report["time_rows"]:
         issues.append("Time column could not be parsed.")
-    if time_vals.isna().sum() > 0:
+    if report["time_invalid"] > 0:
         issues.append("Time column has missing/invalid values.")
-    for col in data_cols:
-        if col not in df.columns:
-            issues.append(f"Missing column: {col}")
-            continue
-        series = pd.to_numeric(df[col], errors="coerce")
-        if series.isna().sum() > 0:
+    for col in report["missing_columns"]:
+        issues.append(f"Missing column: {col}")
+    if not include_columns:
+        return issues
+    for col, row in report["columns"].set_index("column").iterrows():
+        if row["missing"] + row["non_numeric"] > 0:
             issues.append(f"{col}: missing values detected.")
-        if (series <= 0).sum() > 0:
+        if row["non_positive"] > 0:
             issues.append(f"{col}: non-positive OD values detected.")
     return issues
 
 
-def _qc_flags(results_df, r2_threshold=0.9):
-    flags = []
-    for _, row in results_df.iterrows():
-        issues = []
-        if pd.notna(row.get("r2")) and row["r2"] < r2_threshold:
-            issues.append(f"low_r2(<{r2_threshold})")
-        if pd.notna(row.get("mu")) and row["mu"] <= 0:
-            issues.append("non_positive_mu")
-        flags.append(", ".join(issues) if issues else "")
+def _validate_data(df, time_col, data_cols):
+    return _validation_messages(_validation_report(df, time_col, data_cols))
+
+
+# Bits are fixed so stored masks stay readable when rules are added.
+QC_RULES = {
+    "min_r2": (1, 0.9),
+    "non_positive_mu": (2, True),
+    "min_points": (4, None),
+    "max_od": (8, None),
+    "max_blank_drift": (16, None),
+    "max_ci_width": (32, None),
+    "max_replicate_cv": (64, None),
+    "replicate_outlier": (128, True),
+}
+DEFAULT_QC_RULES = {name: default for name, (_, default) in QC_RULES.items()}
+
+
+def _qc_rule_label(name, setting):
+    setting = f"{float(setting):g}" if not isinstance(setting, bool) else setting
+    labels = {
+        "min_r2": f"low_r2(<{setting})",
+        "non_positive_mu": "non_positive_mu",
+        "min_points": f"few_points(<{setting})",
+        "max_od": f"saturated(od>{setting})",
+        "max_blank_drift": f"blank_drift(>{setting})",
+        "max_ci_width": f"wide_ci(>{setting})",
+        "max_replicate_cv": f"high_replicate_cv(>{setting})",
+        "replicate_outlier": "replicate_outlier",
+    }
+    return labels[name]
+
+
+def _qc_rule_masks(results_df, rules):
+    # Rules whose input column is absent never fire.
+    n_rows = len(results_df)
+
+    def _column(name):
+        if name not in results_df.columns:
+            return np.full(n_rows, np.nan)
+        return pd.to_numeric(results_df[name], errors="coerce").to_numpy(dtype=float)
+
+    mu = _column("mu")
+    masks = {}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for name, setting in rules.items():
+            if setting is None or setting is False:
+                continue
+            if name == "min_r2":
+                masks[name] = _column("r2") < float(setting)
+            elif name == "non_positive_mu":
+                masks[name] = mu <= 0
+            elif name == "min_points":
+                masks[name] = _column("n") < float(setting)
+            elif name == "max_od":
+                masks[name] = _column("od_max") > float(setting)
+            elif name == "max_blank_drift":
+                masks[name] = _column("blank_drift") > float(setting)
+            elif name == "max_ci_width":
+                # Relative to the estimate, so the rule does not depend on the rate unit.
+                width = (_column("mu_ci_high") - _column("mu_ci_low")) / np.abs(mu)
+                masks[name] = width > float(setting)
+            elif name == "max_replicate_cv":
+                group_cols = [c for c in ("run", "treatment") if c in results_df.columns]
+                grouped = pd.Series(mu, index=results_df.index).groupby(
+                    [results_df[c] for c in group_cols], dropna=False
+                )
+                cv = (grouped.transform("std") / grouped.transform("mean").abs()).to_numpy(dtype=float)
+                masks[name] = cv > float(setting)
+            elif name == "replicate_outlier":
+                outlier = results_df.get("outlier", pd.Series(False, index=results_df.index))
+                masks[name] = outlier.fillna(False).to_numpy(dtype=bool)
+            else:
+                raise ValueError(f"Unknown QC rule '{name}'; use one of {tuple(QC_RULES)}.")
+    return masks
+
+
+def qc_flags(results_df, rules=None):
+    # Labels are built once per distinct mask value rather than per row.
+    rules = {**DEFAULT_QC_RULES, **(rules or {})}
+    masks = _qc_rule_masks(results_df, rules)
+    qc_mask = np.zeros(len(results_df), dtype=np.int64)
+    for name, hit in masks.items():
+        qc_mask |= np.where(hit, QC_RULES[name][0], 0)
+    codes, inverse = np.unique(qc_mask, return_inverse=True)
+    labels = [
+        ", ".join(_qc_rule_label(name, rules[name]) for name in masks if code & QC_RULES[name][0])
+        for code in codes
+    ]
     out = results_df.copy()
-    out["qc_flags"] = flags
+    out["qc_flags"] = np.array(labels, dtype=object)[inverse] if len(out) else []
+    out["qc_mask"] = qc_mask
     return out
 
 
+def _qc_flags(results_df, r2_threshold=0.9):
+    return qc_flags(results_df, {"min_r2": r2_threshold})
+
+
 def _window_r2_by_treatment(long_df, time_window=None):
     rows = []
     for treatment, g in long_df.groupby("treatment"):
@@ -417,3 +1562,26 @@ def _auto_window_from_long_df(long_df, min_points=5):
     starts = [w[0] for w in windows]
     ends = [w[1] for w in windows]
     return (float(np.median(starts)), float(np.median(ends)))
+
+
+def _well_metric_frame(results_df, column_map, treatment_col="treatment", replicate_col="replicate"):
+    rows = []
+    layout = _plate_layout([entry["column"] for entry in column_map]) or {}
+    for entry in column_map:
+        if entry["column"] not in layout:
+            continue
+        well, row, col = layout[entry["column"]]
+        rows.append(
+            {
+                "column": entry["column"],
+                "well": well,
+                "plate_row": row,
+                "plate_col": col,
+                treatment_col: entry["treatment"],
+                replicate_col: int(entry["replicate"]),
+            }
+        )
+    wells = pd.DataFrame(rows, columns=["column", "well", "plate_row", "plate_col", treatment_col, replicate_col])
+    if wells.empty:
+        return wells
+    return wells.merge(results_df, on=[treatment_col, replicate_col], how="left")
@@ -1,10 +1,56 @@
 import io
+import json
 
 import pandas as pd
 import streamlit as st
 
-from odyssey.analysis import _compute_auc, _long_format_from_map, _mean_sd_by_treatment_time, fit_growth_rates
-from odyssey.io_utils import _apply_time_unit, _parse_time_series, _read_excel_file
+from odyssey.analysis import _long_format_from_map, _mean_sd_by_treatment_time, _validation_report
+from odyssey.io_utils import (
+    _NamedBytesIO,
+    _apply_time_unit,
+    _parse_time_series,
+    _read_excel_file,
+    _read_results_zip,
+)
+from odyssey.jobs import JobRunner
+from odyssey.pipeline import _blank_kwargs, analyze_file, apply_blank_normalization
+
+
+@st.cache_resource(show_spinner=False)
+def _job_runner():
+    return JobRunner(max_workers=2)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_excel_sheet_names(content_hash, _file_bytes):
+    return pd.ExcelFile(io.BytesIO(_file_bytes)).sheet_names
+
+
+@st.cache_data(show_spinner=False)
+def _cached_excel_sheet(content_hash, sheet_name, _file_bytes):
+    xls = pd.ExcelFile(io.BytesIO(_file_bytes))
+    try:
+        return pd.read_excel(xls, sheet_name=sheet_name, mangle_dupe_cols=False)
+    except TypeError:
+        return pd.read_excel(xls, sheet_name=sheet_name)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_working_sheet(content_hash, sheet_name, time_col, blank_cols, blank_options_json, _df):
+    # Blank-normalized sheet plus its validation report, keyed on the file hash and the
+    # blank settings; blank_cols is empty when the sheet is already normalized.
+    working_df = _df.copy()
+    if blank_cols:
+        blank_options = json.loads(blank_options_json) if blank_options_json else None
+        blank_kwargs = _blank_kwargs(_df, time_col, list(blank_cols), blank_options)
+        working_df = apply_blank_normalization(_df, time_col, list(blank_cols), **blank_kwargs)
+    report = _validation_report(working_df, time_col, [c for c in working_df.columns if c != time_col])
+    return working_df, report
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_results_zip(content_hash, name, _zip_bytes):
+    return _read_results_zip(_NamedBytesIO(_zip_bytes, name))
 
 
 @st.cache_data(show_spinner=False)
@@ -16,19 +62,14 @@ def _cached_preview_data(
     column_map_json,
     blank_normalized,
     blank_col,
+    blank_options_json=None,
 ):
     uploaded = io.BytesIO(file_bytes)
     df = _read_excel_file(uploaded, sheet_name)
     if not blank_normalized and blank_col:
-        data_cols = [c for c in df.columns if c != time_col]
-        numeric = df[data_cols].apply(pd.to_numeric, errors="coerce")
-        if isinstance(blank_col, (list, tuple, pd.Index)):
-            blank_cols = list(blank_col)
-        else:
-            blank_cols = [blank_col]
-        blank_values = df[blank_cols].apply(pd.to_numeric, errors="coerce")
-        blank_mean = blank_values.mean(axis=1)
-        df[data_cols] = numeric.sub(blank_mean, axis=0)
+        blank_options = json.loads(blank_options_json) if blank_options_json else None
+        blank_kwargs = _blank_kwargs(df, time_col, blank_col, blank_options)
+        df = apply_blank_normalization(df, time_col, blank_col, **blank_kwargs)
     time_series = _parse_time_series(df[time_col])
     time_series = _apply_time_unit(time_series, time_unit if time_unit != "hh:mm:ss" else "minutes")
     working_df = df.copy()
@@ -54,42 +95,20 @@ def _cached_analysis_data(
     blank_normalized,
     blank_cols,
     auc_window,
+    blank_options_json=None,
 ):
-    uploaded = io.BytesIO(file_bytes)
-    df = _read_excel_file(uploaded, sheet_name)
-    if not blank_normalized and blank_cols:
-        data_cols = [c for c in df.columns if c != time_col]
-        numeric = df[data_cols].apply(pd.to_numeric, errors="coerce")
-        if isinstance(blank_cols, (list, tuple, pd.Index)):
-            blank_list = list(blank_cols)
-        else:
-            blank_list = [blank_cols]
-        blank_values = df[blank_list].apply(pd.to_numeric, errors="coerce")
-        blank_mean = blank_values.mean(axis=1)
-        df[data_cols] = numeric.sub(blank_mean, axis=0)
-    time_series = _parse_time_series(df[time_col])
-    time_series = _apply_time_unit(time_series, time_unit if time_unit != "hh:mm:ss" else "minutes")
-    working_df = df.copy()
-    working_df["_time_numeric"] = time_series
-    column_map = pd.read_json(io.StringIO(column_map_json))
-    long_df = _long_format_from_map(working_df, "_time_numeric", column_map)
-    if long_df.empty:
-        raise ValueError("No treatment columns selected.")
-    results = fit_growth_rates(
-        long_df,
-        time_col="time",
-        value_col="od",
-        group_cols=("treatment", "replicate"),
-        time_window=time_window,
-        auto_window=False,
-        min_points=min_points,
-    )
-    mean_df = _mean_sd_by_treatment_time(long_df)
-    auc_df = _compute_auc(
-        long_df,
-        time_col="time",
-        value_col="od",
-        group_cols=("treatment", "replicate"),
-        time_window=auc_window,
+    analysis = analyze_file(
+        _NamedBytesIO(file_bytes, "upload.xlsx"),
+        sheet_name,
+        time_col,
+        time_unit,
+        pd.read_json(io.StringIO(column_map_json)),
+        time_window,
+        False,
+        min_points,
+        blank_normalized,
+        blank_cols,
+        auc_window=auc_window,
+        blank_options=json.loads(blank_options_json) if blank_options_json else None,
     )
-    return mean_df, long_df, results, auc_df
+    return analysis["mean_df"], analysis["long_df"], analysis["results"], analysis["auc"]
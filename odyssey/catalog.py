@@ -0,0 +1,385 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from odyssey.analysis import _base_time_unit
+from odyssey.compare import _canonical_frame, _cube_summary, build_results_cube
+from odyssey.export import RESULTS_SCHEMA_VERSION, SECONDS_PER_UNIT, _SI_UNITS
+from odyssey.io_utils import _NamedBytesIO, _read_results_zip
+
+CATALOG_ENV_VAR = "ODYSSEY_CATALOG"
+DEFAULT_CATALOG = "odyssey_catalog.sqlite"
+# Config keys that describe plot layout rather than the analysis.
+_SKIPPED_PARAMS = {"column_map", "plot_groups", "plot_labels", "notes", "updated_at", "version"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    sha256 TEXT NOT NULL UNIQUE,
+    run_date TEXT NOT NULL,
+    ingested_at TEXT NOT NULL,
+    time_unit TEXT,
+    notes TEXT,
+    config_json TEXT,
+    schema_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_run_date ON runs (run_date);
+CREATE TABLE IF NOT EXISTS run_params (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value TEXT,
+    number REAL
+);
+CREATE INDEX IF NOT EXISTS run_params_key_value ON run_params (key, value);
+CREATE INDEX IF NOT EXISTS run_params_key_number ON run_params (key, number);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    treatment TEXT NOT NULL,
+    replicate NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL,
+    text TEXT
+);
+CREATE INDEX IF NOT EXISTS results_treatment ON results (treatment, run_id);
+CREATE INDEX IF NOT EXISTS results_metric ON results (metric, treatment);
+CREATE INDEX IF NOT EXISTS results_run ON results (run_id);
+CREATE TABLE IF NOT EXISTS curves (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    treatment TEXT NOT NULL,
+    time_s REAL NOT NULL,
+    mean REAL,
+    sd REAL,
+    n INTEGER
+);
+CREATE INDEX IF NOT EXISTS curves_treatment ON curves (treatment, run_id);
+"""
+
+
+def open_catalog(path=None):
+    path = path or os.environ.get(CATALOG_ENV_VAR) or DEFAULT_CATALOG
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _flatten_params(config, prefix=""):
+    # Dotted keys for nested settings ("smoothing.method"); lists are stored as JSON.
+    rows = []
+    for key, value in (config or {}).items():
+        name = f"{prefix}{key}"
+        if not prefix and key in _SKIPPED_PARAMS:
+            continue
+        if isinstance(value, dict):
+            rows.extend(_flatten_params(value, f"{name}."))
+        elif isinstance(value, (list, tuple)):
+            rows.append((name, json.dumps(value, default=str), None))
+        elif isinstance(value, bool) or value is None:
+            rows.append((name, json.dumps(value), None))
+        elif isinstance(value, (int, float)):
+            rows.append((name, str(value), float(value)))
+        else:
+            rows.append((name, str(value), None))
+    return rows
+
+
+def _summary_curves(long_df, time_unit):
+    # Treatment mean, SD and replicate count at each read, with time in seconds.
+    df = long_df[["treatment", "time", "od"]].copy()
+    df["time"] = pd.to_numeric(df["time"], errors="coerce") * SECONDS_PER_UNIT[time_unit]
+    df["od"] = pd.to_numeric(df["od"], errors="coerce")
+    df = df.dropna()
+    curves = df.groupby(["treatment", "time"])["od"].agg(mean="mean", sd="std", n="count").reset_index()
+    return curves.rename(columns={"time": "time_s"})
+
+
+def _bundle_bytes(bundle):
+    if isinstance(bundle, (bytes, bytearray)):
+        return bytes(bundle)
+    if isinstance(bundle, (str, os.PathLike)):
+        with open(bundle, "rb") as handle:
+            return handle.read()
+    return bundle.getvalue() if hasattr(bundle, "getvalue") else bundle.read()
+
+
+def ingest_bundle(conn, bundle, name=None):
+    # Adds one export zip to the catalog; returns (run_id, added). Bundles are keyed by
+    # content hash, so ingesting the same zip twice is a no-op.
+    data = _bundle_bytes(bundle)
+    name = os.path.basename(name or getattr(bundle, "name", None) or str(bundle))
+    digest = hashlib.sha256(data).hexdigest()
+    existing = conn.execute("SELECT run_id FROM runs WHERE sha256 = ?", (digest,)).fetchone()
+    if existing:
+        return existing[0], False
+    parsed, err = _read_results_zip(_NamedBytesIO(data, name))
+    if err:
+        raise ValueError(err)
+    config = parsed.get("config") or {}
+    # Results go in as SI values under the canonical names, whichever export wrote them.
+    frame, kinds, factors, _ = _canonical_frame(parsed, "seconds")
+    if "treatment" not in frame.columns or "replicate" not in frame.columns:
+        raise ValueError(f"{name}: results have no treatment/replicate columns")
+    metrics = [col for col in frame.columns if col not in ("treatment", "replicate", "run")]
+    keys = frame[["treatment", "replicate"]]
+    result_rows = []
+    for metric in metrics:
+        raw = frame[metric]
+        numeric = pd.to_numeric(raw, errors="coerce") * factors.get(metric, 1.0)
+        text = raw.where(numeric.isna() & raw.notna())
+        keep = numeric.notna() | text.notna()
+        block = pd.DataFrame(
+            {
+                "treatment": keys["treatment"].astype(str),
+                "replicate": keys["replicate"],
+                "value": numeric.astype(object).where(numeric.notna(), None),
+                "text": text.astype(object).where(text.notna(), None).map(
+                    lambda value: None if value is None else str(value)
+                ),
+            }
+        )[keep.to_numpy()]
+        result_rows.extend((row[0], row[1], metric, row[2], row[3]) for row in block.itertuples(index=False))
+    schema = {
+        "schema_version": RESULTS_SCHEMA_VERSION,
+        "time_unit": "s",
+        "columns": {metric: _SI_UNITS.get(kinds.get(metric)) for metric in metrics},
+    }
+    time_unit = config.get("time_unit")
+    now = datetime.now(timezone.utc).isoformat()
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO runs (name, sha256, run_date, ingested_at, time_unit, notes, config_json, schema_json)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                name,
+                digest,
+                str(config.get("updated_at") or now),
+                now,
+                time_unit,
+                config.get("notes"),
+                json.dumps(config, default=str),
+                json.dumps(schema),
+            ),
+        )
+        run_id = cursor.lastrowid
+        conn.executemany(
+            "INSERT INTO run_params (run_id, key, value, number) VALUES (?, ?, ?, ?)",
+            [(run_id, *row) for row in _flatten_params(config)],
+        )
+        conn.executemany(
+            "INSERT INTO results (run_id, treatment, replicate, metric, value, text) VALUES (?, ?, ?, ?, ?, ?)",
+            [(run_id, *_sql_row(row)) for row in result_rows],
+        )
+        if parsed.get("long_df") is not None:
+            curves = _summary_curves(parsed["long_df"], _base_time_unit(time_unit or "minutes"))
+            conn.executemany(
+                "INSERT INTO curves (run_id, treatment, time_s, mean, sd, n) VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, *_sql_row(row)) for row in curves.itertuples(index=False)],
+            )
+    return run_id, True
+
+
+def _sql_row(row):
+    # numpy scalars and NaN are not SQLite types.
+    out = []
+    for value in row:
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float) and np.isnan(value):
+            value = None
+        out.append(value)
+    return out
+
+
+def _date_bound(value, upper=False):
+    # Date-only upper bounds include that whole day.
+    stamp = pd.Timestamp(value)
+    if upper and len(str(value)) <= 10:
+        return (stamp + pd.Timedelta(days=1)).isoformat(), "<"
+    return stamp.isoformat(), "<=" if upper else ">="
+
+
+def _run_filter(treatments=None, since=None, until=None, params=None, name=None):
+    # SQL predicates on runs (alias r) so SQLite can use its indexes for every filter.
+    # `params` maps config keys to a value or an inclusive (low, high) numeric range.
+    clauses = []
+    args = []
+    if treatments:
+        marks = ", ".join("?" * len(treatments))
+        clauses.append(f"r.run_id IN (SELECT run_id FROM results WHERE treatment IN ({marks}))")
+        args.extend(str(t) for t in treatments)
+    if since:
+        bound, op = _date_bound(since)
+        clauses.append(f"r.run_date {op} ?")
+        args.append(bound)
+    if until:
+        bound, op = _date_bound(until, upper=True)
+        clauses.append(f"r.run_date {op} ?")
+        args.append(bound)
+    for key, value in (params or {}).items():
+        if isinstance(value, (list, tuple)) and len(value) == 2:
+            clauses.append("r.run_id IN (SELECT run_id FROM run_params WHERE key = ? AND number BETWEEN ? AND ?)")
+            args.extend([key, float(value[0]), float(value[1])])
+        else:
+            if isinstance(value, bool) or value is None:
+                value = json.dumps(value)
+            clauses.append("r.run_id IN (SELECT run_id FROM run_params WHERE key = ? AND value = ?)")
+            args.extend([key, str(value)])
+    if name:
+        clauses.append("r.name LIKE ?")
+        args.append(name)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+
+def query_runs(conn, treatments=None, since=None, until=None, params=None, name=None):
+    where, args = _run_filter(treatments, since, until, params, name)
+    return pd.read_sql_query(
+        f"SELECT r.run_id, r.name, r.run_date, r.time_unit, r.notes FROM runs r{where} ORDER BY r.run_date",
+        conn,
+        params=args,
+    )
+
+
+def query_results(conn, treatments=None, metrics=None, since=None, until=None, params=None, name=None):
+    # Long (run, treatment, replicate, metric, value, text) rows in SI units.
+    where, args = _run_filter(treatments, since, until, params, name)
+    extra = []
+    if treatments:
+        extra.append(f"s.treatment IN ({', '.join('?' * len(treatments))})")
+        args = args + [str(t) for t in treatments]
+    if metrics:
+        extra.append(f"s.metric IN ({', '.join('?' * len(metrics))})")
+        args = args + list(metrics)
+    condition = (" WHERE " + " AND ".join(extra)) if extra else ""
+    sql = (
+        "SELECT s.run_id, r.name AS run, s.treatment, s.replicate, s.metric, s.value, s.text"
+        f" FROM results s JOIN (SELECT r.run_id, r.name FROM runs r{where}) r ON r.run_id = s.run_id{condition}"
+    )
+    return pd.read_sql_query(sql, conn, params=args)
+
+
+def query_curves(conn, treatments=None, since=None, until=None, params=None, name=None):
+    where, args = _run_filter(treatments, since, until, params, name)
+    condition = ""
+    if treatments:
+        condition = f" WHERE c.treatment IN ({', '.join('?' * len(treatments))})"
+        args = args + [str(t) for t in treatments]
+    sql = (
+        "SELECT c.run_id, r.name AS run, c.treatment, c.time_s, c.mean, c.sd, c.n"
+        f" FROM curves c JOIN (SELECT r.run_id, r.name FROM runs r{where}) r ON r.run_id = c.run_id{condition}"
+        " ORDER BY c.run_id, c.treatment, c.time_s"
+    )
+    return pd.read_sql_query(sql, conn, params=args)
+
+
+def catalog_runs(conn, treatments=None, metrics=None, since=None, until=None, params=None, name=None, curves=True):
+    # Matching runs as the run dicts the compare section and build_results_cube take
+    # (canonical results in SI units plus schema and config), with summary curves.
+    filters = dict(since=since, until=until, params=params, name=name)
+    where, args = _run_filter(treatments, **filters)
+    runs = pd.read_sql_query(
+        f"SELECT r.run_id, r.name, r.config_json, r.schema_json FROM runs r{where} ORDER BY r.run_date",
+        conn,
+        params=args,
+    )
+    results = query_results(conn, treatments=treatments, metrics=metrics, **filters)
+    # One unstack for all runs: the numeric value, or the text for text columns.
+    results["cell"] = results["value"].astype(object).where(results["value"].notna(), results["text"])
+    wide = (
+        results.drop_duplicates(["run_id", "treatment", "replicate", "metric"])
+        .set_index(["run_id", "treatment", "replicate", "metric"])["cell"]
+        .unstack("metric")
+    )
+    wide.columns.name = None
+    by_run = {run_id: frame.droplevel(0).reset_index() for run_id, frame in wide.groupby(level=0)}
+    curve_df = query_curves(conn, treatments=treatments, **filters) if curves else None
+    curves_by_run = dict(tuple(curve_df.groupby("run_id"))) if curve_df is not None else {}
+    out = []
+    for run in runs.itertuples(index=False):
+        canonical = by_run.get(run.run_id)
+        if canonical is None:
+            continue
+        run_curves = curves_by_run.get(run.run_id)
+        out.append(
+            {
+                "name": run.name,
+                "results": canonical,
+                "canonical": canonical,
+                "schema": json.loads(run.schema_json),
+                "config": json.loads(run.config_json) if run.config_json else None,
+                "long_df": None,
+                "curves": None if run_curves is None else run_curves.drop(columns=["run_id", "run"]),
+            }
+        )
+    return out
+
+
+def _parse_params(values):
+    params = {}
+    for item in values or []:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Expected KEY=VALUE or KEY=LOW..HIGH, got '{item}'.")
+        low, dots, high = value.partition("..")
+        params[key] = (float(low), float(high)) if dots else value
+    return params
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest and query the ODyssey run catalog.")
+    parser.add_argument("--db", help=f"Catalog path (default: ${CATALOG_ENV_VAR} or {DEFAULT_CATALOG}).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Add export zips to the catalog.")
+    ingest.add_argument("zips", nargs="+")
+    for command in ("runs", "query"):
+        sub = commands.add_parser(command, help="List matching runs." if command == "runs" else "Summarize metrics.")
+        sub.add_argument("--treatment", action="append", help="Repeat for several treatments.")
+        sub.add_argument("--since", help="Earliest run date (ISO date or timestamp).")
+        sub.add_argument("--until", help="Latest run date (inclusive).")
+        sub.add_argument("--param", action="append", help="Config filter KEY=VALUE or KEY=LOW..HIGH.")
+        sub.add_argument("--name", help="Run name pattern (SQL LIKE, e.g. '%%plate3%%').")
+        if command == "query":
+            sub.add_argument("--metric", action="append", help="Canonical metric name, e.g. mu or auc.")
+            sub.add_argument("--time-unit", default="hours", choices=["minutes", "hours"])
+            sub.add_argument("--csv", help="Write the summary to this CSV instead of printing it.")
+    args = parser.parse_args(argv)
+
+    conn = open_catalog(args.db)
+    if args.command == "ingest":
+        for path in args.zips:
+            try:
+                run_id, added = ingest_bundle(conn, path)
+            except ValueError as exc:
+                print(f"skipped {path}: {exc}", file=sys.stderr)
+                continue
+            print(f"{'added' if added else 'already present'} {path} (run {run_id})")
+        return
+    filters = dict(
+        treatments=args.treatment,
+        since=args.since,
+        until=args.until,
+        params=_parse_params(args.param),
+        name=args.name,
+    )
+    if args.command == "runs":
+        print(query_runs(conn, **filters).to_string(index=False))
+        return
+    runs = catalog_runs(conn, metrics=args.metric, curves=False, **filters)
+    summary = _cube_summary(build_results_cube(runs, target_time_unit=args.time_unit))
+    if args.csv:
+        summary.to_csv(args.csv, index=False)
+        print(f"Saved {args.csv}")
+    else:
+        print(summary.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from odyssey.analysis import _base_time_unit
+from odyssey.export import RESULTS_SCHEMA_VERSION, SECONDS_PER_UNIT, _canonical_kind, _si_factor
+
+CUBE_KEYS = ("treatment", "replicate")
+_IGNORED_COLUMNS = {"run"}
+_UNIT_LABELS = {
+    "minutes": {"rate": "per min", "duration": "min", "auc": "OD*min"},
+    "hours": {"rate": "per hour", "duration": "hours", "auc": "OD*hour"},
+}
+_SI_KINDS = {"1/s": "rate", "s": "duration", "OD*s": "auc", "OD": "od"}
+# Display labels of the canonical columns (the results table headers without units);
+# also used to map older display-only exports back onto the canonical names.
+_METRIC_LABELS = {
+    "treatment": "Treatment",
+    "replicate": "Replicate",
+    "n": "N",
+    "mu": "Growth rate",
+    "mu_ci_low": "Growth rate CI low",
+    "mu_ci_high": "Growth rate CI high",
+    "intercept": "Intercept",
+    "r2": "R\u00B2",
+    "doubling_time": "Doubling time",
+    "doubling_time_ci_low": "Doubling time CI low",
+    "doubling_time_ci_high": "Doubling time CI high",
+    "window_start": "Exponential window start",
+    "window_end": "Exponential window end",
+    "auc": "AUC",
+    "auc_window_start": "AUC window start",
+    "auc_window_end": "AUC window end",
+    "lag_time": "Lag time",
+    "model": "Model",
+    "model_mu_max": "Model max rate",
+    "model_lag": "Model lag",
+    "model_y0": "Model ln OD0",
+    "model_A": "Model ln(OD max/OD0)",
+    "model_shape": "Model shape (v)",
+    "model_capacity": "Model carrying capacity (OD)",
+    "model_r2": "Model R\u00B2",
+    "model_rmse": "Model RMSE (ln OD)",
+    "model_aic": "Model AIC",
+    "model_converged": "Model converged",
+    "sliding_mu_max": "Sliding max growth rate",
+    "sliding_mu_max_time": "Sliding max time",
+    "sliding_window_start": "Sliding window start",
+    "sliding_window_end": "Sliding window end",
+    "sliding_r2": "Sliding R\u00B2",
+    "qc_flags": "QC flags",
+    "qc_mask": "QC mask",
+    "od_max": "Max OD",
+    "blank_drift": "Blank drift (OD)",
+    "outlier_score": "Outlier score (robust z)",
+    "outlier": "Replicate outlier",
+}
+_CANONICAL_NAMES = {label: name for name, label in _METRIC_LABELS.items()}
+# Time units written in display headers, e.g. "Growth rate (h\u207B\u00B9)".
+_HEADER_UNITS = {
+    "min\u207B\u00B9": "minutes",
+    "h\u207B\u00B9": "hours",
+    "per min": "minutes",
+    "per hour": "hours",
+    "1/min": "minutes",
+    "1/hour": "hours",
+    "min": "minutes",
+    "hour": "hours",
+    "hours": "hours",
+    "OD*min": "minutes",
+    "OD*hour": "hours",
+}
+
+
+def _time_metric_kind(col):
+    col_lower = str(col).lower()
+    if "growth rate" in col_lower or "max rate" in col_lower:
+        return "rate"
+    if any(
+        key in col_lower
+        for key in ("doubling time", "window start", "window end", "lag", "time to od")
+    ):
+        return "duration"
+    if "auc" in col_lower:
+        return "auc"
+    return None
+
+
+def _display_column(col):
+    # (canonical name, kind, header time unit or None) of a display results.csv column.
+    # Time-based headers carry their unit in the first parentheses; older exports were
+    # converted to it, so it takes precedence over the run's base time unit.
+    col = str(col)
+    kind = _time_metric_kind(col)
+    unit = None
+    label = col
+    if kind is not None:
+        match = re.search(r"\s*\(([^)]*)\)", col)
+        if match:
+            unit = _HEADER_UNITS.get(match.group(1).strip())
+            label = (col[: match.start()] + col[match.end() :]).strip()
+    if label.startswith("Time to OD "):
+        return f"time_to_od_{label[len('Time to OD '):]}", "duration", unit
+    name = _CANONICAL_NAMES.get(label, label)
+    return name, _canonical_kind(name) if name in _METRIC_LABELS else kind, unit
+
+
+def _canonical_frame(run, target_time_unit):
+    # One run's per-well results with canonical column names and time-based values in
+    # `target_time_unit`. Exports with a canonical results file are read as is (values in
+    # SI seconds); older exports fall back to parsing the display headers.
+    schema = run.get("schema") or {}
+    canonical = run.get("canonical")
+    if canonical is not None and schema.get("schema_version", 0) <= RESULTS_SCHEMA_VERSION:
+        kinds = {col: _SI_KINDS.get(unit) for col, unit in schema.get("columns", {}).items()}
+        factors = {col: 1.0 / _si_factor(kind, target_time_unit) for col, kind in kinds.items() if kind}
+        return canonical, kinds, factors, None
+    df = run["results"]
+    df = df.loc[:, ~df.columns.duplicated()]
+    run_time_unit = (run.get("config") or {}).get("time_unit")
+    warning = None
+    if run_time_unit:
+        base_unit = _base_time_unit(run_time_unit)
+    else:
+        base_unit = target_time_unit
+        warning = f"{run['name']}: missing time_unit in config; assuming {target_time_unit}"
+    names = {}
+    kinds = {}
+    factors = {}
+    for col in df.columns:
+        name, kind, unit = _display_column(col)
+        if name in names.values():
+            continue
+        names[col] = name
+        kinds[name] = kind
+        if kind in ("rate", "duration", "auc"):
+            source = unit or base_unit
+            factors[name] = _si_factor(kind, source) / _si_factor(kind, target_time_unit)
+    return df[list(names)].rename(columns=names), kinds, factors, warning
+
+
+def build_results_cube(runs, target_time_unit="minutes"):
+    # Normalizes every run (as parsed by _read_results_zip) into one float cube indexed
+    # (run, treatment, replicate, metric) plus an object cube for text columns (QC flags,
+    # model names). Metrics use the canonical column names and `target_time_unit`;
+    # `units` holds the display unit per time-based metric.
+    if target_time_unit not in SECONDS_PER_UNIT:
+        raise ValueError(f"Unknown time unit '{target_time_unit}'.")
+    frames = []
+    skipped = []
+    warnings = []
+    kinds = {}
+    for run in runs:
+        df, run_kinds, factors, warning = _canonical_frame(run, target_time_unit)
+        missing = set(CUBE_KEYS) - set(df.columns)
+        if missing:
+            skipped.append(f"{run['name']}: missing columns {', '.join(sorted(missing))}")
+            continue
+        if warning:
+            warnings.append(warning)
+        for name, kind in run_kinds.items():
+            kinds.setdefault(name, kind)
+        frames.append((run["name"], df, factors))
+
+    names = list(
+        dict.fromkeys(
+            col for _, df, _ in frames for col in df.columns if col not in CUBE_KEYS and col not in _IGNORED_COLUMNS
+        )
+    )
+    keys = pd.concat([df[list(CUBE_KEYS)] for _, df, _ in frames], ignore_index=True) if frames else None
+    treatments = sorted(keys["treatment"].dropna().unique().tolist()) if frames else []
+    replicates = keys["replicate"].dropna().unique().tolist() if frames else []
+    replicates = sorted(replicates, key=lambda value: (isinstance(value, str), value))
+    treatment_index = pd.Index(treatments)
+    replicate_index = pd.Index(replicates)
+
+    # Per run: the numeric block (rows x metrics) and the text block, scattered into the
+    # cube by integer indices; a column is a metric if any run has a number in it.
+    blocks = []
+    has_numbers = np.zeros(len(names), dtype=bool)
+    for _, df, factors in frames:
+        t_idx = treatment_index.get_indexer(df["treatment"])
+        p_idx = replicate_index.get_indexer(df["replicate"])
+        ok = (t_idx >= 0) & (p_idx >= 0)
+        raw = df.reindex(columns=names)
+        numeric = raw.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        has_numbers |= np.isfinite(numeric).any(axis=0)
+        scale = np.array([factors.get(name, 1.0) for name in names])
+        blocks.append((t_idx[ok], p_idx[ok], numeric[ok] * scale, raw.to_numpy(dtype=object)[ok]))
+    metrics = [name for name, numeric in zip(names, has_numbers) if numeric]
+    labels = [name for name, numeric in zip(names, has_numbers) if not numeric]
+    shape = (len(frames), len(treatments), len(replicates))
+    values = np.full(shape + (len(metrics),), np.nan)
+    text = np.full(shape + (len(labels),), None, dtype=object)
+    present = np.zeros(shape, dtype=bool)
+    for r, (t_idx, p_idx, numeric, raw) in enumerate(blocks):
+        values[r, t_idx, p_idx] = numeric[:, has_numbers]
+        text[r, t_idx, p_idx] = raw[:, ~has_numbers]
+        present[r, t_idx, p_idx] = True
+    units = {name: _UNIT_LABELS.get(target_time_unit, {}).get(kinds.get(name)) for name in metrics}
+    return {
+        "runs": [name for name, _, _ in frames],
+        "treatments": treatments,
+        "replicates": replicates,
+        "metrics": metrics,
+        "labels": labels,
+        "units": units,
+        "time_unit": target_time_unit,
+        "values": values,
+        "text": text,
+        "present": present,
+        "skipped": skipped,
+        "warnings": warnings,
+    }
+
+
+def _metric_column(cube, metric):
+    if str(metric).startswith("time_to_od_"):
+        label = f"Time to OD {metric[len('time_to_od_'):]}"
+    else:
+        label = _METRIC_LABELS.get(metric, metric)
+    unit = cube["units"].get(metric)
+    return f"{label} ({unit})" if unit else label
+
+
+def _cube_table(cube, rename_map=None):
+    # One row per (run, treatment, replicate) cell that a run reported.
+    r, t, p = np.nonzero(cube["present"])
+    treatments = np.asarray(cube["treatments"], dtype=object)[t]
+    table = pd.DataFrame(
+        {
+            "run": np.asarray(cube["runs"], dtype=object)[r],
+            "treatment": treatments,
+            "replicate": np.asarray(cube["replicates"], dtype=object)[p],
+        }
+    )
+    for idx, metric in enumerate(cube["metrics"]):
+        table[_metric_column(cube, metric)] = cube["values"][r, t, p, idx]
+    for idx, label in enumerate(cube["labels"]):
+        table[_metric_column(cube, label)] = cube["text"][r, t, p, idx]
+    rename_map = rename_map or {}
+    table["treatment_display"] = [rename_map.get(name, name) for name in treatments]
+    return table.sort_values(["treatment_display", "run"], kind="stable").reset_index(drop=True)
+
+
+def _cube_summary(cube, rename_map=None):
+    # Replicate mean of every metric per run and display name. Treatments renamed to the
+    # same display name are pooled, as one (display x treatment) indicator contraction.
+    rename_map = rename_map or {}
+    display = [rename_map.get(name, name) for name in cube["treatments"]]
+    display_names = sorted(set(display), key=str)
+    indicator = np.zeros((len(display_names), len(display)))
+    indicator[[display_names.index(name) for name in display], np.arange(len(display))] = 1.0
+    values = cube["values"]
+    finite = np.isfinite(values)
+    sums = np.einsum("dt,rtpm->rdm", indicator, np.where(finite, values, 0.0))
+    counts = np.einsum("dt,rtpm->rdm", indicator, finite.astype(float))
+    reported = np.einsum("dt,rtp->rd", indicator, cube["present"].astype(float)) > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    r, d = np.nonzero(reported)
+    summary = pd.DataFrame(
+        {
+            "run": np.asarray(cube["runs"], dtype=object)[r],
+            "treatment_display": np.asarray(display_names, dtype=object)[d],
+        }
+    )
+    for idx, metric in enumerate(cube["metrics"]):
+        summary[_metric_column(cube, metric)] = means[r, d, idx]
+    return summary.sort_values(["treatment_display", "run"], kind="stable").reset_index(drop=True)
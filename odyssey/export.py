@@ -4,11 +4,33 @@ import zipfile
 from datetime import datetime, timezone
 import sys
 
+import pandas as pd
 import plotly.io as pio
 
-from odyssey.io_utils import _safe_filename
+from odyssey.analysis import qc_flags
+from odyssey.io_utils import CANONICAL_RESULTS_FILE, RESULTS_SCHEMA_FILE, _safe_filename
 
 CONFIG_VERSION = 1
+RESULTS_SCHEMA_VERSION = 1
+SECONDS_PER_UNIT = {"seconds": 1.0, "minutes": 60.0, "hours": 3600.0}
+# Time-based columns of the canonical results, by kind; everything else is OD or unitless.
+_RATE_COLUMNS = ("mu", "mu_ci_low", "mu_ci_high", "model_mu_max", "sliding_mu_max")
+_DURATION_COLUMNS = (
+    "doubling_time",
+    "doubling_time_ci_low",
+    "doubling_time_ci_high",
+    "lag_time",
+    "model_lag",
+    "window_start",
+    "window_end",
+    "sliding_mu_max_time",
+    "sliding_window_start",
+    "sliding_window_end",
+    "auc_window_start",
+    "auc_window_end",
+)
+_OD_COLUMNS = ("od_max", "blank_drift", "model_capacity")
+_SI_UNITS = {"rate": "1/s", "duration": "s", "auc": "OD*s", "od": "OD"}
 
 
 def _build_config(
@@ -32,6 +54,17 @@ def _build_config(
     show_sd,
     charts_per_row,
     plot_labels,
+    render_mode="auto",
+    blank_options=None,
+    bootstrap=None,
+    growth_model=None,
+    od_thresholds=None,
+    sliding_window=None,
+    smoothing=None,
+    fit_method="ols",
+    outliers=None,
+    qc_rules=None,
+    window_sweep=None,
 ):
     blank_col = blank_cols[0] if isinstance(blank_cols, list) and blank_cols else blank_cols
     return {
@@ -45,6 +78,16 @@ def _build_config(
         "blank_normalized": blank_normalized,
         "blank_cols": blank_cols,
         "blank_col": blank_col,
+        "blank_options": blank_options,
+        "bootstrap": bootstrap,
+        "growth_model": growth_model,
+        "od_thresholds": od_thresholds,
+        "sliding_window": sliding_window,
+        "smoothing": smoothing,
+        "fit_method": fit_method,
+        "outliers": outliers,
+        "qc_rules": qc_rules,
+        "window_sweep": window_sweep,
         "auc_mode": auc_mode,
         "auc_window": auc_window,
         "auc_unit": auc_unit,
@@ -57,10 +100,54 @@ def _build_config(
         "show_sd": show_sd,
         "charts_per_row": charts_per_row,
         "plot_labels": plot_labels,
+        "render_mode": render_mode,
         "updated_at": datetime.now(timezone.utc).isoformat(),
     }
 
 
+def _canonical_kind(col):
+    if col in _RATE_COLUMNS:
+        return "rate"
+    if col in _DURATION_COLUMNS or str(col).startswith("time_to_od_"):
+        return "duration"
+    if col == "auc":
+        return "auc"
+    if col in _OD_COLUMNS:
+        return "od"
+    return None
+
+
+def _si_factor(kind, time_unit):
+    # Multiplier taking a value measured in `time_unit` to SI seconds.
+    seconds = SECONDS_PER_UNIT[time_unit]
+    return {"rate": 1.0 / seconds, "duration": seconds, "auc": seconds}.get(kind, 1.0)
+
+
+def _canonical_results(analyses, time_unit, qc_rules=None):
+    # Per-well results with the analysis column names, time-based values in SI seconds
+    # and the schema that goes next to them in the export. `time_unit` is the run's base
+    # unit (minutes or hours), the unit every analysis column is computed in.
+    results = pd.concat([a["results"] for a in analyses], ignore_index=True)
+    auc = pd.concat([a["auc"] for a in analyses], ignore_index=True)
+    results = results.drop(columns=["run", "auc"], errors="ignore").merge(
+        auc, on=["treatment", "replicate"], how="left"
+    )
+    results = qc_flags(results, qc_rules)
+    columns = {}
+    for col in results.columns:
+        kind = _canonical_kind(col)
+        if kind in ("rate", "duration", "auc"):
+            results[col] = pd.to_numeric(results[col], errors="coerce") * _si_factor(kind, time_unit)
+        columns[col] = _SI_UNITS.get(kind)
+    schema = {
+        "schema_version": RESULTS_SCHEMA_VERSION,
+        "time_unit": "s",
+        "source_time_unit": time_unit,
+        "columns": columns,
+    }
+    return results, schema
+
+
 def build_download_zip(
     *,
     results,
@@ -74,6 +161,8 @@ def build_download_zip(
     download_plots,
     selected_plots,
     zip_filename,
+    download_trace=False,
+    canonical_results=None,
     progress_cb=None,
 ):
     bundle = io.BytesIO()
@@ -87,6 +176,7 @@ def build_download_zip(
     total_steps += 1 if download_results else 0
     total_steps += 1 if (download_long_df and analyses) else 0
     total_steps += len(selected_plot_labels) if download_plots else 0
+    total_steps += 1 if (download_trace and analyses) else 0
     progress_done = 0
 
     def _stage(stage):
@@ -110,6 +200,11 @@ def build_download_zip(
             _stage("results_csv (start)")
             t0 = datetime.now().timestamp()
             zf.writestr("results.csv", results.to_csv(index=False))
+            if canonical_results is not None:
+                # Fixed column names in SI units, for loaders; results.csv is for people.
+                canonical, schema = canonical_results
+                zf.writestr(CANONICAL_RESULTS_FILE, canonical.to_csv(index=False))
+                zf.writestr(RESULTS_SCHEMA_FILE, json.dumps(schema, indent=2))
             timings["results_csv_s"] = datetime.now().timestamp() - t0
             _tick("results_csv")
         if download_long_df and analyses:
@@ -130,6 +225,13 @@ def build_download_zip(
                 zf.writestr(f"plots/plot_{idx}_{safe_label}.html", html)
                 _tick(f"plot_html:{label}")
             timings["plots_html_s"] = datetime.now().timestamp() - t0
+        if download_trace and analyses:
+            _stage("trace_json (start)")
+            t0 = datetime.now().timestamp()
+            traces = [analysis["trace"] for analysis in analyses if analysis.get("trace")]
+            zf.writestr("trace.json", json.dumps({"analyses": traces}, indent=2))
+            timings["trace_json_s"] = datetime.now().timestamp() - t0
+            _tick("trace_json")
     bundle.seek(0)
     timings["total_s"] = datetime.now().timestamp() - total_start
     return bundle.getvalue(), zip_filename, warnings, timings
@@ -4,9 +4,16 @@ import os
 import re
 import zipfile
 
+import numpy as np
 import pandas as pd
 
 
+class _NamedBytesIO(io.BytesIO):
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
 def _safe_read_json(uploaded):
     try:
         return json.loads(uploaded.getvalue().decode("utf-8"))
@@ -25,6 +32,69 @@ def _guess_time_columns(df):
     return candidates
 
 
+_WELL_ID_PATTERN = re.compile(r"(?<![A-Za-z])([A-Za-z]{1,2})0*([1-9][0-9]?)(?![0-9])")
+
+PLATE_FORMATS = ((8, 12), (16, 24), (32, 48))
+
+
+def _parse_well_id(name):
+    match = _WELL_ID_PATTERN.search(str(name).strip())
+    if not match:
+        return None
+    letters = match.group(1).upper()
+    if len(letters) == 1:
+        row = ord(letters) - ord("A")
+    else:
+        if letters[0] != "A":
+            return None
+        row = 26 + ord(letters[1]) - ord("A")
+    col = int(match.group(2)) - 1
+    return f"{letters}{col + 1}", row, col
+
+
+def _row_label(row):
+    if row < 26:
+        return chr(ord("A") + row)
+    return "A" + chr(ord("A") + row - 26)
+
+
+def _plate_dimensions(max_row, max_col):
+    for n_rows, n_cols in PLATE_FORMATS:
+        if max_row < n_rows and max_col < n_cols:
+            return n_rows, n_cols
+    return max_row + 1, max_col + 1
+
+
+def _plate_layout(columns):
+    # {column: (well, row, col)} when the columns read as one plate: every name parses,
+    # no two share a well and all fit a standard plate format. Otherwise None, so names
+    # such as "T1" or "C2" in a treatment layout are not drawn as made-up wells.
+    layout = {}
+    for column in columns:
+        parsed = _parse_well_id(column)
+        if parsed is None:
+            return None
+        layout[column] = parsed
+    positions = {(row, col) for _, row, col in layout.values()}
+    if not layout or len(positions) != len(layout):
+        return None
+    max_row = max(row for row, _ in positions)
+    max_col = max(col for _, col in positions)
+    if not any(max_row < n_rows and max_col < n_cols for n_rows, n_cols in PLATE_FORMATS):
+        return None
+    return layout
+
+
+def _numeric_matrix(df, columns):
+    # Whole-block conversion to one float matrix; mixed/object blocks are coerced in a
+    # single to_numeric pass over the flattened values instead of column by column.
+    block = df[list(columns)]
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in block.dtypes):
+        return block.to_numpy(dtype=float, na_value=np.nan)
+    flat = pd.to_numeric(pd.Series(block.to_numpy(dtype=object).ravel()), errors="coerce")
+    return flat.to_numpy(dtype=float, na_value=np.nan).reshape(block.shape)
+
+
 def _parse_time_series(series):
     if pd.api.types.is_datetime64_any_dtype(series):
         base = series.iloc[0]
@@ -82,6 +152,10 @@ def _safe_filename(value):
     return cleaned.strip("_") or "plot"
 
 
+CANONICAL_RESULTS_FILE = "results_canonical.csv"
+RESULTS_SCHEMA_FILE = "results_schema.json"
+
+
 def _read_results_zip(uploaded_zip):
     try:
         bundle = zipfile.ZipFile(uploaded_zip)
@@ -90,12 +164,18 @@ def _read_results_zip(uploaded_zip):
     results_name = None
     config_name = None
     long_df_name = None
+    canonical_name = None
+    schema_name = None
     for name in bundle.namelist():
         base = os.path.basename(name)
         if base == "results.csv":
             results_name = name
         elif base == "long_df.csv":
             long_df_name = name
+        elif base == CANONICAL_RESULTS_FILE:
+            canonical_name = name
+        elif base == RESULTS_SCHEMA_FILE:
+            schema_name = name
         elif base.endswith(".json") and "config" in base.lower():
             config_name = name
     if results_name is None:
@@ -117,9 +197,19 @@ def _read_results_zip(uploaded_zip):
             long_df = pd.read_csv(bundle.open(long_df_name))
         except Exception:
             long_df = None
+    canonical = None
+    schema = None
+    if canonical_name is not None and schema_name is not None:
+        try:
+            schema = json.loads(bundle.open(schema_name).read().decode("utf-8"))
+            canonical = pd.read_csv(bundle.open(canonical_name))
+        except Exception:
+            canonical = schema = None
     return {
         "name": os.path.basename(uploaded_zip.name),
         "results": results_df,
         "config": config,
         "long_df": long_df,
+        "canonical": canonical,
+        "schema": schema,
     }, None
@@ -0,0 +1,107 @@
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+JOB_TTL_S = 600.0
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobRunner:
+    # Submitted callables receive a progress_cb(stage, done, total) keyword, like
+    # build_download_zip. Cancellation is cooperative: the next progress callback of
+    # a cancelled job raises JobCancelled. Finished jobs nobody collected (their session
+    # closed) are dropped `ttl` seconds after they finish.
+    def __init__(self, max_workers=2, ttl=JOB_TTL_S):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="odyssey-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._ttl = ttl
+
+    def _evict_expired(self):
+        # Caller holds the lock.
+        cutoff = datetime.now().timestamp() - self._ttl
+        for job_id in [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job["finished_at"] is not None and job["finished_at"] <= cutoff
+        ]:
+            del self._jobs[job_id]
+
+    def submit(self, fn, *args, **kwargs):
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "id": job_id,
+            "state": "queued",
+            "stage": "queued",
+            "done": 0,
+            "total": 0,
+            "error": None,
+            "submitted_at": datetime.now().timestamp(),
+            "started_at": None,
+            "finished_at": None,
+            "cancel": threading.Event(),
+            "result": None,
+        }
+
+        def _progress(stage, done, total):
+            if job["cancel"].is_set():
+                raise JobCancelled(f"Job {job_id} cancelled during {stage}.")
+            with self._lock:
+                job["stage"] = stage
+                job["done"] = done
+                job["total"] = total
+
+        def _run():
+            with self._lock:
+                if job["cancel"].is_set():
+                    job["state"] = "cancelled"
+                    job["finished_at"] = datetime.now().timestamp()
+                    return
+                job["state"] = "running"
+                job["started_at"] = datetime.now().timestamp()
+            try:
+                result = fn(*args, progress_cb=_progress, **kwargs)
+            except JobCancelled:
+                state, error, result = "cancelled", None, None
+            except Exception as exc:
+                state, error, result = "failed", str(exc), None
+            else:
+                state, error = "done", None
+            with self._lock:
+                job["state"] = state
+                job["error"] = error
+                job["result"] = result
+                job["finished_at"] = datetime.now().timestamp()
+
+        with self._lock:
+            self._evict_expired()
+            self._jobs[job_id] = job
+        self._executor.submit(_run)
+        return job_id
+
+    def status(self, job_id):
+        with self._lock:
+            self._evict_expired()
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {k: v for k, v in job.items() if k not in ("cancel", "result")}
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            job["cancel"].set()
+
+    def result(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job["result"] if job is not None else None
+
+    def forget(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
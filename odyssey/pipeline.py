@@ -1,21 +1,206 @@
+import time
+from contextlib import contextmanager
+
+import numpy as np
 import pandas as pd
 
-from odyssey.analysis import _compute_auc, _long_format_from_map, _mean_sd_by_treatment_time, fit_growth_rates
-from odyssey.io_utils import _apply_time_unit, _parse_time_series, _read_excel_file
+from odyssey.analysis import (
+    _curve_arrays,
+    _long_format_from_map,
+    _mean_sd_by_treatment_time,
+    _threshold_column,
+    _well_arrays,
+    _window_auc,
+    bootstrap_growth_ci,
+    fit_growth_models,
+    fit_growth_rates,
+    fit_window_sweep,
+    growth_milestones,
+    replicate_outliers,
+    sliding_window_growth,
+    smooth_growth_curves,
+)
+from odyssey.io_utils import (
+    _apply_time_unit,
+    _numeric_matrix,
+    _parse_time_series,
+    _parse_well_id,
+    _read_excel_file,
+)
+
+
+BLANK_ESTIMATES = ("per_time", "first_n", "smoothed")
+
+
+def _blank_map_by_row(columns, blank_cols):
+    # Wells in rows without a blank fall back to all blanks.
+    blanks_by_row = {}
+    for blank in blank_cols:
+        parsed = _parse_well_id(blank)
+        if parsed is not None:
+            blanks_by_row.setdefault(parsed[1], []).append(blank)
+    blank_map = {}
+    for col in columns:
+        parsed = _parse_well_id(col)
+        if parsed is not None and parsed[1] in blanks_by_row:
+            blank_map[col] = blanks_by_row[parsed[1]]
+    return blank_map
+
 
+def _blank_estimates(blank_values, estimate="per_time", first_n=5, window=5):
+    # NaNs stay NaN so they drop out of the per-well blank mean.
+    if estimate == "per_time":
+        return blank_values
+    if estimate == "first_n":
+        head = blank_values[: max(int(first_n), 1)]
+        valid = np.isfinite(head)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            level = np.where(valid, head, 0.0).sum(axis=0) / valid.sum(axis=0)
+        return np.broadcast_to(level, blank_values.shape)
+    if estimate == "smoothed":
+        # Centered moving average over `window` reads, nan-aware, via cumulative sums.
+        half = max(int(window), 1) // 2
+        valid = np.isfinite(blank_values)
+        padded = np.vstack([np.zeros((1, blank_values.shape[1])), np.where(valid, blank_values, 0.0)])
+        sums = np.cumsum(padded, axis=0)
+        counts = np.cumsum(np.vstack([np.zeros((1, blank_values.shape[1])), valid]), axis=0)
+        n = blank_values.shape[0]
+        lo = np.clip(np.arange(n) - half, 0, n)
+        hi = np.clip(np.arange(n) + half + 1, 0, n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (sums[hi] - sums[lo]) / (counts[hi] - counts[lo])
+    raise ValueError(f"Unknown blank estimate '{estimate}'; use one of {BLANK_ESTIMATES}.")
 
-def apply_blank_normalization(df, time_col, blank_col):
-    working_df = df.copy()
-    data_cols = [c for c in working_df.columns if c != time_col]
-    numeric = working_df[data_cols].apply(pd.to_numeric, errors="coerce")
+
+def _blank_membership(data_cols, blank_cols, blank_map):
+    position = {col: idx for idx, col in enumerate(data_cols)}
+    blank_sets = list(dict.fromkeys(blank_cols + [b for bs in blank_map.values() for b in bs]))
+    blank_index = {col: idx for idx, col in enumerate(blank_sets)}
+    missing = [b for b in blank_sets if b not in position]
+    if missing:
+        raise ValueError(f"Blank column(s) not found: {', '.join(map(str, missing))}")
+    membership = np.zeros((len(blank_sets), len(data_cols)))
+    for col, idx in position.items():
+        for blank in blank_map.get(col) or blank_cols:
+            membership[blank_index[blank], idx] = 1.0
+    return [position[b] for b in blank_sets], membership
+
+
+def _blank_level(blank_values, membership):
+    # Sums and valid counts go through one matmul each, so NaN blanks are skipped like mean().
+    valid = np.isfinite(blank_values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (np.where(valid, blank_values, 0.0) @ membership) / (valid @ membership)
+
+
+def _blank_list(blank_col):
     if isinstance(blank_col, (list, tuple, pd.Index)):
-        blank_cols = list(blank_col)
-    else:
-        blank_cols = [blank_col]
-    blank_vals = working_df[blank_cols].apply(pd.to_numeric, errors="coerce")
-    blank_mean = blank_vals.mean(axis=1)
-    working_df[data_cols] = numeric.sub(blank_mean, axis=0)
-    return working_df
+        return list(blank_col)
+    return [blank_col]
+
+
+def apply_blank_normalization(
+    df,
+    time_col,
+    blank_col,
+    blank_map=None,
+    estimate="per_time",
+    first_n=5,
+    window=5,
+):
+    blank_cols = _blank_list(blank_col)
+    data_cols = [c for c in df.columns if c != time_col]
+    values = _numeric_matrix(df, data_cols)
+    blank_idx, membership = _blank_membership(data_cols, blank_cols, blank_map or {})
+    estimates = _blank_estimates(values[:, blank_idx], estimate=estimate, first_n=first_n, window=window)
+    normalized = pd.DataFrame(values - _blank_level(estimates, membership), index=df.index, columns=data_cols)
+    working_df = pd.concat([df[[time_col]], normalized], axis=1)
+    return working_df[df.columns]
+
+
+def _blank_drift(df, time_col, blank_col, blank_map=None):
+    # A rising blank points at contamination or evaporation.
+    blank_cols = _blank_list(blank_col)
+    data_cols = [c for c in df.columns if c != time_col]
+    values = _numeric_matrix(df, data_cols)
+    blank_idx, membership = _blank_membership(data_cols, blank_cols, blank_map or {})
+    level = _blank_level(values[:, blank_idx], membership)
+    finite = np.isfinite(level)
+    drift = np.where(
+        finite.any(axis=0),
+        np.where(finite, level, -np.inf).max(axis=0) - np.where(finite, level, np.inf).min(axis=0),
+        np.nan,
+    )
+    return pd.Series(drift, index=data_cols)
+
+
+def _blank_kwargs(df, time_col, blank_cols, blank_options):
+    # Config keys: assignment ("pooled", "row", "map"), map, estimate, first_n, window.
+    options = dict(blank_options or {})
+    assignment = options.pop("assignment", "pooled")
+    blank_map = options.pop("map", None)
+    if assignment == "row":
+        blank_list = list(blank_cols) if isinstance(blank_cols, (list, tuple)) else [blank_cols]
+        blank_map = _blank_map_by_row([c for c in df.columns if c != time_col], blank_list)
+    elif assignment != "map":
+        blank_map = None
+    return {"blank_map": blank_map, **options}
+
+
+class _StageTrace:
+    # Spans are plain dicts so the trace can be dumped to JSON as is.
+    def __init__(self, name):
+        self.name = name
+        self.spans = []
+        self._stack = []
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, stage, **counts):
+        record = {
+            "stage": stage,
+            "start_s": time.perf_counter() - self._origin,
+            "duration_s": None,
+            "counts": dict(counts),
+            "children": [],
+        }
+        parent = self._stack[-1]["children"] if self._stack else self.spans
+        parent.append(record)
+        self._stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record["counts"]
+        finally:
+            record["duration_s"] = time.perf_counter() - start
+            self._stack.pop()
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "total_s": sum(span["duration_s"] or 0.0 for span in self.spans),
+            "spans": self.spans,
+        }
+
+
+def _flatten_trace(trace):
+    rows = []
+
+    def _walk(spans, depth, path):
+        for span in spans:
+            stage_path = f"{path}/{span['stage']}" if path else span["stage"]
+            rows.append(
+                {
+                    "file": trace["name"],
+                    "stage": stage_path,
+                    "depth": depth,
+                    "duration_s": span["duration_s"],
+                    **span["counts"],
+                }
+            )
+            _walk(span["children"], depth + 1, stage_path)
+
+    _walk(trace.get("spans", []), 0, "")
+    return pd.DataFrame(rows)
 
 
 def analyze_file(
@@ -30,41 +215,275 @@ def analyze_file(
     blank_normalized,
     blank_cols,
     auc_window=None,
+    blank_options=None,
+    bootstrap=None,
+    growth_model=None,
+    od_thresholds=None,
+    sliding_window=None,
+    smoothing=None,
+    fit_method="ols",
+    outliers=None,
+    window_sweep=None,
+    progress_cb=None,
 ):
-    df = _read_excel_file(uploaded, sheet_name)
-    if not blank_normalized and blank_cols:
-        df = apply_blank_normalization(df, time_col, blank_cols)
-    time_series = _parse_time_series(df[time_col])
-    time_series = _apply_time_unit(time_series, time_unit if time_unit != "hh:mm:ss" else "minutes")
-    working_df = df.copy()
-    working_df["_time_numeric"] = time_series
-    if time_series.isna().all():
-        raise ValueError(f"Time column could not be parsed in {uploaded.name}.")
-    column_map_df = pd.DataFrame(column_map)
-    long_df = _long_format_from_map(working_df, "_time_numeric", column_map_df)
-    if long_df.empty:
-        raise ValueError(f"No treatment columns selected in {uploaded.name}.")
-    results = fit_growth_rates(
-        long_df,
-        time_col="time",
-        value_col="od",
-        group_cols=("treatment", "replicate"),
-        time_window=time_window,
-        auto_window=auto_window,
-        min_points=min_points,
-    )
-    mean_df = _mean_sd_by_treatment_time(long_df)
-    auc_df = _compute_auc(
-        long_df,
-        time_col="time",
-        value_col="od",
-        group_cols=("treatment", "replicate"),
-        time_window=auc_window,
-    )
+    total_steps = 6
+
+    def _report(stage, done):
+        if progress_cb:
+            progress_cb(stage, done, total_steps)
+
+    trace = _StageTrace(uploaded.name)
+    with trace.span("analyze_file") as root:
+        _report("read_excel", 0)
+        with trace.span("read_excel") as counts:
+            df = _read_excel_file(uploaded, sheet_name)
+            counts["rows"], counts["columns"] = df.shape
+        root["rows"] = len(df)
+        _report("blank_normalization", 1)
+        with trace.span("blank_normalization") as counts:
+            counts["blank_columns"] = 0
+            blank_drift = None
+            if not blank_normalized and blank_cols:
+                blank_kwargs = _blank_kwargs(df, time_col, blank_cols, blank_options)
+                blank_drift = _blank_drift(df, time_col, blank_cols, blank_map=blank_kwargs["blank_map"])
+                df = apply_blank_normalization(df, time_col, blank_cols, **blank_kwargs)
+                counts["blank_columns"] = len(blank_cols) if isinstance(blank_cols, (list, tuple)) else 1
+        _report("parse_time", 2)
+        with trace.span("parse_time") as counts:
+            time_series = _parse_time_series(df[time_col])
+            time_series = _apply_time_unit(time_series, time_unit if time_unit != "hh:mm:ss" else "minutes")
+            working_df = df.copy()
+            working_df["_time_numeric"] = time_series
+            counts["rows"] = len(time_series)
+            counts["unparsed"] = int(time_series.isna().sum())
+        if time_series.isna().all():
+            raise ValueError(f"Time column could not be parsed in {uploaded.name}.")
+        _report("reshape", 3)
+        with trace.span("reshape") as counts:
+            column_map_df = pd.DataFrame(column_map)
+            long_df = _long_format_from_map(working_df, "_time_numeric", column_map_df)
+            counts["wells"] = len(column_map_df)
+            counts["rows"] = len(long_df)
+            # Per-well QC inputs from the unsmoothed curves: peak OD and the blank drift.
+            well_metrics = (
+                long_df.assign(od=pd.to_numeric(long_df["od"], errors="coerce"))
+                .groupby(["treatment", "replicate"], as_index=False)["od"]
+                .max()
+                .rename(columns={"od": "od_max"})
+            )
+            if blank_drift is not None and not long_df.empty:
+                replicate = pd.to_numeric(column_map_df["replicate"], errors="coerce").fillna(1).astype(int)
+                drift = pd.DataFrame(
+                    {
+                        "treatment": column_map_df["treatment"],
+                        "replicate": replicate,
+                        "blank_drift": column_map_df["column"].map(blank_drift).to_numpy(dtype=float),
+                    }
+                ).drop_duplicates(subset=["treatment", "replicate"])
+                well_metrics = well_metrics.merge(drift, on=["treatment", "replicate"], how="left")
+        root["wells"] = len(column_map_df)
+        if long_df.empty:
+            raise ValueError(f"No treatment columns selected in {uploaded.name}.")
+        if smoothing:
+            with trace.span("smoothing") as counts:
+                long_df = smooth_growth_curves(long_df, **smoothing)
+                counts["rows"] = len(long_df)
+                counts["window_points"] = int(smoothing.get("window_points", 5))
+        with trace.span("well_arrays") as counts:
+            arrays = _well_arrays(long_df)
+            counts["wells"] = len(arrays["keys"])
+            counts["reads"] = int(arrays["counts"].sum())
+        options = {
+            "time_window": time_window,
+            "auto_window": auto_window,
+            "min_points": min_points,
+            "auc_window": auc_window,
+            "bootstrap": bootstrap,
+            "growth_model": growth_model,
+            "od_thresholds": od_thresholds,
+            "sliding_window": sliding_window,
+            "fit_method": fit_method or "ols",
+            "outliers": outliers,
+            "window_sweep": window_sweep,
+        }
+        fitted = _fit_stages(trace, long_df, arrays, well_metrics, options, report=_report)
+    _report("done", total_steps)
     return {
         "name": uploaded.name,
         "long_df": long_df,
+        "arrays": arrays,
+        "well_metrics": well_metrics,
+        "options": options,
+        **fitted,
+        "trace": trace.to_dict(),
+    }
+
+
+def _fit_stages(trace, long_df, arrays, well_metrics, options, previous=None, report=None):
+    # Stages whose inputs match `previous` are taken from it instead of recomputed.
+    def _report(stage):
+        if report:
+            report(stage, 4)
+
+    def _fit_progress(stage, done, total):
+        _report(f"{stage} ({done}/{total})")
+
+    old = previous["options"] if previous else {}
+
+    def _unchanged(*names):
+        return previous is not None and all(old.get(name) == options.get(name) for name in names)
+
+    group_cols = ["treatment", "replicate"]
+    outliers = options.get("outliers")
+    with trace.span("fit_growth_rates") as counts:
+        results = fit_growth_rates(
+            long_df,
+            time_window=options.get("time_window"),
+            auto_window=options.get("auto_window"),
+            min_points=options.get("min_points"),
+            progress_cb=_fit_progress,
+            fit_method=options.get("fit_method") or "ols",
+            arrays=arrays,
+        )
+        counts["groups"] = len(results)
+        counts["fitted"] = int(results["mu"].notna().sum()) if "mu" in results else 0
+    results = results.merge(well_metrics, on=group_cols, how="left")
+    with trace.span("growth_milestones") as counts:
+        # Threshold crossings do not depend on the fit window; only the lag is redone.
+        od_thresholds = tuple(options.get("od_thresholds") or ())
+        reuse = bool(od_thresholds) and _unchanged("od_thresholds")
+        results = growth_milestones(long_df, results, thresholds=() if reuse else od_thresholds, arrays=arrays)
+        if reuse:
+            crossings = group_cols + [_threshold_column(float(value)) for value in od_thresholds]
+            results = results.merge(previous["results"][crossings], on=group_cols, how="left")
+        counts["thresholds"] = len(od_thresholds)
+        counts["lag_times"] = int(results["lag_time"].notna().sum())
+    # Excluded outliers keep their window fit, AUC and raw curve for inspection.
+    fit_long_df = long_df
+    excluded = None
+    if outliers:
+        with trace.span("replicate_outliers") as counts:
+            reuse = outliers.get("method", "curve") != "mu" and _unchanged("outliers")
+            if reuse:
+                # Curve and AUC scores do not depend on the fit window.
+                flags = previous["results"][group_cols + ["outlier_score", "outlier"]]
+                results = results.merge(flags, on=group_cols, how="left")
+                counts["reused"] = True
+            else:
+                results = replicate_outliers(
+                    long_df,
+                    results,
+                    method=outliers.get("method", "curve"),
+                    threshold=float(outliers.get("threshold", 3.5)),
+                )
+            flagged = results.loc[results["outlier"], group_cols]
+            counts["flagged"] = len(flagged)
+            if outliers.get("exclude") and len(flagged):
+                excluded = flagged
+                counts["excluded"] = len(flagged)
+    same_curves = previous is not None and _excluded_key(excluded) == _excluded_key(previous.get("excluded"))
+    if same_curves:
+        fit_long_df = previous["fit_long_df"]
+    elif excluded is not None:
+        wells = pd.MultiIndex.from_frame(long_df[group_cols])
+        fit_long_df = long_df[~wells.isin(pd.MultiIndex.from_frame(excluded))]
+    sweep = None
+    window_sweep = options.get("window_sweep")
+    if window_sweep:
+        with trace.span("fit_window_sweep") as counts:
+            if same_curves and _unchanged("window_sweep"):
+                sweep = previous["window_sweep"]
+                counts["reused"] = True
+            else:
+                sweep = fit_window_sweep(fit_long_df, **window_sweep)
+            counts["windows"] = len(sweep)
+    mu_trace = None
+    sliding_window = options.get("sliding_window")
+    if sliding_window:
+        with trace.span("sliding_window_growth") as counts:
+            if same_curves and _unchanged("sliding_window"):
+                sliding_summary = previous["sliding_summary"]
+                mu_trace = previous["mu_trace"]
+                counts["reused"] = True
+            else:
+                sliding_summary, mu_trace = sliding_window_growth(fit_long_df, **sliding_window)
+            results = results.drop(
+                columns=[c for c in sliding_summary.columns if c not in group_cols],
+                errors="ignore",
+            ).merge(sliding_summary, on=group_cols, how="left")
+            counts["wells"] = len(sliding_summary)
+            counts["trace_points"] = len(mu_trace)
+    else:
+        sliding_summary = None
+    growth_model = options.get("growth_model")
+    if growth_model:
+        _report(f"fit_{growth_model}")
+        with trace.span("fit_growth_model") as counts:
+            results = fit_growth_models(fit_long_df, results, model=growth_model)
+            counts["wells"] = len(results)
+            counts["converged"] = int(results["model_converged"].sum())
+    bootstrap = options.get("bootstrap")
+    if bootstrap:
+        _report("bootstrap_ci")
+        with trace.span("bootstrap_ci") as counts:
+            results = bootstrap_growth_ci(fit_long_df, results, **bootstrap)
+            counts["wells"] = len(results)
+            counts["resamples"] = int(bootstrap.get("n_boot", 1000))
+    if report:
+        report("auc", 5)
+    with trace.span("mean_sd") as counts:
+        if same_curves:
+            mean_df = previous["mean_df"]
+            mean_curves = previous["mean_curves"]
+            counts["reused"] = True
+        else:
+            mean_df = _mean_sd_by_treatment_time(fit_long_df)
+            mean_curves = _curve_arrays(mean_df)
+        counts["rows"] = len(mean_df)
+    with trace.span("auc") as counts:
+        auc_df = _window_auc(arrays, options.get("auc_window"))
+        counts["groups"] = len(auc_df)
+    return {
         "results": results,
         "mean_df": mean_df,
+        "mean_curves": mean_curves,
         "auc": auc_df,
+        "mu_trace": mu_trace,
+        "sliding_summary": sliding_summary,
+        "window_sweep": sweep,
+        "fit_long_df": fit_long_df,
+        "excluded": excluded,
     }
+
+
+def _excluded_key(excluded):
+    if excluded is None:
+        return ()
+    return tuple(sorted(map(tuple, excluded.astype(str).to_numpy())))
+
+
+def refit_analysis(analysis, progress_cb=None, **changes):
+    # Reading, blank correction, reshaping and smoothing are not repeated.
+    unknown = sorted(set(changes) - set(analysis["options"]))
+    if unknown:
+        raise ValueError(f"refit_analysis cannot change {unknown}; run analyze_file again.")
+    options = {**analysis["options"], **changes}
+
+    def _report(stage, done):
+        if progress_cb:
+            progress_cb(stage, done, 6)
+
+    trace = _StageTrace(analysis["name"])
+    with trace.span("refit_analysis") as root:
+        root["wells"] = len(analysis["arrays"]["keys"])
+        fitted = _fit_stages(
+            trace,
+            analysis["long_df"],
+            analysis["arrays"],
+            analysis["well_metrics"],
+            options,
+            previous=analysis,
+            report=_report,
+        )
+    _report("done", 6)
+    return {**analysis, "options": options, **fitted, "trace": trace.to_dict()}
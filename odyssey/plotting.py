@@ -1,7 +1,17 @@
+import numpy as np
+import pandas as pd
 import plotly.colors as pc
 import plotly.graph_objects as go
 import plotly.io as pio
-from plotly.subplots import make_subplots
+
+from odyssey.analysis import _curve_arrays
+from odyssey.io_utils import _plate_dimensions, _row_label
+
+DEFAULT_MAX_POINTS = 1000
+# Total points of the fit-window preview, shared by its curves.
+PREVIEW_POINT_BUDGET = 6000
+WEBGL_POINT_THRESHOLD = 20000
+RENDER_MODES = ("auto", "svg", "webgl")
 
 
 def _to_rgba(color, alpha):
@@ -14,48 +24,121 @@ def _to_rgba(color, alpha):
     return f"rgba(0,0,0,{alpha})"
 
 
-def _plot_overlay(mean_df, treatments, show_sd=True):
-    fig = go.Figure()
+def _lttb_indices(x, y, n_out):
+    # Largest-Triangle-Three-Buckets, vectorized over buckets.
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if not n_out or n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    starts = edges[:-1]
+    ends = edges[1:]
+    sizes = ends - starts
+    offsets = np.arange(sizes.max())
+    idx = starts[:, None] + offsets[None, :]
+    in_bucket = offsets[None, :] < sizes[:, None]
+    idx = np.where(in_bucket, idx, starts[:, None])
+    bx = x[idx]
+    by = y[idx]
+    mean_x = np.where(in_bucket, bx, 0.0).sum(axis=1) / sizes
+    mean_y = np.where(in_bucket, by, 0.0).sum(axis=1) / sizes
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+    anchor_x = np.insert(mean_x[:-1], 0, x[0])
+    anchor_y = np.insert(mean_y[:-1], 0, y[0])
+    for _ in range(2):
+        area = np.abs(
+            (anchor_x[:, None] - next_x[:, None]) * (by - anchor_y[:, None])
+            - (anchor_x[:, None] - bx) * (next_y[:, None] - anchor_y[:, None])
+        )
+        area = np.where(in_bucket, area, -1.0)
+        picked = idx[np.arange(len(idx)), np.argmax(area, axis=1)]
+        anchor_x = np.insert(x[picked][:-1], 0, x[0])
+        anchor_y = np.insert(y[picked][:-1], 0, y[0])
+    return np.concatenate(([0], picked, [n - 1]))
+
+
+def _downsample_curve(time, mean, sd=None, max_points=DEFAULT_MAX_POINTS):
+    time = np.asarray(time, dtype=float)
+    mean = np.asarray(mean, dtype=float)
+    sd = np.asarray(sd, dtype=float) if sd is not None else None
+    if not max_points or len(time) <= max_points:
+        return time, mean, sd
+    finite = np.flatnonzero(np.isfinite(time) & np.isfinite(mean))
+    keep = finite[_lttb_indices(time[finite], mean[finite], max_points)]
+    return time[keep], mean[keep], sd[keep] if sd is not None else None
+
+
+def _scatter_type(n_points, render_mode="auto", threshold=WEBGL_POINT_THRESHOLD):
+    if render_mode == "webgl":
+        return "scattergl"
+    if render_mode == "svg":
+        return "scatter"
+    return "scattergl" if n_points > threshold else "scatter"
+
+
+def _preview_max_points(n_curves, budget=PREVIEW_POINT_BUDGET):
+    return max(budget // max(n_curves, 1), 3)
+
+
+def _treatment_curves(mean_df, treatments, max_points=DEFAULT_MAX_POINTS):
+    arrays = _curve_arrays(mean_df)
+    empty = (np.empty(0), np.empty(0), np.empty(0))
+    curves = []
+    for treatment in treatments:
+        time, mean, sd = arrays.get(treatment, empty)
+        time, mean, sd = _downsample_curve(time, mean, sd, max_points)
+        curves.append((treatment, time, mean, sd))
+    return curves
+
+
+def _curve_point_count(curves, show_sd):
+    per_curve = 3 if show_sd else 1
+    return sum(len(curve[1]) for curve in curves) * per_curve
+
+
+def _sd_band_trace(trace_type, time, mean, sd, fill_color, **kwargs):
+    finite = np.isfinite(time) & np.isfinite(mean) & np.isfinite(sd)
+    band_time = time[finite]
+    upper = mean[finite] + sd[finite]
+    lower = mean[finite] - sd[finite]
+    return dict(
+        type=trace_type,
+        x=np.concatenate([band_time, band_time[::-1]]),
+        y=np.concatenate([upper, lower[::-1]]),
+        mode="lines",
+        line=dict(width=0),
+        fill="toself",
+        fillcolor=fill_color,
+        showlegend=False,
+        hoverinfo="skip",
+        **kwargs,
+    )
+
+
+def _plot_overlay(mean_df, treatments, show_sd=True, render_mode="auto", max_points=DEFAULT_MAX_POINTS):
     color_cycle = pc.qualitative.Plotly
-    for idx, treatment in enumerate(treatments):
-        subset = mean_df[mean_df["treatment"] == treatment]
+    curves = _treatment_curves(mean_df, treatments, max_points)
+    trace_type = _scatter_type(_curve_point_count(curves, show_sd), render_mode)
+    traces = []
+    for idx, (treatment, time, mean, sd) in enumerate(curves):
         line_color = color_cycle[idx % len(color_cycle)]
         fill_color = _to_rgba(line_color, 0.12)
-        if show_sd and not subset["sd"].isna().all():
-            upper = subset["mean"] + subset["sd"]
-            lower = subset["mean"] - subset["sd"]
-            fig.add_trace(
-                go.Scatter(
-                    x=subset["time"],
-                    y=lower,
-                    mode="lines",
-                    line=dict(width=0),
-                    showlegend=False,
-                    hoverinfo="skip",
-                )
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=subset["time"],
-                    y=upper,
-                    mode="lines",
-                    line=dict(width=0),
-                    fill="tonexty",
-                    fillcolor=fill_color,
-                    showlegend=False,
-                    hoverinfo="skip",
-                )
-            )
-        fig.add_trace(
-            go.Scatter(
-                x=subset["time"],
-                y=subset["mean"],
+        if show_sd and not np.isnan(sd).all():
+            traces.append(_sd_band_trace(trace_type, time, mean, sd, fill_color))
+        traces.append(
+            dict(
+                type=trace_type,
+                x=time,
+                y=mean,
                 mode="lines",
                 name=str(treatment),
                 line=dict(color=line_color),
                 hovertemplate=f"Time=%{{x}}<br>OD=%{{y}}<extra>{treatment}</extra>",
             )
         )
+    fig = go.Figure(data=traces)
     fig.update_layout(
         title="Growth curves (mean across replicates)",
         xaxis_title="Time",
@@ -98,109 +181,270 @@ def _add_window_highlight_color(fig, time_window, color):
     return fig
 
 
-def _plot_small_multiples(mean_df, treatments, cols_per_row=2, show_sd=True, x_label="Time", y_label="OD"):
-    rows = int((len(treatments) + cols_per_row - 1) / cols_per_row)
-    fig = make_subplots(rows=rows, cols=cols_per_row, subplot_titles=[str(t) for t in treatments])
+def _set_window_highlight(
+    fig,
+    time_window,
+    fillcolor="rgba(255,193,7,0.25)",
+    line_color="rgba(255,193,7,0.6)",
+    line_width=1,
+):
+    shapes = []
+    if time_window:
+        t_min, t_max = time_window
+        shapes.append(
+            dict(
+                type="rect",
+                x0=t_min,
+                x1=t_max,
+                y0=0,
+                y1=1,
+                xref="x",
+                yref="paper",
+                fillcolor=fillcolor,
+                line=dict(width=line_width, color=line_color),
+                layer="below",
+            )
+        )
+    fig.layout.shapes = shapes
+    return fig
+
+
+def _grid_layout(rows, cols, titles, x_label, y_label):
+    # Built directly so large grids skip make_subplots' per-subplot bookkeeping.
+    h_space = 0.2 / cols
+    v_space = 0.3 / rows
+    width = (1.0 - h_space * (cols - 1)) / cols
+    height = (1.0 - v_space * (rows - 1)) / rows
+    layout = {}
+    annotations = []
+    for idx, title in enumerate(titles):
+        r = idx // cols
+        c = idx % cols
+        suffix = "" if idx == 0 else str(idx + 1)
+        x0 = c * (width + h_space)
+        y1 = 1.0 - r * (height + v_space)
+        layout[f"xaxis{suffix}"] = dict(
+            domain=[x0, x0 + width], anchor=f"y{suffix}", title_text=x_label, showgrid=False
+        )
+        layout[f"yaxis{suffix}"] = dict(
+            domain=[y1 - height, y1], anchor=f"x{suffix}", title_text=y_label, showgrid=False
+        )
+        annotations.append(
+            dict(
+                text=title,
+                x=x0 + width / 2.0,
+                y=y1,
+                xref="paper",
+                yref="paper",
+                xanchor="center",
+                yanchor="bottom",
+                showarrow=False,
+                font=dict(size=16),
+            )
+        )
+    layout["annotations"] = annotations
+    return layout
+
+
+def _plot_small_multiples(
+    mean_df,
+    treatments,
+    cols_per_row=2,
+    show_sd=True,
+    x_label="Time",
+    y_label="OD",
+    render_mode="auto",
+    max_points=DEFAULT_MAX_POINTS,
+):
+    rows = max(1, int((len(treatments) + cols_per_row - 1) / cols_per_row))
     color_cycle = pc.qualitative.Plotly
-    for idx, treatment in enumerate(treatments):
-        r = idx // cols_per_row + 1
-        c = idx % cols_per_row + 1
-        subset = mean_df[mean_df["treatment"] == treatment]
+    curves = _treatment_curves(mean_df, treatments, max_points)
+    trace_type = _scatter_type(_curve_point_count(curves, show_sd), render_mode)
+    traces = []
+    for idx, (treatment, time, mean, sd) in enumerate(curves):
+        suffix = "" if idx == 0 else str(idx + 1)
+        axes = dict(xaxis=f"x{suffix}", yaxis=f"y{suffix}")
         line_color = color_cycle[idx % len(color_cycle)]
         fill_color = _to_rgba(line_color, 0.12)
-        if show_sd and not subset["sd"].isna().all():
-            upper = subset["mean"] + subset["sd"]
-            lower = subset["mean"] - subset["sd"]
-            fig.add_trace(
-                go.Scatter(
-                    x=subset["time"],
-                    y=lower,
-                    mode="lines",
-                    line=dict(width=0),
-                    showlegend=False,
-                    hoverinfo="skip",
-                ),
-                row=r,
-                col=c,
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=subset["time"],
-                    y=upper,
-                    mode="lines",
-                    line=dict(width=0),
-                    fill="tonexty",
-                    fillcolor=fill_color,
-                    showlegend=False,
-                    hoverinfo="skip",
-                ),
-                row=r,
-                col=c,
-            )
-        fig.add_trace(
-            go.Scatter(
-                x=subset["time"],
-                y=subset["mean"],
+        if show_sd and not np.isnan(sd).all():
+            traces.append(_sd_band_trace(trace_type, time, mean, sd, fill_color, **axes))
+        traces.append(
+            dict(
+                type=trace_type,
+                x=time,
+                y=mean,
                 mode="lines",
                 name=str(treatment),
                 line=dict(color=line_color),
                 hovertemplate=f"Time=%{{x}}<br>OD=%{{y}}<extra>{treatment}</extra>",
                 showlegend=False,
-            ),
-            row=r,
-            col=c,
+                **axes,
+            )
         )
-        fig.update_xaxes(title_text=x_label, showgrid=False, row=r, col=c)
-        fig.update_yaxes(title_text=y_label, showgrid=False, row=r, col=c)
+    layout = _grid_layout(rows, cols_per_row, [str(t) for t in treatments], x_label, y_label)
+    fig = go.Figure(data=traces, layout=layout)
     fig.update_layout(height=300 * rows, hovermode="x unified")
     return fig
 
 
-def _plot_compare_runs(analyses, treatment, show_sd=True):
-    fig = go.Figure()
+def _plot_compare_runs(analyses, treatment, show_sd=True, render_mode="auto", max_points=DEFAULT_MAX_POINTS):
     color_cycle = pc.qualitative.Plotly
+    empty = (np.empty(0), np.empty(0), np.empty(0))
+    curves = []
     for idx, analysis in enumerate(analyses):
-        mean_df = analysis["mean_df"]
-        subset = mean_df[mean_df["treatment"] == treatment]
-        if subset.empty:
+        arrays = analysis.get("mean_curves")
+        if arrays is None:
+            arrays = _curve_arrays(analysis["mean_df"])
+        time, mean, sd = arrays.get(treatment, empty)
+        if not len(time):
             continue
+        time, mean, sd = _downsample_curve(time, mean, sd, max_points)
+        curves.append((idx, analysis["name"], time, mean, sd))
+    trace_type = _scatter_type(_curve_point_count([c[1:] for c in curves], show_sd), render_mode)
+    traces = []
+    for idx, name, time, mean, sd in curves:
         line_color = color_cycle[idx % len(color_cycle)]
         fill_color = _to_rgba(line_color, 0.12)
-        if show_sd and not subset["sd"].isna().all():
-            upper = subset["mean"] + subset["sd"]
-            lower = subset["mean"] - subset["sd"]
-            fig.add_trace(
-                go.Scatter(
-                    x=subset["time"],
-                    y=lower,
-                    mode="lines",
-                    line=dict(width=0),
-                    showlegend=False,
-                    hoverinfo="skip",
-                )
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=subset["time"],
-                    y=upper,
-                    mode="lines",
-                    line=dict(width=0),
-                    fill="tonexty",
-                    fillcolor=fill_color,
-                    showlegend=False,
-                    hoverinfo="skip",
-                )
-            )
-        fig.add_trace(
-            go.Scatter(
-                x=subset["time"],
-                y=subset["mean"],
+        if show_sd and not np.isnan(sd).all():
+            traces.append(_sd_band_trace(trace_type, time, mean, sd, fill_color))
+        traces.append(
+            dict(
+                type=trace_type,
+                x=time,
+                y=mean,
                 mode="lines",
-                name=analysis["name"],
+                name=name,
                 line=dict(color=line_color),
-                hovertemplate=f"Time=%{{x}}<br>OD=%{{y}}<extra>{analysis['name']}</extra>",
+                hovertemplate=f"Time=%{{x}}<br>OD=%{{y}}<extra>{name}</extra>",
             )
         )
+    return go.Figure(data=traces)
+
+
+def _qc_flag_counts(flags):
+    flags = flags.fillna("").astype(str).str.strip()
+    return np.where(flags == "", 0, flags.str.count(",") + 1).astype(float)
+
+
+def _plot_plate_heatmap(well_df, metric, treatment_col="treatment", replicate_col="replicate", run_col=None):
+    if well_df.empty:
+        return go.Figure()
+    n_rows, n_cols = _plate_dimensions(int(well_df["plate_row"].max()), int(well_df["plate_col"].max()))
+    rows = well_df["plate_row"].to_numpy(dtype=int)
+    cols = well_df["plate_col"].to_numpy(dtype=int)
+    is_qc = metric.lower().startswith("qc")
+    if is_qc:
+        values = _qc_flag_counts(well_df[metric])
+    else:
+        values = pd.to_numeric(well_df[metric], errors="coerce").to_numpy(dtype=float)
+    z = np.full((n_rows, n_cols), np.nan)
+    z[rows, cols] = values
+    labels = np.full((n_rows, n_cols), "", dtype=object)
+    labels[rows, cols] = (
+        well_df["well"].astype(str)
+        + " | "
+        + well_df[treatment_col].astype(str)
+        + " rep "
+        + well_df[replicate_col].astype(str)
+    ).to_numpy()
+    if is_qc:
+        labels[rows, cols] = labels[rows, cols] + "<br>" + well_df[metric].fillna("").astype(str).to_numpy()
+    heatmap = dict(
+        type="heatmap",
+        z=z,
+        x=np.arange(1, n_cols + 1),
+        y=[_row_label(r) for r in range(n_rows)],
+        text=labels,
+        colorscale="Reds" if is_qc else "Viridis",
+        colorbar=dict(title=dict(text="Flags" if is_qc else metric)),
+        hoverongaps=False,
+        hovertemplate=f"%{{text}}<br>{metric}=%{{z}}<extra></extra>",
+        xgap=1,
+        ygap=1,
+    )
+    # Transparent markers make cells selectable; customdata is (well, treatment, replicate[, run]).
+    custom = [
+        well_df["well"].astype(str).to_numpy(),
+        well_df[treatment_col].astype(str).to_numpy(),
+        well_df[replicate_col].to_numpy(),
+    ]
+    if run_col is not None:
+        custom.append(well_df[run_col].to_numpy())
+    selectable = dict(
+        type="scatter",
+        x=cols + 1,
+        y=[_row_label(r) for r in rows],
+        mode="markers",
+        marker=dict(size=14, opacity=0, symbol="square"),
+        customdata=np.column_stack(custom),
+        showlegend=False,
+        hoverinfo="skip",
+    )
+    fig = go.Figure(data=[heatmap, selectable])
+    fig.update_layout(
+        height=max(320, 28 * n_rows + 160),
+        xaxis=dict(side="top", dtick=1 if n_cols <= 24 else 4, constrain="domain"),
+        yaxis=dict(autorange="reversed", scaleanchor="x", constrain="domain"),
+        clickmode="event+select",
+    )
+    return fig
+
+
+def _plot_well_curve(long_df, treatment, replicate, well=None):
+    subset = long_df[(long_df["treatment"].astype(str) == str(treatment)) & (long_df["replicate"] == int(replicate))]
+    subset = subset.sort_values("time")
+    name = well or f"{treatment} rep {replicate}"
+    fig = go.Figure(
+        data=[
+            dict(
+                type="scatter",
+                x=subset["time"].to_numpy(dtype=float),
+                y=subset["od"].to_numpy(dtype=float),
+                mode="lines+markers",
+                name=str(name),
+                hovertemplate=f"Time=%{{x}}<br>OD=%{{y}}<extra>{name}</extra>",
+            )
+        ]
+    )
+    fig.update_layout(title=f"{name}: {treatment} (replicate {replicate})", xaxis_title="Time", yaxis_title="OD")
+    return fig
+
+
+def _plot_window_sweep(summary, treatment, metric="mu", label="Growth rate", chosen_window=None):
+    subset = summary[summary["treatment"].astype(str) == str(treatment)]
+    grid = subset.pivot(index="window_start", columns="window_end", values=metric)
+    r2 = subset.pivot(index="window_start", columns="window_end", values="r2").reindex_like(grid)
+    heatmap = dict(
+        type="heatmap",
+        z=grid.to_numpy(dtype=float),
+        x=grid.columns.to_numpy(dtype=float),
+        y=grid.index.to_numpy(dtype=float),
+        customdata=r2.to_numpy(dtype=float),
+        colorscale="Viridis",
+        colorbar=dict(title=dict(text=label)),
+        hoverongaps=False,
+        hovertemplate=(
+            f"Start=%{{y:.4g}}<br>End=%{{x:.4g}}<br>{label}=%{{z:.4g}}"
+            "<br>R\u00B2=%{customdata:.3f}<extra></extra>"
+        ),
+    )
+    data = [heatmap]
+    if chosen_window is not None:
+        data.append(
+            dict(
+                type="scatter",
+                x=[float(chosen_window[1])],
+                y=[float(chosen_window[0])],
+                mode="markers",
+                marker=dict(symbol="x", size=14, color="white", line=dict(color="black", width=1)),
+                name="Selected window",
+                hovertemplate="Selected window<br>Start=%{y:.4g}<br>End=%{x:.4g}<extra></extra>",
+            )
+        )
+    fig = go.Figure(data=data)
+    fig.update_layout(
+        title=f"{treatment}: {label} by fit window", xaxis_title="Window end", yaxis_title="Window start"
+    )
     return fig
 
 
@@ -0,0 +1,106 @@
+import cProfile
+import io
+import pstats
+import time
+from datetime import datetime, timezone
+
+PROFILE_ENV_VAR = "ODYSSEY_PROFILE"
+PROFILE_QUERY_PARAM = "profile"
+MAX_LOGGED_RERUNS = 20
+_TRUTHY = {"1", "true", "yes", "on"}
+_SCALAR_TYPES = (bool, int, float, str, type(None))
+
+
+def _profiling_enabled(environ, query_params):
+    values = [environ.get(PROFILE_ENV_VAR), query_params.get(PROFILE_QUERY_PARAM)]
+    return any(str(value).strip().lower() in _TRUTHY for value in values if value is not None)
+
+
+def _widget_snapshot(state, skip_prefixes=("profiler_", "rerun_profile")):
+    # Only small scalar values (and short lists of them) are compared between reruns, which
+    # covers widget state without hashing dataframes or figures kept in session state.
+    snapshot = {}
+    for key, value in state.items():
+        key = str(key)
+        if key.startswith(skip_prefixes):
+            continue
+        if isinstance(value, _SCALAR_TYPES):
+            snapshot[key] = value
+        elif isinstance(value, (list, tuple)) and len(value) <= 50:
+            if all(isinstance(item, _SCALAR_TYPES) for item in value):
+                snapshot[key] = tuple(value)
+    return snapshot
+
+
+def _changed_widgets(previous, current):
+    keys = set(previous) | set(current)
+    return sorted(key for key in keys if previous.get(key) != current.get(key))
+
+
+class _RerunProfile:
+    # One script rerun: cProfile stats plus lap-style section timings. mark() closes the
+    # running section and opens the next, so early returns in the script need no cleanup.
+    def __init__(self, trigger=None):
+        self.trigger = list(trigger or [])
+        self.sections = []
+        self._profiler = cProfile.Profile()
+        self._profiling = False
+        self._current = None
+        self._start = None
+        self._started_at = None
+
+    def start(self):
+        self._started_at = datetime.now(timezone.utc).isoformat()
+        self._start = time.perf_counter()
+        try:
+            self._profiler.enable()
+            self._profiling = True
+        except ValueError:
+            # Another session's rerun already owns the profiler; keep section timings only.
+            self._profiling = False
+        self.mark("startup")
+
+    def mark(self, section):
+        now = time.perf_counter()
+        if self._current is not None:
+            name, since = self._current
+            self.sections.append({"section": name, "wall_s": now - since})
+        self._current = (section, now) if section is not None else None
+
+    def stop(self, top=30):
+        if self._profiling:
+            self._profiler.disable()
+        self.mark(None)
+        wall = time.perf_counter() - self._start
+        stats_text = "cProfile unavailable (another profiler was active)."
+        if self._profiling:
+            buffer = io.StringIO()
+            pstats.Stats(self._profiler, stream=buffer).sort_stats("cumulative").print_stats(top)
+            stats_text = buffer.getvalue()
+        return {
+            "started_at": self._started_at,
+            "wall_s": wall,
+            "trigger": self.trigger,
+            "sections": self.sections,
+            "stats": stats_text,
+        }
+
+
+def _record_rerun(log, record, max_entries=MAX_LOGGED_RERUNS):
+    # Keeps the slowest reruns only, slowest first.
+    merged = sorted([*log, record], key=lambda item: item["wall_s"], reverse=True)
+    return merged[:max_entries]
+
+
+def _profile_report(log):
+    lines = [f"ODyssey profiling report ({len(log)} slowest reruns)", ""]
+    for idx, record in enumerate(log, start=1):
+        trigger = ", ".join(record["trigger"]) or "(initial load or no keyed widget changed)"
+        lines.append(f"#{idx} {record['started_at']}  {record['wall_s']:.3f}s  trigger: {trigger}")
+        for section in record["sections"]:
+            lines.append(f"    {section['section']:<24} {section['wall_s']:.3f}s")
+        lines.append("")
+        lines.append(record["stats"].rstrip())
+        lines.append("")
+        lines.append("-" * 80)
+    return "\n".join(lines) + "\n"
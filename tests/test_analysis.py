@@ -4,7 +4,30 @@ import numpy as np
 import pandas as pd
 import pytest
 
-from odyssey.analysis import _compute_auc, _mean_sd_by_treatment_time, _qc_flags, fit_growth_rates
+from odyssey.analysis import (
+    _batched_levenberg_marquardt,
+    _suggest_fit_window,
+    _sweep_summary,
+    _compute_auc,
+    _median_smooth,
+    _mean_sd_by_treatment_time,
+    _qc_flags,
+    _validation_messages,
+    _validation_report,
+    _well_matrix,
+    align_to_time_grid,
+    aligned_mean_sd,
+    bootstrap_growth_ci,
+    curve_differences,
+    fit_growth_models,
+    fit_growth_rates,
+    fit_window_sweep,
+    growth_milestones,
+    qc_flags,
+    replicate_outliers,
+    sliding_window_growth,
+    smooth_growth_curves,
+)
 
 
 FIXTURES = Path(__file__).parent / "fixtures"
@@ -47,3 +70,286 @@ def test_qc_flags():
     )
     flagged = _qc_flags(df, r2_threshold=0.9)
     assert flagged["qc_flags"].tolist() == ["", "non_positive_mu", "low_r2(<0.9)"]
+
+
+def test_validation_report_counts_per_column():
+    df = pd.DataFrame(
+        {
+            "Time": [0, 1, "bad"],
+            "A1": [0.1, None, 0.3],
+            "A2": [0.0, "x", -0.1],
+        }
+    )
+    report = _validation_report(df, "Time", ["A1", "A2", "Z9"])
+    assert report["time_invalid"] == 1
+    assert report["missing_columns"] == ["Z9"]
+    counts = report["columns"].set_index("column")
+    assert counts.loc["A1"].tolist() == [1, 0, 0]
+    assert counts.loc["A2"].tolist() == [0, 1, 2]
+    messages = _validation_messages(report)
+    assert "A2: non-positive OD values detected." in messages
+    assert "Missing column: Z9" in messages
+
+
+def _noisy_exponential_long_df():
+    rng = np.random.default_rng(0)
+    time = np.arange(0, 60, 2.0)
+    frames = []
+    for replicate, mu in enumerate((0.05, 0.08), start=1):
+        od = 0.01 * np.exp(mu * time) * np.exp(rng.normal(0, 0.02, time.size))
+        frames.append(pd.DataFrame({"time": time, "treatment": "A", "replicate": replicate, "od": od}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_well_matrix_pads_groups_sorted_by_time():
+    long_df = _load_long_df().sample(frac=1.0, random_state=0)
+    keys, x, y, valid = _well_matrix(long_df)
+    assert len(keys) == long_df.groupby(["treatment", "replicate"]).ngroups
+    assert valid.sum() == long_df[["time", "od"]].notna().all(axis=1).sum()
+    assert np.all(np.diff(np.where(valid, x, np.inf), axis=1)[valid[:, 1:]] >= 0)
+
+
+@pytest.mark.parametrize("method", ["residual", "pairs"])
+def test_bootstrap_growth_ci_brackets_estimate(method):
+    long_df = _noisy_exponential_long_df()
+    results = fit_growth_rates(long_df, time_window=(0, 60))
+    out = bootstrap_growth_ci(long_df, results, n_boot=500, method=method, seed=1)
+    assert list(out.columns[:6]) == ["treatment", "replicate", "n", "mu", "mu_ci_low", "mu_ci_high"]
+    assert (out["mu_ci_low"] < out["mu"]).all() and (out["mu"] < out["mu_ci_high"]).all()
+    assert (out["mu_ci_high"] - out["mu_ci_low"] < 0.01).all()
+    assert np.allclose(out["doubling_time_ci_low"], np.log(2) / out["mu_ci_high"])
+
+
+@pytest.mark.parametrize("model", ["logistic", "gompertz", "richards"])
+def test_fit_growth_models_recovers_gompertz_parameters(model):
+    time = np.arange(0, 600, 10.0)
+    amp, mu, lag = 4.0, 0.03, 120.0
+    rng = np.random.default_rng(3)
+    frames = []
+    for replicate in (1, 2):
+        log_od = np.log(0.01) + amp * np.exp(-np.exp(mu * np.e / amp * (lag - time) + 1.0))
+        od = np.exp(log_od + rng.normal(0, 0.01, time.size))
+        frames.append(pd.DataFrame({"time": time, "treatment": "A", "replicate": replicate, "od": od}))
+    long_df = pd.concat(frames, ignore_index=True)
+    results = fit_growth_rates(long_df, time_window=(150, 250))
+    out = fit_growth_models(long_df, results, model=model)
+    assert {"mu", "r2", "model_mu_max", "model_lag", "model_capacity"}.issubset(out.columns)
+    assert (out["model_r2"] > 0.99).all()
+    tolerance = 0.02 if model != "logistic" else 0.15
+    assert out["model_mu_max"].to_numpy() == pytest.approx(mu, rel=tolerance)
+    if model == "gompertz":
+        assert out["model_lag"].to_numpy() == pytest.approx(lag, abs=5.0)
+        assert out["model_capacity"].to_numpy() == pytest.approx(0.01 * np.exp(amp), rel=0.05)
+
+
+def test_levenberg_marquardt_singular_fallback_is_per_well(monkeypatch):
+    time = np.arange(0, 600, 10.0)
+    t = np.tile(time, (2, 1))
+    y = np.log(0.01) + 4.0 * np.exp(-np.exp(0.03 * np.e / 4.0 * (120.0 - t) + 1.0))
+    mask = np.ones_like(t, dtype=bool)
+    start = np.array([[np.log(0.01), 1.0, np.log(0.01), 100.0], [np.log(0.01), 1.0, np.log(0.01), np.nan]])
+    lower = np.tile([-15.0, -10.0, -20.0, -600.0], (2, 1))
+    upper = np.tile([5.0, 5.0, 5.0, 1200.0], (2, 1))
+    expected, _, _ = _batched_levenberg_marquardt("gompertz", t[:1], y[:1], mask[:1], start[:1], lower[:1], upper[:1])
+
+    def _singular(*args, **kwargs):
+        raise np.linalg.LinAlgError("singular")
+
+    # The second well's system is not finite; it must not change the first well's steps.
+    monkeypatch.setattr(np.linalg, "solve", _singular)
+    params, _, _ = _batched_levenberg_marquardt("gompertz", t, y, mask, start, lower, upper)
+    assert params[0] == pytest.approx(expected[0], rel=1e-6)
+    assert np.isnan(params[1, 3])
+
+
+def test_growth_milestones_lag_and_threshold_crossings():
+    time = np.arange(0, 100, 10.0)
+    frames = []
+    for replicate, scale in ((1, 1.0), (2, 2.0)):
+        od = np.where(time < 30, 0.01, 0.01 * np.exp(0.05 * (time - 30))) * scale
+        frames.append(pd.DataFrame({"time": time, "treatment": "A", "replicate": replicate, "od": od}))
+    frames.append(pd.DataFrame({"time": time, "treatment": "B", "replicate": 1, "od": np.full(time.size, 0.01)}))
+    long_df = pd.concat(frames, ignore_index=True)
+    results = fit_growth_rates(long_df, time_window=(30, 90))
+    out = growth_milestones(long_df, results, thresholds=(0.02, 0.5))
+    lag = out.set_index(["treatment", "replicate"])["lag_time"]
+    assert lag.loc[("A", 1)] == pytest.approx(30.0, abs=1e-6)
+    assert lag.loc[("A", 2)] == pytest.approx(30.0, abs=1e-6)
+    crossing = out.set_index(["treatment", "replicate"])["time_to_od_0.02"]
+    # Linear interpolation between the reads at 40 and 50 minutes.
+    od40, od50 = 0.01 * np.exp(0.5), 0.01 * np.exp(1.0)
+    assert crossing.loc[("A", 1)] == pytest.approx(40 + 10 * (0.02 - od40) / (od50 - od40))
+    assert crossing.loc[("A", 2)] == pytest.approx(0.0)
+    assert np.isnan(crossing.loc[("B", 1)])
+    assert out["time_to_od_0.5"].isna().all()
+
+
+def test_threshold_below_first_read_is_met_at_first_read():
+    time = np.arange(0, 60, 10.0)
+    frames = [
+        pd.DataFrame({"time": time, "treatment": "A", "replicate": replicate, "od": scale * np.exp(0.12 * time)})
+        for replicate, scale in ((1, 10.0), (2, 12.0), (3, 11.0))
+    ]
+    long_df = pd.concat(frames, ignore_index=True)
+    results = fit_growth_rates(long_df, time_window=(0, 50))
+    out = growth_milestones(long_df, results, thresholds=(1.0,))
+    assert out["time_to_od_1"].tolist() == [0.0, 0.0, 0.0]
+
+
+def test_sliding_window_growth_finds_steepest_window():
+    time = np.arange(0, 200, 5.0)
+    # Exponential phase (mu=0.04) between 50 and 120 minutes, flat before and after.
+    log_od = np.log(0.01) + 0.04 * np.clip(time - 50, 0, 70)
+    long_df = pd.DataFrame({"time": time, "treatment": "A", "replicate": 1, "od": np.exp(log_od)})
+    summary, trace = sliding_window_growth(long_df, window_points=5)
+    row = summary.iloc[0]
+    assert row["sliding_mu_max"] == pytest.approx(0.04)
+    assert 50 <= row["sliding_window_start"] and row["sliding_window_end"] <= 120
+    assert row["sliding_r2"] == pytest.approx(1.0)
+    assert len(trace) == len(time) - 4
+    assert trace["mu"].min() == pytest.approx(0.0, abs=1e-12)
+    start, end = _suggest_fit_window(long_df, window_points=5)
+    assert start == pytest.approx(50.0) and end == pytest.approx(120.0)
+
+
+def test_smooth_growth_curves_methods():
+    time = np.arange(0, 30, 1.0)
+    curve = 0.1 + 0.002 * time**2
+    long_df = pd.DataFrame(
+        {
+            "time": np.tile(time, 2),
+            "treatment": ["A"] * len(time) + ["B"] * len(time),
+            "replicate": 1,
+            "od": np.concatenate([curve, curve]),
+        }
+    )
+    long_df.loc[len(time) + 12, "od"] += 1.0
+    long_df.loc[3, "od"] = np.nan
+    median = smooth_growth_curves(long_df, method="median", window_points=3)
+    spiky = long_df["od"].to_numpy()[len(time) :]
+    np.testing.assert_allclose(median["od"].to_numpy()[len(time) :], _median_smooth(spiky))
+    # A quadratic is reproduced exactly by a second-order Savitzky-Golay filter, ends included
+    # (windows are by read index, so only those clear of the missing read are exact).
+    savgol = smooth_growth_curves(long_df, method="savgol", window_points=5, polyorder=2)
+    np.testing.assert_allclose(savgol["od"].to_numpy()[6 : len(time)], curve[6:], atol=1e-12)
+    lowess = smooth_growth_curves(long_df, method="lowess", window_points=7, iterations=2)
+    assert lowess["od"].iloc[len(time) + 12] == pytest.approx(curve[12], abs=0.02)
+    for smoothed in (median, savgol, lowess):
+        assert np.isnan(smoothed["od"].iloc[3])
+    assert long_df["od"].iloc[len(time) + 12] == pytest.approx(curve[12] + 1.0)
+
+
+@pytest.mark.parametrize("method", ["theil_sen", "huber"])
+def test_robust_fit_ignores_spike_reads(method):
+    time = np.arange(0, 100, 5.0)
+    od = 0.01 * np.exp(0.03 * time)
+    od[0] *= 3.0
+    od[-1] *= 0.3
+    long_df = pd.DataFrame({"time": time, "treatment": "A", "replicate": 1, "od": od})
+    ols = fit_growth_rates(long_df, time_window=(0, 100)).iloc[0]
+    robust = fit_growth_rates(long_df, time_window=(0, 100), fit_method=method).iloc[0]
+    assert abs(ols["mu"] - 0.03) > 0.005
+    assert robust["mu"] == pytest.approx(0.03, rel=1e-6)
+    assert robust["doubling_time"] == pytest.approx(np.log(2) / 0.03, rel=1e-6)
+    assert robust["window_start"] == ols["window_start"]
+
+
+def test_replicate_outliers_flags_contaminated_well():
+    rng = np.random.default_rng(0)
+    time = np.arange(0, 200, 5.0)
+    frames = []
+    for treatment in ("A", "B"):
+        for replicate in range(1, 5):
+            od = 0.01 * np.exp(0.03 * time) / (1 + 0.01 * (np.exp(0.03 * time) - 1))
+            od = od * (1 + rng.normal(0, 0.02, len(time)))
+            if treatment == "B" and replicate == 3:
+                od = od * 1.8
+            frames.append(pd.DataFrame({"time": time, "treatment": treatment, "replicate": replicate, "od": od}))
+    long_df = pd.concat(frames, ignore_index=True)
+    results = fit_growth_rates(long_df, time_window=(20, 100))
+    for method in ("curve", "auc"):
+        flagged = replicate_outliers(long_df, results, method=method)
+        assert flagged.loc[flagged["outlier"], ["treatment", "replicate"]].values.tolist() == [["B", 3]]
+        assert len(flagged) == len(results)
+    # Two replicates cannot outvote each other.
+    pair = long_df[long_df["replicate"] <= 2]
+    assert not replicate_outliers(pair, fit_growth_rates(pair), method="curve")["outlier"].any()
+
+
+def test_qc_flags_rules_and_mask():
+    results = pd.DataFrame(
+        {
+            "treatment": ["A", "A", "A", "B"],
+            "replicate": [1, 2, 3, 1],
+            "mu": [0.02, 0.021, 0.04, -0.01],
+            "r2": [0.99, 0.5, 0.99, 0.99],
+            "n": [10, 10, 3, 10],
+            "od_max": [0.8, 1.9, 0.8, 0.1],
+            "outlier": [False, False, True, False],
+        }
+    )
+    flagged = qc_flags(results, {"min_points": 5, "max_od": 1.5, "max_replicate_cv": 0.3})
+    assert flagged["qc_flags"].tolist() == [
+        "high_replicate_cv(>0.3)",
+        "low_r2(<0.9), saturated(od>1.5), high_replicate_cv(>0.3)",
+        "few_points(<5), high_replicate_cv(>0.3), replicate_outlier",
+        "non_positive_mu",
+    ]
+    assert flagged["qc_mask"].tolist() == [64, 1 + 8 + 64, 4 + 64 + 128, 2]
+    # Rules switched off, or whose inputs are missing, never fire.
+    quiet = qc_flags(results.drop(columns=["outlier"]), {"min_r2": None, "non_positive_mu": False})
+    assert quiet["qc_mask"].eq(0).all() and quiet["qc_flags"].eq("").all()
+
+
+def test_fit_window_sweep_matches_window_fits():
+    rng = np.random.default_rng(2)
+    time = np.arange(0, 200, 5.0)
+    frames = [
+        pd.DataFrame(
+            {
+                "time": time,
+                "treatment": "A",
+                "replicate": replicate,
+                "od": 0.01 * np.exp(0.03 * time) * np.exp(rng.normal(0, 0.05, len(time))),
+            }
+        )
+        for replicate in (1, 2)
+    ]
+    long_df = pd.concat(frames, ignore_index=True)
+    sweep = fit_window_sweep(long_df, starts=[0.0, 50.0], ends=[40.0, 150.0], min_points=3)
+    assert len(sweep) == 2 * 3  # (50, 40) is not a window
+    for _, row in sweep.iterrows():
+        fit = fit_growth_rates(
+            long_df[long_df["replicate"] == row["replicate"]],
+            time_window=(row["window_start"], row["window_end"]),
+        ).iloc[0]
+        assert row["mu"] == pytest.approx(fit["mu"])
+        assert row["r2"] == pytest.approx(fit["r2"])
+        assert row["n"] == fit["n"]
+    summary = _sweep_summary(sweep)
+    assert summary["replicates"].eq(2).all()
+    assert len(summary) == 3
+
+
+def test_time_grid_alignment_across_runs():
+    rows = []
+    for run, offset in (("run1", 0.0), ("run2", 0.02)):
+        for replicate in (1, 2):
+            time = np.arange(0, 100, 10.0) + offset * np.arange(10)
+            for t in time:
+                rows.append((run, "A", replicate, t, 0.05 + 0.001 * t * replicate))
+    long_df = pd.DataFrame(rows, columns=["run", "treatment", "replicate", "time", "od"])
+    grid = np.arange(0, 91, 5.0)
+    aligned = align_to_time_grid(long_df, grid=grid, group_cols=("run", "treatment", "replicate"))
+    assert len(aligned) == 4 * len(grid)
+    curve = long_df[(long_df["run"] == "run2") & (long_df["replicate"] == 2)]
+    got = aligned[(aligned["run"] == "run2") & (aligned["replicate"] == 2)]["od"].to_numpy()
+    expected = np.interp(grid, curve["time"], curve["od"], right=np.nan)
+    np.testing.assert_allclose(got, expected, equal_nan=True)
+    summary = aligned_mean_sd(long_df, grid=grid)
+    assert summary.groupby("run").size().to_dict() == {"run1": len(grid), "run2": len(grid)}
+    assert summary["n"].eq(2).all()
+    assert summary["sd"].iloc[0] == pytest.approx(0.0)
+    diff = curve_differences(summary, "run1")
+    assert diff["run"].eq("run2").all()
+    np.testing.assert_allclose(diff["difference"], 0.0, atol=1e-12)
@@ -0,0 +1,30 @@
+import numpy as np
+
+from benchmarks.run_benchmarks import compare_runs, run_case
+from benchmarks.synthetic import blank_columns, generate_plate, plate_column_map
+
+
+def test_generate_plate_is_deterministic_and_shaped():
+    wide, truth = generate_plate(n_wells=96, n_reads=50, seed=3)
+    again, _ = generate_plate(n_wells=96, n_reads=50, seed=3)
+    assert wide.shape == (50, 97)
+    assert np.allclose(wide.drop(columns="Time").to_numpy(), again.drop(columns="Time").to_numpy())
+    assert len(blank_columns(truth)) == 8
+    assert len(plate_column_map(truth)) == 88
+
+
+def test_generate_plate_dead_wells_stay_flat():
+    wide, truth = generate_plate(n_wells=96, n_reads=80, dead_fraction=0.5, seed=1)
+    flat = truth.loc[truth["dead"], "well"]
+    growing = truth.loc[~truth["dead"], "well"]
+    assert wide[flat].max().max() < 0.1
+    assert wide[growing].iloc[-1].min() > 0.2
+
+
+def test_run_case_records_each_stage():
+    stages = ("blank_normalization", "mean_sd", "auc")
+    records = run_case(96, 30, stages=stages, repeat=1)
+    assert [r["stage"] for r in records] == list(stages)
+    suite = {"records": records}
+    table = compare_runs(suite, suite)
+    assert np.allclose(table["speedup"], 1.0)
@@ -0,0 +1,65 @@
+import io
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from odyssey.catalog import catalog_runs, ingest_bundle, main, open_catalog, query_curves, query_runs
+from odyssey.compare import build_results_cube
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _bundle(**config):
+    # The sample export with its config.json updated.
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(FIXTURES / "odyssey_sample.zip") as source, zipfile.ZipFile(buffer, "w") as target:
+        for name in source.namelist():
+            data = source.read(name)
+            if name == "config.json":
+                data = json.dumps({**json.loads(data), **config}).encode()
+            target.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_catalog_ingests_once_and_filters_runs(tmp_path):
+    conn = open_catalog(str(tmp_path / "catalog.sqlite"))
+    first = _bundle(updated_at="2024-01-05T10:00:00", fit_method="ols", min_points=3)
+    second = _bundle(updated_at="2024-03-01T09:00:00", fit_method="huber", min_points=5, time_unit="hours")
+    assert ingest_bundle(conn, first, name="jan.zip")[1]
+    assert not ingest_bundle(conn, first, name="copy.zip")[1]
+    assert ingest_bundle(conn, second, name="mar.zip")[1]
+
+    assert query_runs(conn)["name"].tolist() == ["jan.zip", "mar.zip"]
+    assert query_runs(conn, since="2024-02-01")["name"].tolist() == ["mar.zip"]
+    assert query_runs(conn, until="2024-01-05")["name"].tolist() == ["jan.zip"]
+    assert query_runs(conn, params={"fit_method": "huber"})["name"].tolist() == ["mar.zip"]
+    assert query_runs(conn, params={"min_points": (2, 4)})["name"].tolist() == ["jan.zip"]
+    assert query_runs(conn, treatments=["C"]).empty
+
+    curves = query_curves(conn, treatments=["A"])
+    assert set(curves["treatment"]) == {"A"}
+    # Time is stored in seconds: minute reads in jan.zip, hour reads in mar.zip.
+    assert curves.groupby("run")["time_s"].max().to_dict() == {"jan.zip": 240.0, "mar.zip": 14400.0}
+
+    runs = catalog_runs(conn, treatments=["A"], metrics=["mu", "qc_flags"])
+    assert [run["name"] for run in runs] == ["jan.zip", "mar.zip"]
+    cube = build_results_cube(runs, target_time_unit="minutes")
+    assert cube["treatments"] == ["A"]
+    assert cube["metrics"] == ["mu"]
+    mu = cube["values"][:, 0, :, 0]
+    assert mu[0].tolist() == pytest.approx([0.35, 0.33])
+    assert mu[1].tolist() == pytest.approx([0.35 / 60, 0.33 / 60])
+
+
+def test_catalog_cli_ingest_and_query(tmp_path, capsys):
+    db = str(tmp_path / "catalog.sqlite")
+    bundle = tmp_path / "run.zip"
+    bundle.write_bytes(_bundle(fit_method="ols"))
+    main(["--db", db, "ingest", str(bundle), str(bundle)])
+    out = capsys.readouterr().out
+    assert "added" in out and "already present" in out
+    main(["--db", db, "query", "--treatment", "B", "--param", "fit_method=ols", "--time-unit", "minutes"])
+    out = capsys.readouterr().out
+    assert "run.zip" in out and "Growth rate (per min)" in out
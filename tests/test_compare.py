@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from odyssey.compare import _cube_summary, _cube_table, build_results_cube
+
+
+def _run(name, time_unit, rate, rate_label, auc_label="AUC (OD*min)"):
+    results = pd.DataFrame(
+        {
+            "Treatment": ["A", "A", "B"],
+            "Replicate": [1, 2, 1],
+            "N": [5, 5, 4],
+            f"Growth rate ({rate_label})": rate,
+            auc_label: [1.0, 2.0, 3.0],
+            "QC flags": ["", "low_r2(<0.9)", ""],
+        }
+    )
+    config = {"time_unit": time_unit} if time_unit else None
+    return {"name": name, "results": results, "config": config}
+
+
+def test_results_cube_converts_units_and_reduces():
+    runs = [
+        _run("run1", "minutes", [0.01, 0.02, 0.03], "per min"),
+        _run("run2", "hours", [0.6, 1.2, 1.8], "per hour", "AUC (OD*hour)"),
+        # Display tables are converted to the chosen unit, not the run's base unit.
+        _run("run3", "minutes", [0.6, 1.2, 1.8], "h\u207B\u00B9"),
+        {"name": "broken", "results": pd.DataFrame({"x": [1]}), "config": None},
+    ]
+    cube = build_results_cube(runs, target_time_unit="minutes")
+    assert cube["runs"] == ["run1", "run2", "run3"]
+    assert cube["skipped"] == ["broken: missing columns replicate, treatment"]
+    assert cube["metrics"] == ["n", "mu", "auc"]
+    assert cube["labels"] == ["qc_flags"]
+    assert cube["units"]["mu"] == "per min"
+    assert cube["values"].shape == (3, 2, 2, 3)
+    rate = cube["values"][:, :, :, 1]
+    np.testing.assert_allclose(rate[0], rate[1], equal_nan=True)
+    np.testing.assert_allclose(rate[0], rate[2], equal_nan=True)
+    assert cube["values"][1, 0, 0, 2] == pytest.approx(60.0)
+    assert not cube["present"][0, 1, 1]
+
+    table = _cube_table(cube)
+    assert len(table) == 9
+    assert "Growth rate (per min)" in table.columns
+    assert table["QC flags"].tolist().count("low_r2(<0.9)") == 3
+
+    summary = _cube_summary(cube, rename_map={"A": "pooled", "B": "pooled"})
+    assert summary["treatment_display"].eq("pooled").all()
+    assert summary["Growth rate (per min)"].tolist() == pytest.approx([0.02, 0.02, 0.02])
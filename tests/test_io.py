@@ -1,6 +1,7 @@
 from pathlib import Path
 
-from odyssey.io_utils import _read_results_zip
+from odyssey.cache import _cached_results_zip
+from odyssey.io_utils import _parse_well_id, _plate_layout, _read_results_zip
 
 
 FIXTURES = Path(__file__).parent / "fixtures"
@@ -14,3 +15,28 @@ def test_read_results_zip():
     assert parsed["results"] is not None
     assert parsed["long_df"] is not None
     assert "treatment" in parsed["results"].columns
+
+
+def test_parse_well_id():
+    assert _parse_well_id("A1") == ("A1", 0, 0)
+    assert _parse_well_id("p24") == ("P24", 15, 23)
+    assert _parse_well_id("AF48") == ("AF48", 31, 47)
+    assert _parse_well_id("Well B03") == ("B3", 1, 2)
+    assert _parse_well_id("OD600") is None
+    assert _parse_well_id("TreatmentA_rep1") is None
+
+
+def test_plate_layout_requires_every_column_to_be_a_well():
+    assert _plate_layout(["A1", "A2", "H12"])["H12"] == ("H12", 7, 11)
+    # Treatment-style names parse one by one but do not make a plate.
+    assert _plate_layout(["T1", "C2", "Glucose"]) is None
+    assert _plate_layout(["B3", "Well B03"]) is None
+    assert _plate_layout(["A1", "A99"]) is None
+
+
+def test_cached_results_zip_matches_direct_read():
+    data = (FIXTURES / "odyssey_sample.zip").read_bytes()
+    parsed, err = _cached_results_zip("sample", "odyssey_sample.zip", data)
+    assert err is None
+    assert parsed["name"] == "odyssey_sample.zip"
+    assert "treatment" in parsed["results"].columns
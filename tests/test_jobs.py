@@ -0,0 +1,61 @@
+import threading
+import time
+
+from odyssey.jobs import JobRunner
+
+
+def _wait(runner, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = runner.status(job_id)
+        if status["state"] not in ("queued", "running"):
+            return status
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def _steps(n, progress_cb=None, gate=None):
+    for i in range(n):
+        if gate is not None:
+            gate.wait()
+        progress_cb("step", i, n)
+    return n
+
+
+def test_job_runner_collects_result():
+    runner = JobRunner(max_workers=1)
+    job_id = runner.submit(_steps, 3)
+    status = _wait(runner, job_id)
+    assert status["state"] == "done"
+    assert status["stage"] == "step" and status["total"] == 3
+    assert runner.result(job_id) == 3
+
+
+def test_job_runner_cancels_at_next_progress_callback():
+    runner = JobRunner(max_workers=1)
+    gate = threading.Event()
+    job_id = runner.submit(_steps, 100, gate=gate)
+    runner.cancel(job_id)
+    gate.set()
+    status = _wait(runner, job_id)
+    assert status["state"] == "cancelled"
+    assert runner.result(job_id) is None
+
+
+def test_job_runner_reports_failures():
+    def _boom(progress_cb=None):
+        raise ValueError("bad sheet")
+
+    runner = JobRunner(max_workers=1)
+    status = _wait(runner, runner.submit(_boom))
+    assert status["state"] == "failed"
+    assert status["error"] == "bad sheet"
+
+
+def test_job_runner_drops_uncollected_jobs_after_ttl():
+    runner = JobRunner(max_workers=1, ttl=0.0)
+    job_id = runner.submit(_steps, 1)
+    while runner.result(job_id) is None:
+        time.sleep(0.01)
+    runner.submit(_steps, 1)
+    assert runner.status(job_id) is None
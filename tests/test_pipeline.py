@@ -0,0 +1,178 @@
+import io
+import json
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from odyssey.compare import build_results_cube
+from odyssey.export import _canonical_results, build_download_zip
+from odyssey.io_utils import _NamedBytesIO, _read_results_zip
+from odyssey.pipeline import (
+    _blank_drift,
+    _blank_map_by_row,
+    _flatten_trace,
+    analyze_file,
+    apply_blank_normalization,
+    refit_analysis,
+)
+
+
+def _workbook():
+    time = np.arange(0, 120, 10, dtype=float)
+    wide = pd.DataFrame(
+        {
+            "Time": time,
+            "A1": 0.05 + 0.01 * np.exp(0.03 * time),
+            "A2": 0.05 + 0.012 * np.exp(0.03 * time),
+            "Blank": np.full_like(time, 0.05),
+        }
+    )
+    buffer = io.BytesIO()
+    wide.to_excel(buffer, index=False, sheet_name="Sheet1")
+    return _NamedBytesIO(buffer.getvalue(), "plate.xlsx")
+
+
+def _analyze(time_window=(10.0, 80.0), **kwargs):
+    return analyze_file(
+        _workbook(),
+        "Sheet1",
+        "Time",
+        "minutes",
+        [
+            {"column": "A1", "treatment": "A", "replicate": 1},
+            {"column": "A2", "treatment": "A", "replicate": 2},
+        ],
+        time_window,
+        False,
+        3,
+        False,
+        ["Blank"],
+        **kwargs,
+    )
+
+
+def test_analyze_file_records_stage_trace():
+    trace = _analyze()["trace"]
+    root = trace["spans"][0]
+    assert root["stage"] == "analyze_file"
+    stages = [span["stage"] for span in root["children"]]
+    assert stages == [
+        "read_excel",
+        "blank_normalization",
+        "parse_time",
+        "reshape",
+        "well_arrays",
+        "fit_growth_rates",
+        "growth_milestones",
+        "mean_sd",
+        "auc",
+    ]
+    assert root["counts"]["wells"] == 2
+    assert root["children"][3]["counts"]["rows"] == 24
+    flat = _flatten_trace(trace)
+    assert flat["stage"].iloc[1] == "analyze_file/read_excel"
+    assert flat["duration_s"].ge(0).all()
+
+
+def test_build_download_zip_writes_trace_json():
+    analysis = _analyze()
+    zip_bytes, _, _, timings = build_download_zip(
+        results=analysis["results"],
+        analyses=[analysis],
+        plot_artifacts=[],
+        config_payload={},
+        config_filename="config.json",
+        download_results=False,
+        download_long_df=False,
+        download_config=False,
+        download_plots=False,
+        selected_plots=[],
+        zip_filename="bundle.zip",
+        download_trace=True,
+    )
+    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zf:
+        payload = json.loads(zf.read("trace.json"))
+    assert payload["analyses"][0]["name"] == "plate.xlsx"
+    assert "trace_json_s" in timings
+
+
+def test_canonical_results_round_trip_in_si_units():
+    analysis = _analyze(od_thresholds=(0.1,))
+    canonical, schema = _canonical_results([analysis], "minutes")
+    assert schema["schema_version"] == 1
+    assert schema["columns"]["mu"] == "1/s"
+    assert schema["columns"]["time_to_od_0.1"] == "s"
+    assert canonical["mu"].tolist() == pytest.approx((analysis["results"]["mu"] / 60).tolist())
+    zip_bytes, _, _, _ = build_download_zip(
+        results=pd.DataFrame({"Treatment": ["A"], "Replicate": [1], "Growth rate (h\u207B\u00B9)": [99.0]}),
+        analyses=[analysis],
+        plot_artifacts=[],
+        config_payload={"time_unit": "minutes"},
+        config_filename="config.json",
+        download_results=True,
+        download_long_df=False,
+        download_config=True,
+        download_plots=False,
+        selected_plots=[],
+        zip_filename="bundle.zip",
+        canonical_results=(canonical, schema),
+    )
+    parsed, err = _read_results_zip(_NamedBytesIO(zip_bytes, "bundle.zip"))
+    assert err is None
+    # The loader reads the canonical file and ignores the display table.
+    cube = build_results_cube([parsed], target_time_unit="hours")
+    mu = cube["values"][0, 0, :, cube["metrics"].index("mu")]
+    assert mu.tolist() == pytest.approx((analysis["results"]["mu"] * 60).tolist())
+    auc = cube["values"][0, 0, :, cube["metrics"].index("auc")]
+    assert auc.tolist() == pytest.approx((analysis["auc"]["auc"] / 60).tolist())
+
+
+def test_blank_normalization_per_row_map_and_first_n():
+    df = pd.DataFrame(
+        {
+            "Time": [0.0, 1.0, 2.0],
+            "A1": [0.2, 0.3, "0.4"],
+            "A12": [0.1, 0.1, 0.1],
+            "B1": [0.5, 0.6, 0.7],
+            "B12": [0.2, np.nan, 0.4],
+        }
+    )
+    pooled = apply_blank_normalization(df, "Time", ["A12", "B12"])
+    assert pooled["A1"].tolist() == pytest.approx([0.05, 0.2, 0.15])
+    blank_map = _blank_map_by_row(["A1", "A12", "B1", "B12"], ["A12", "B12"])
+    assert blank_map["B1"] == ["B12"]
+    by_row = apply_blank_normalization(df, "Time", ["A12", "B12"], blank_map=blank_map)
+    assert by_row["A1"].tolist() == pytest.approx([0.1, 0.2, 0.3])
+    assert np.isnan(by_row["B1"].iloc[1])
+    first_n = apply_blank_normalization(df, "Time", ["A12", "B12"], blank_map=blank_map, estimate="first_n", first_n=3)
+    assert first_n["B1"].tolist() == pytest.approx([0.2, 0.3, 0.4])
+    assert list(first_n.columns) == list(df.columns)
+    drift = _blank_drift(df, "Time", ["A12", "B12"], blank_map=blank_map)
+    assert drift["B1"] == pytest.approx(0.2)
+    assert drift["A1"] == pytest.approx(0.0)
+    assert drift["A1"] == pytest.approx(drift["A12"])
+
+
+def test_analyze_file_adds_qc_inputs():
+    results = _analyze()["results"]
+    assert results["blank_drift"].tolist() == pytest.approx([0.0, 0.0])
+    assert (results["od_max"] > 0.1).all()
+
+
+def test_refit_analysis_matches_fresh_run():
+    options = {"od_thresholds": (0.1,), "sliding_window": {"window_points": 3}}
+    first = _analyze(**options)
+    refit = refit_analysis(first, time_window=(30.0, 100.0), auc_window=(0.0, 60.0))
+    fresh = _analyze((30.0, 100.0), auc_window=(0.0, 60.0), **options)
+    pd.testing.assert_frame_equal(refit["results"], fresh["results"], check_like=True)
+    pd.testing.assert_frame_equal(refit["auc"], fresh["auc"])
+    assert refit["mean_df"] is first["mean_df"]
+    assert refit["mean_curves"] is first["mean_curves"]
+    assert refit["mu_trace"] is first["mu_trace"]
+    root = refit["trace"]["spans"][0]
+    assert root["stage"] == "refit_analysis"
+    assert "read_excel" not in [span["stage"] for span in root["children"]]
+    with pytest.raises(ValueError):
+        refit_analysis(first, smoothing={"method": "median"})
@@ -1,9 +1,20 @@
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
-from odyssey.analysis import _mean_sd_by_treatment_time
-from odyssey.plotting import _plot_compare_runs, _plot_overlay, _plot_small_multiples
+from odyssey.analysis import _mean_sd_by_treatment_time, _well_metric_frame
+from odyssey.plotting import (
+    DEFAULT_MAX_POINTS,
+    PREVIEW_POINT_BUDGET,
+    _lttb_indices,
+    _plot_compare_runs,
+    _plot_overlay,
+    _plot_plate_heatmap,
+    _plot_small_multiples,
+    _preview_max_points,
+    _set_window_highlight,
+)
 
 
 FIXTURES = Path(__file__).parent / "fixtures"
@@ -32,3 +43,95 @@ def test_plot_compare_runs_traces():
     ]
     fig = _plot_compare_runs(analyses, "A", show_sd=True)
     assert len(fig.data) > 0
+    # Split mean curves from the pipeline are used as is, and the analyses are not modified.
+    analyses[0]["mean_curves"] = {}
+    fig = _plot_compare_runs(analyses, "A", show_sd=False)
+    assert [trace.name for trace in fig.data] == ["run_2"]
+    assert set(analyses[1]) == {"name", "mean_df"}
+
+
+def test_preview_points_stay_within_budget():
+    time = np.linspace(0, 100, 2000)
+    for n_curves in (2, 24):
+        treatments = [f"T{i}" for i in range(n_curves)]
+        mean_df = pd.concat(
+            [pd.DataFrame({"treatment": t, "time": time, "mean": np.sin(time), "sd": 0.1}) for t in treatments],
+            ignore_index=True,
+        )
+        fig = _plot_overlay(mean_df, treatments, show_sd=False, max_points=_preview_max_points(n_curves))
+        assert sum(len(trace.x) for trace in fig.data) <= PREVIEW_POINT_BUDGET
+
+
+def test_lttb_indices_keep_endpoints():
+    x = np.linspace(0, 100, 2000)
+    y = 1.0 / (1.0 + np.exp(-(x - 50) / 5))
+    idx = _lttb_indices(x, y, 200)
+    assert len(idx) == 200
+    assert idx[0] == 0 and idx[-1] == 1999
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_plot_overlay_switches_to_webgl_for_dense_curves():
+    time = np.linspace(0, 100, 5000)
+    mean_df = pd.concat(
+        [
+            pd.DataFrame({"treatment": f"T{i}", "time": time, "mean": time / 100.0, "sd": 0.01})
+            for i in range(10)
+        ],
+        ignore_index=True,
+    )
+    fig = _plot_overlay(mean_df, [f"T{i}" for i in range(10)], show_sd=True)
+    assert fig.data[0].type == "scattergl"
+    assert len(fig.data[-1].x) == DEFAULT_MAX_POINTS
+    fig_svg = _plot_overlay(mean_df, ["T0"], show_sd=False, render_mode="svg")
+    assert fig_svg.data[0].type == "scatter"
+
+
+def test_plot_small_multiples_one_band_trace_per_treatment():
+    long_df = pd.read_csv(FIXTURES / "long_df.csv")
+    mean_df = _mean_sd_by_treatment_time(long_df)
+    fig = _plot_small_multiples(mean_df, ["A", "B", "missing"], cols_per_row=2, show_sd=True)
+    assert len(fig.data) == 5
+    assert fig.data[0].fill == "toself"
+    assert fig.data[2].xaxis == "x2"
+    assert [a.text for a in fig.layout.annotations] == ["A", "B", "missing"]
+
+
+def test_plot_plate_heatmap_maps_wells_to_grid():
+    column_map = [
+        {"column": "A1", "treatment": "A", "replicate": 1},
+        {"column": "A2", "treatment": "A", "replicate": 2},
+        {"column": "H12", "treatment": "B", "replicate": 1},
+    ]
+    results = pd.DataFrame(
+        {
+            "treatment": ["A", "A", "B"],
+            "replicate": [1, 2, 1],
+            "mu": [0.1, 0.2, 0.3],
+            "qc_flags": ["", "low_r2(<0.9)", ""],
+        }
+    )
+    well_df = _well_metric_frame(results, column_map)
+    fig = _plot_plate_heatmap(well_df, "mu")
+    z = np.array(fig.data[0].z, dtype=float)
+    assert z.shape == (8, 12)
+    assert z[0, 1] == 0.2 and z[7, 11] == 0.3
+    assert np.isnan(z[3, 3])
+    qc_z = np.array(_plot_plate_heatmap(well_df, "qc_flags").data[0].z, dtype=float)
+    assert qc_z[0, 1] == 1 and qc_z[0, 0] == 0
+    well_df["analysis"] = 1
+    custom = _plot_plate_heatmap(well_df, "mu", run_col="analysis").data[1].customdata
+    assert [str(value) for value in custom[2]] == ["H12", "B", "1", "1"]
+
+
+def test_set_window_highlight_replaces_shapes():
+    long_df = pd.read_csv(FIXTURES / "long_df.csv")
+    fig = _plot_overlay(_mean_sd_by_treatment_time(long_df), ["A", "B"], show_sd=True)
+    n_traces = len(fig.data)
+    _set_window_highlight(fig, (0, 2))
+    _set_window_highlight(fig, (1, 3))
+    assert len(fig.layout.shapes) == 1
+    assert (fig.layout.shapes[0].x0, fig.layout.shapes[0].x1) == (1, 3)
+    assert len(fig.data) == n_traces
+    _set_window_highlight(fig, None)
+    assert len(fig.layout.shapes) == 0
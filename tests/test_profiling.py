@@ -0,0 +1,39 @@
+import pandas as pd
+
+from odyssey.profiling import (
+    _RerunProfile,
+    _changed_widgets,
+    _profile_report,
+    _profiling_enabled,
+    _record_rerun,
+    _widget_snapshot,
+)
+
+
+def test_profiling_enabled_from_env_or_query_param():
+    assert _profiling_enabled({"ODYSSEY_PROFILE": "1"}, {})
+    assert _profiling_enabled({}, {"profile": "true"})
+    assert not _profiling_enabled({"ODYSSEY_PROFILE": "0"}, {"profile": "no"})
+
+
+def test_widget_snapshot_diff_ignores_large_state():
+    previous = _widget_snapshot({"plot_mode": "Overlay", "payload": pd.DataFrame({"a": [1]})})
+    current = _widget_snapshot(
+        {"plot_mode": "Small multiples", "plot_groups": ["A"], "profiler_log": []}
+    )
+    assert _changed_widgets(previous, current) == ["plot_groups", "plot_mode"]
+
+
+def test_rerun_profile_records_sections_and_keeps_slowest():
+    profile = _RerunProfile(["plot_mode"])
+    profile.start()
+    profile.mark("results")
+    sum(range(1000))
+    record = profile.stop()
+    assert [s["section"] for s in record["sections"]] == ["startup", "results"]
+    assert record["wall_s"] >= sum(s["wall_s"] for s in record["sections"]) * 0.99
+    log = []
+    for wall in (0.5, 2.0, 1.0):
+        log = _record_rerun(log, {**record, "wall_s": wall}, max_entries=2)
+    assert [r["wall_s"] for r in log] == [2.0, 1.0]
+    assert "trigger: plot_mode" in _profile_report(log)